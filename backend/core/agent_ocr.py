@@ -1,90 +1,176 @@
 import os
 import json
+import hashlib
 import tempfile
-from typing import Tuple
+import threading
+import time
+from typing import Dict, Optional, Tuple
 
-import google.generativeai as genai
-from dotenv import load_dotenv
 from backend.config.prompt_loader import PromptManager
+from backend.core.llm_cache import cache_key, get_llm_cache
+from backend.core.llm_client import LLMClient, get_llm_client
+from backend.core.llm_scheduler import LLMOverloaded, Priority
+from backend.core.resume_extractor import extract_profile, extract_text, is_usable
+from backend.core.stage_pool import LatencyStats
 from fastapi import UploadFile
 
-load_dotenv()
+
+TIERS = ("cache", "text", "vision", "failed")
+# Bump when the local extractor changes, to drop its cached profiles
+PARSER_VERSION = "text-v1"
 
 
 class ResumeParser:
     """
-    Vision-based resume parser using Gemini VLM.
+    Tiered resume parser:
+    1. cache: profiles are cached by file content hash
+    2. text: PDFs/DOCX with a text layer are parsed locally
+       (text extraction + heuristic structuring, milliseconds)
+    3. vision: scanned/image resumes (or text the heuristics can't
+       structure) go to the Gemini VLM
     """
 
-    def __init__(self, model_name: str = "gemini-1.5-pro-latest"):
-        # NOTE: Using the Gemini 1.5 Pro model.
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            raise RuntimeError("GOOGLE_API_KEY not set")
-
-        genai.configure(api_key=api_key)
-
-        self.model = genai.GenerativeModel(
-            model_name,
-            generation_config={
-                "response_mime_type": "application/json"
-            }
-        )
-
+    def __init__(self, client: Optional[LLMClient] = None):
+        # Shared client: no per-upload configure / model construction
+        self.client = client or get_llm_client()
         self.prompt_manager = PromptManager()
 
+        self.tiers: Dict[str, int] = {tier: 0 for tier in TIERS}
+        self.latency = {tier: LatencyStats() for tier in TIERS}
+        self._lock = threading.Lock()
+
     def parse(self, file_path: str) -> dict:
         """
         Parses a resume PDF/image into structured JSON.
         """
-        print(f"[INFO] Uploading resume to Gemini: {file_path}")
+        with open(file_path, "rb") as f:
+            data = f.read()
+        return self.parse_bytes(data, os.path.basename(file_path))["profile"]
+
+    def parse_bytes(self, data: bytes, filename: str = "") -> dict:
+        """
+        Returns: {"resume_text", "profile", "tier", "timings_ms"}
+        """
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+        computed: Dict[str, str] = {}
+
+        def lap(name: str, since: float) -> float:
+            now = time.perf_counter()
+            timings[name] = round((now - since) * 1000.0, 2)
+            return now
+
+        file_hash = hashlib.sha256(data).hexdigest()
+        mark = lap("hash", started)
+
+        prompt = self.prompt_manager.get("resume_parser")
+        key = cache_key(
+            self.client.provider.model_name,
+            prompt + PARSER_VERSION,
+            {"file_sha256": file_hash},
+        )
 
-        uploaded_file = genai.upload_file(file_path)
+        def compute() -> dict:
+            nonlocal mark
+            text = extract_text(data, filename)
+            mark = lap("extract", mark)
 
-        try:
-            prompt = self.prompt_manager.get("resume_parser")
+            if text:
+                profile = extract_profile(text)
+                mark = lap("structure", mark)
+                if is_usable(profile):
+                    computed["tier"] = "text"
+                    return {"resume_text": text, "profile": profile}
 
-            print("[INFO] Analyzing resume...")
-            response = self.model.generate_content(
-                [prompt, uploaded_file]
-            )
+            computed["tier"] = "vision"
+            profile = self._analyze(data, filename, prompt)
+            mark = lap("vision", mark)
+            return {"resume_text": text, "profile": profile}
 
-            return json.loads(response.text)
+        try:
+            result = get_llm_cache().get_or_compute(key, compute)
+            tier = computed.get("tier", "cache")
 
-        except json.JSONDecodeError:
-            print("[WARN] Gemini returned invalid JSON")
-            return {}
+        except LLMOverloaded:
+            raise
 
         except Exception as e:
-            print(f"[ERROR] Resume parsing failed: {e}")
-            return {}
+            if isinstance(e, json.JSONDecodeError):
+                print("[WARN] Gemini returned invalid JSON")
+            else:
+                print(f"[ERROR] Resume parsing failed: {e}")
+            result, tier = {"resume_text": "", "profile": {}}, "failed"
+
+        total_ms = (time.perf_counter() - started) * 1000.0
+        timings["total"] = round(total_ms, 2)
+
+        with self._lock:
+            self.tiers[tier] += 1
+        self.latency[tier].record(total_ms)
+
+        print(f"[INFO] Resume parsed via {tier} tier: {timings}")
+        return {**result, "tier": tier, "timings_ms": timings}
+
+    def _analyze(self, data: bytes, filename: str, prompt: str) -> dict:
+        suffix = os.path.splitext(filename)[1]
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+            tmp.write(data)
+            file_path = tmp.name
+
+        try:
+            print(f"[INFO] Uploading resume to Gemini: {filename}")
+            uploaded_file = self.client.provider.upload_file(file_path)
 
-        finally:
-            # Cleanup uploaded artifact
             try:
-                genai.delete_file(uploaded_file.name)
-            except Exception:
-                pass
+                print("[INFO] Analyzing resume...")
+                response = self.client.generate_sync(
+                    [prompt, uploaded_file], json_mode=True, priority=Priority.BATCH
+                )
+
+                return json.loads(response)
+
+            finally:
+                # Cleanup uploaded artifact
+                try:
+                    self.client.provider.delete_file(uploaded_file)
+                except Exception:
+                    pass
+
+        finally:
+            # Clean up the local temporary file
+            os.remove(file_path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                tier: {"count": self.tiers[tier], "latency": self.latency[tier].stats()}
+                for tier in TIERS
+            }
+
+
+_parser: Optional[ResumeParser] = None
+_parser_lock = threading.Lock()
+
+
+def get_resume_parser() -> ResumeParser:
+    global _parser
+    with _parser_lock:
+        if _parser is None:
+            _parser = ResumeParser()
+        return _parser
+
+
+def ingest_resume(file: UploadFile) -> dict:
+    """
+    Parse an uploaded resume; see ResumeParser.parse_bytes.
+    """
+    return get_resume_parser().parse_bytes(file.file.read(), file.filename or "")
 
 
 def parse_resume(file: UploadFile) -> Tuple[str, dict]:
     """
     Wrapper function to handle UploadFile, parse it, and return data
-    in the format expected by main.py.
+    in the format expected by main.py: (resume_text, profile_dict).
     """
-    parser = ResumeParser()
-
-    # Save UploadFile to a temporary file to get a path
-    with tempfile.NamedTemporaryFile(delete=False, suffix=file.filename) as tmp:
-        tmp.write(file.file.read())
-        file_path = tmp.name
-
-    try:
-        profile_data = parser.parse(file_path)
-        # main.py expects a tuple (resume_text, profile_dict).
-        # The raw text isn't used in v1.0, so we return an empty string.
-        return "", profile_data
-    finally:
-        # Clean up the local temporary file
-        if os.path.exists(file_path):
-            os.remove(file_path)
+    result = ingest_resume(file)
+    return result["resume_text"], result["profile"]
@@ -1,12 +1,14 @@
 import asyncio
 import os
 import tempfile
-from typing import Optional
+from typing import Optional, Union
 
 import edge_tts
+import numpy as np
 import whisper
 
 from backend.config.setting import DEVICE
+from backend.core.audio_utils import load_audio
 
 
 class AudioEngine:
@@ -16,6 +18,7 @@ class AudioEngine:
 
     def __init__(self, whisper_model: str = "base"):
         print(f"[INFO] Initializing AudioEngine on {DEVICE}")
+        self.whisper_model = whisper_model
 
         # Load Whisper once (heavy model)
         self.stt_model = whisper.load_model(
@@ -53,12 +56,22 @@ class AudioEngine:
     # Speech → Text
     # ---------------------------
 
-    def speech_to_text(self, audio_path: str) -> str:
+    def speech_to_text(self, audio: Union[str, bytes, np.ndarray]) -> str:
         """
-        Transcribe an audio file into text.
+        Transcribe audio into text.
+
+        Accepts a mono float32 16 kHz waveform, in-memory audio
+        bytes (WAV decoded in-process, other formats via ffmpeg
+        pipes), or a file path.
         """
+        if isinstance(audio, (bytes, bytearray, memoryview)):
+            audio = load_audio(bytes(audio))
+
+        if isinstance(audio, np.ndarray) and audio.size == 0:
+            return ""
+
         result = self.stt_model.transcribe(
-            audio_path,
+            audio,
             fp16=(DEVICE == "cuda")
         )
         return result.get("text", "").strip()
@@ -0,0 +1,308 @@
+import struct
+import subprocess
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+# Whisper's native input rate
+TARGET_SAMPLE_RATE = 16000
+
+
+def pcm_to_float32(data: bytes, encoding: str = "pcm_s16le") -> np.ndarray:
+    """
+    Decode raw little-endian PCM bytes into mono float32 in [-1, 1].
+    Supported encodings: "pcm_s16le", "pcm_f32le".
+    """
+    if encoding == "pcm_s16le":
+        usable = len(data) - (len(data) % 2)
+        samples = np.frombuffer(data[:usable], dtype="<i2")
+        return samples.astype(np.float32) / 32768.0
+
+    if encoding == "pcm_f32le":
+        usable = len(data) - (len(data) % 4)
+        return np.frombuffer(data[:usable], dtype="<f4").astype(np.float32)
+
+    raise ValueError(f"Unsupported PCM encoding: {encoding}")
+
+
+def resample(
+    audio: np.ndarray,
+    src_rate: int,
+    dst_rate: int = TARGET_SAMPLE_RATE,
+) -> np.ndarray:
+    """
+    Vectorized linear-interpolation resampling (mono float32).
+    Downsampling applies a moving-average low-pass first to
+    limit aliasing.
+    """
+    if src_rate == dst_rate or audio.size == 0:
+        return audio.astype(np.float32, copy=False)
+
+    width = int(round(src_rate / dst_rate))
+    if width > 1:
+        kernel = np.full(width, 1.0 / width, dtype=np.float32)
+        audio = np.convolve(audio, kernel, mode="same")
+
+    duration = audio.shape[0] / src_rate
+    n_out = int(round(duration * dst_rate))
+
+    src_t = np.arange(audio.shape[0], dtype=np.float64) / src_rate
+    dst_t = np.arange(n_out, dtype=np.float64) / dst_rate
+
+    return np.interp(dst_t, src_t, audio).astype(np.float32)
+
+
+# ---------------------------
+# Container decoding
+# ---------------------------
+
+_WAVE_FORMAT_PCM = 1
+_WAVE_FORMAT_FLOAT = 3
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def is_wav(data: bytes) -> bool:
+    return len(data) >= 12 and data[:4] == b"RIFF" and data[8:12] == b"WAVE"
+
+
+def decode_wav(data: bytes) -> Tuple[np.ndarray, int]:
+    """
+    Decode an in-memory WAV file into mono float32 samples.
+    Supports 8/16/24/32-bit PCM and 32/64-bit float.
+    Returns: (audio, sample_rate)
+    """
+    if not is_wav(data):
+        raise ValueError("Not a RIFF/WAVE file")
+
+    fmt = None
+    payload = None
+    pos = 12
+
+    # Walk RIFF chunks without copying the payload
+    while pos + 8 <= len(data):
+        chunk_id, size = struct.unpack_from("<4sI", data, pos)
+        body = pos + 8
+
+        if chunk_id == b"fmt ":
+            if size < 16 or body + size > len(data):
+                raise ValueError("WAV fmt chunk is truncated")
+            fmt = struct.unpack_from("<HHIIHH", data, body)
+            if fmt[0] == _WAVE_FORMAT_EXTENSIBLE and size >= 26:
+                # Real format tag lives in the SubFormat GUID
+                sub_format = struct.unpack_from("<H", data, body + 24)[0]
+                fmt = (sub_format,) + fmt[1:]
+        elif chunk_id == b"data":
+            # Streamed WAVs may carry a bogus (0 / 0xFFFFFFFF) size
+            if 0 < size <= len(data) - body:
+                payload = memoryview(data)[body:body + size]
+            else:
+                payload = memoryview(data)[body:]
+                break
+
+        pos = body + size + (size & 1)
+
+    if fmt is None or payload is None:
+        raise ValueError("WAV file is missing fmt or data chunk")
+
+    format_tag, channels, sample_rate, _, block_align, bits = fmt
+    if not channels or not sample_rate or block_align != channels * ((bits + 7) // 8):
+        raise ValueError(
+            f"Invalid WAV header: channels={channels} rate={sample_rate} "
+            f"block_align={block_align} bits={bits}"
+        )
+    usable = len(payload) - (len(payload) % block_align)
+    raw = payload[:usable]
+
+    if format_tag == _WAVE_FORMAT_PCM and bits == 8:
+        audio = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif format_tag == _WAVE_FORMAT_PCM and bits == 16:
+        audio = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif format_tag == _WAVE_FORMAT_PCM and bits == 24:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        ints = np.where(ints >= 1 << 23, ints - (1 << 24), ints)
+        audio = ints.astype(np.float32) / float(1 << 23)
+    elif format_tag == _WAVE_FORMAT_PCM and bits == 32:
+        audio = np.frombuffer(raw, dtype="<i4").astype(np.float32) / float(1 << 31)
+    elif format_tag == _WAVE_FORMAT_FLOAT and bits == 32:
+        audio = np.frombuffer(raw, dtype="<f4").astype(np.float32)
+    elif format_tag == _WAVE_FORMAT_FLOAT and bits == 64:
+        audio = np.frombuffer(raw, dtype="<f8").astype(np.float32)
+    else:
+        raise ValueError(f"Unsupported WAV encoding: tag={format_tag} bits={bits}")
+
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+
+    return audio, sample_rate
+
+
+def decode_with_ffmpeg(data: bytes, sample_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """
+    Fallback for compressed formats (webm/ogg/mp3/...): pipe the
+    bytes through ffmpeg (stdin → stdout, no temp files).
+    """
+    cmd = [
+        "ffmpeg", "-nostdin", "-loglevel", "error",
+        "-i", "pipe:0",
+        "-f", "s16le", "-ac", "1", "-ar", str(sample_rate),
+        "pipe:1",
+    ]
+
+    try:
+        out = subprocess.run(cmd, input=data, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"ffmpeg failed: {e.stderr.decode(errors='ignore')}") from e
+
+    return pcm_to_float32(out, "pcm_s16le")
+
+
+def load_audio(data: bytes) -> np.ndarray:
+    """
+    Decode in-memory audio into mono float32 at 16 kHz.
+    WAV is decoded in-process; other containers go through ffmpeg.
+    """
+    if is_wav(data):
+        try:
+            audio, sample_rate = decode_wav(data)
+            return resample(audio, sample_rate)
+        except ValueError as e:
+            print(f"[WARN] In-process WAV decode failed ({e}); using ffmpeg")
+
+    return decode_with_ffmpeg(data)
+
+
+# ---------------------------
+# Benchmark: in-memory vs. temp file + ffmpeg
+# ---------------------------
+
+def _synthetic_wav(seconds: float, sample_rate: int = 44100, channels: int = 2) -> bytes:
+    import io
+    import wave
+
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    tone = 0.3 * np.sin(2 * np.pi * 220.0 * t) + 0.05 * np.random.randn(t.size)
+    frames = np.repeat((tone * 32767).astype("<i2")[:, None], channels, axis=1)
+
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(frames.tobytes())
+    return buf.getvalue()
+
+
+def _load_via_temp_file(data: bytes) -> np.ndarray:
+    """
+    The previous path: write the upload to a temp file and let
+    ffmpeg re-read it (what whisper.load_audio does).
+    """
+    import tempfile
+
+    with tempfile.NamedTemporaryFile(suffix=".wav") as tmp:
+        tmp.write(data)
+        tmp.flush()
+        out = subprocess.run([
+            "ffmpeg", "-nostdin", "-threads", "0", "-i", tmp.name,
+            "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le",
+            "-ar", str(TARGET_SAMPLE_RATE), "-",
+        ], capture_output=True, check=True).stdout
+
+    return pcm_to_float32(out, "pcm_s16le")
+
+
+def _read_io(path: str) -> int:
+    with open(path) as f:
+        fields = dict(line.split(": ") for line in f.read().splitlines())
+    return int(fields["syscr"]) + int(fields["syscw"])
+
+
+def _io_syscalls() -> Optional[Tuple[int, int]]:
+    """
+    read + write syscalls so far (Linux only), as (this thread,
+    this process + its reaped children). The kernel folds a child's
+    counts into the parent's /proc/self/io when it is waited for,
+    so the difference is what subprocesses (ffmpeg) did.
+    """
+    try:
+        return _read_io("/proc/thread-self/io"), _read_io("/proc/self/io")
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def benchmark(clips: dict, repeats: int = 10) -> dict:
+    """
+    Per-request decode latency and read/write syscalls of
+    load_audio (in memory) vs. the temp-file + ffmpeg path, the
+    latter split into this process and the ffmpeg child.
+    `clips` maps a name to the uploaded bytes.
+    """
+    import shutil
+    import time
+
+    def measure(decode, data: bytes) -> dict:
+        timings, own, children = [], [], []
+        for _ in range(repeats):
+            before = _io_syscalls()
+            started = time.perf_counter()
+            decode(data)
+            timings.append((time.perf_counter() - started) * 1000.0)
+            after = _io_syscalls()
+            if before is not None:
+                thread = after[0] - before[0] - overhead[0]
+                own.append(thread)
+                children.append(after[1] - before[1] - overhead[1] - thread)
+        timings.sort()
+        return {
+            "p50_ms": round(timings[len(timings) // 2], 2),
+            "max_ms": round(timings[-1], 2),
+            "io_syscalls": {
+                "process": max(own),
+                "subprocesses": max(children),
+            } if own else None,
+        }
+
+    # Reading the /proc counters itself costs a few syscalls
+    first, second = _io_syscalls(), _io_syscalls()
+    overhead = (
+        (second[0] - first[0], second[1] - first[1]) if first is not None else (0, 0)
+    )
+
+    has_ffmpeg = shutil.which("ffmpeg") is not None
+    results = {}
+    for name, data in clips.items():
+        results[name] = {
+            "bytes": len(data),
+            "in_memory": measure(load_audio, data),
+            "temp_file_ffmpeg": (
+                measure(_load_via_temp_file, data) if has_ffmpeg
+                else "ffmpeg not installed"
+            ),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import os
+
+    parser = argparse.ArgumentParser(
+        description="Compare in-memory audio decoding with the temp-file path"
+    )
+    parser.add_argument("files", nargs="*", help="audio files (default: synthetic WAVs)")
+    parser.add_argument("--seconds", type=float, nargs="+", default=[5, 30, 120])
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.files:
+        clips = {}
+        for path in args.files:
+            with open(path, "rb") as f:
+                clips[os.path.basename(path)] = f.read()
+    else:
+        clips = {f"{s:g}s_44k_stereo.wav": _synthetic_wav(s) for s in args.seconds}
+
+    print(json.dumps(benchmark(clips, args.repeats), indent=2))
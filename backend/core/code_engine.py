@@ -1,17 +1,693 @@
-import io
-import contextlib
+import ast
+import copy
+import hashlib
+import json
+import marshal
+import math
+import multiprocessing
+import os
+import queue
+import signal
 import threading
-from typing import Tuple
+import time
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from backend.core.stage_pool import LatencyStats
+
+try:
+    import resource
+except ImportError:  # not available on Windows: workers run without rlimits
+    resource = None
+
+
+# Sandbox defaults (overridable via environment)
+SANDBOX_WORKERS = int(os.getenv("SANDBOX_WORKERS", str(min(4, os.cpu_count() or 1))))
+SANDBOX_MEMORY_MB = int(os.getenv("SANDBOX_MEMORY_MB", "256"))
+SANDBOX_MAX_OUTPUT_CHARS = int(os.getenv("SANDBOX_MAX_OUTPUT_CHARS", "65536"))
+# Waiting for a free worker beyond this is reported as busy
+SANDBOX_QUEUE_TIMEOUT_SEC = float(os.getenv("SANDBOX_QUEUE_TIMEOUT_SEC", "10"))
+# A freshly spawned worker must be ready within this
+SANDBOX_START_TIMEOUT_SEC = 30.0
+# Distinct submissions (by AST) kept in the submission cache
+SUBMISSION_CACHE_ITEMS = int(os.getenv("SUBMISSION_CACHE_ITEMS", "256"))
+
+# Source code, or a marshalled code object (see SubmissionCache)
+Code = Union[str, bytes]
+
+TIMEOUT_ERROR = "⏱️ Execution timed out."
+CRASH_ERROR = "❌ Execution exceeded its resource limits."
 
 
 class CodeExecutionTimeout(Exception):
     pass
 
 
+class SandboxBusy(Exception):
+    pass
+
+
+class _OutputLimitExceeded(Exception):
+    pass
+
+
+class _CaseTimeout(BaseException):
+    # BaseException: candidate `except Exception` blocks can't swallow it
+    pass
+
+
+# ---------------------------
+# Worker process
+# ---------------------------
+
+class _Output:
+    """
+    Per-run stdout: a `print` bound to this buffer replaces the
+    builtin, so nothing touches the process-wide sys.stdout.
+    """
+
+    def __init__(self, limit: int):
+        self.parts = []
+        self.size = 0
+        self.limit = limit
+
+    def print(self, *args, sep=" ", end="\n", **_):
+        text = sep.join(str(a) for a in args) + end
+        self.size += len(text)
+        if self.size > self.limit:
+            raise _OutputLimitExceeded()
+        self.parts.append(text)
+
+    def getvalue(self) -> str:
+        return "".join(self.parts)
+
+
+def _vm_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _apply_limits(memory_mb: int):
+    if resource is None:
+        return
+    # Address space on top of what the idle interpreter already maps
+    limit = _vm_bytes() + memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+
+
+def _cpu_budget(timeout_sec: float):
+    """
+    CPU rlimit for the next run: the kernel kills the worker
+    (SIGXCPU) even if the parent misses the wall-clock timeout.
+    """
+    if resource is None:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = usage.ru_utime + usage.ru_stime
+    soft = int(math.ceil(used + timeout_sec)) + 1
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _load_code(code: Code):
+    if isinstance(code, bytes):
+        return marshal.loads(code)
+    return compile(code, "<submission>", "exec")
+
+
+def _run(request: dict) -> dict:
+    output = _Output(request.get("max_output", SANDBOX_MAX_OUTPUT_CHARS))
+    error = None
+
+    exec_globals = {
+        "__builtins__": {**CodeExecutor.SAFE_BUILTINS, "print": output.print}
+    }
+    try:
+        exec(_load_code(request["code"]), exec_globals)
+    except _OutputLimitExceeded:
+        error = "❌ Output limit exceeded."
+    except MemoryError:
+        error = "❌ Memory limit exceeded."
+    except Exception as e:
+        error = f"❌ Runtime Error: {e}"
+
+    return {"stdout": output.getvalue(), "error": error}
+
+
+@contextmanager
+def _time_limit(seconds: float):
+    """
+    Interrupt the block after `seconds` (worker main thread only);
+    without setitimer the parent's kill is the only limit.
+    """
+    if not hasattr(signal, "setitimer"):
+        yield
+        return
+
+    def expire(signum, frame):
+        raise _CaseTimeout()
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _short_repr(value: Any, limit: int = 200) -> str:
+    text = repr(value)
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+def _run_case(fn: Callable, case: dict, output: "_Output", request: dict) -> dict:
+    """
+    One traced call (result, peak memory), then `repeat` timed calls
+    (best wall/CPU time); every call gets fresh copies of the args.
+    """
+    args, kwargs = case.get("args", []), case.get("kwargs", {})
+    report = {"size": case.get("size"), "passed": None, "error": None}
+    first_output = len(output.parts)
+
+    try:
+        with _time_limit(request["case_timeout"]):
+            call_args, call_kwargs = copy.deepcopy(args), copy.deepcopy(kwargs)
+            tracemalloc.start()
+            try:
+                result = fn(*call_args, **call_kwargs)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+        report["result"] = _short_repr(result)
+        report["peak_kb"] = round(peak / 1024, 1)
+        if "expected" in case:
+            report["passed"] = result == case["expected"]
+
+        walls, cpus = [], []
+        for _ in range(max(1, request["repeat"])):
+            call_args, call_kwargs = copy.deepcopy(args), copy.deepcopy(kwargs)
+            with _time_limit(request["case_timeout"]):
+                wall, cpu = time.perf_counter(), time.process_time()
+                fn(*call_args, **call_kwargs)
+                walls.append(time.perf_counter() - wall)
+                cpus.append(time.process_time() - cpu)
+
+        report["wall_ms"] = round(min(walls) * 1000.0, 3)
+        report["cpu_ms"] = round(min(cpus) * 1000.0, 3)
+
+    except _CaseTimeout:
+        report["error"] = "⏱️ Timed out."
+    except _OutputLimitExceeded:
+        report["error"] = "❌ Output limit exceeded."
+    except MemoryError:
+        report["error"] = "❌ Memory limit exceeded."
+    except Exception as e:
+        report["error"] = f"❌ Runtime Error: {e}"
+
+    if report["error"] and "expected" in case:
+        report["passed"] = False
+    report["stdout"] = "".join(output.parts[first_output:])
+    return report
+
+
+def _tests(request: dict) -> dict:
+    output = _Output(request.get("max_output", SANDBOX_MAX_OUTPUT_CHARS))
+    exec_globals = {
+        "__builtins__": {**CodeExecutor.SAFE_BUILTINS, "print": output.print}
+    }
+
+    # Compiled and defined once; every case calls the same function.
+    # Module-level code gets the same limit as one case.
+    try:
+        with _time_limit(request["case_timeout"]):
+            exec(_load_code(request["code"]), exec_globals)
+        fn = exec_globals.get(request["entry"])
+        if not callable(fn):
+            raise NameError(f"function '{request['entry']}' is not defined")
+    except _CaseTimeout:
+        return {"error": TIMEOUT_ERROR, "cases": []}
+    except SyntaxError as e:
+        return {"error": f"❌ Syntax Error: {e}", "cases": []}
+    except Exception as e:
+        return {"error": f"❌ Runtime Error: {e}", "cases": []}
+
+    return {
+        "error": None,
+        "cases": [_run_case(fn, case, output, request) for case in request["cases"]],
+    }
+
+
+# Worker operations, by request "op"
+_OPS = {
+    "run": _run,
+    "tests": _tests,
+}
+
+
+def _worker_main(conn, memory_mb: int):
+    _apply_limits(memory_mb)
+    conn.send("ready")
+
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+
+        _cpu_budget(request.get("timeout", 1.0))
+        try:
+            reply = _OPS[request["op"]](request)
+        except BaseException as e:  # keep the worker alive for the next run
+            reply = {"stdout": "", "error": f"❌ Runtime Error: {e}"}
+        conn.send(reply)
+
+
+class _Worker:
+    def __init__(self, ctx, memory_mb: int):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main, args=(child, memory_mb), daemon=True
+        )
+        self.process.start()
+        child.close()
+        self.ready = False
+
+    def wait_ready(self):
+        """
+        Interpreter startup doesn't count against a run's timeout.
+        """
+        if self.ready:
+            return
+        if not self.conn.poll(SANDBOX_START_TIMEOUT_SEC) or self.conn.recv() != "ready":
+            raise EOFError("sandbox worker failed to start")
+        self.ready = True
+
+    def kill(self):
+        self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+# ---------------------------
+# Pool
+# ---------------------------
+
+class SandboxPool:
+    """
+    Warm worker processes for running candidate code.
+
+    - Workers are started ahead of time ("spawn", so they don't
+      inherit the server's memory) and reused across runs
+    - Each worker has an address-space cap and, per run, a CPU-time
+      cap; stdout is captured per run
+    - A run that overruns its wall-clock timeout (or crashes its
+      worker) gets the worker killed and replaced, so runaway code
+      never keeps burning a core
+    """
+
+    def __init__(
+        self,
+        size: int = SANDBOX_WORKERS,
+        memory_mb: int = SANDBOX_MEMORY_MB,
+    ):
+        self.size = max(1, size)
+        self.memory_mb = memory_mb
+        self._ctx = multiprocessing.get_context("spawn")
+
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        for _ in range(self.size):
+            self._idle.put(_Worker(self._ctx, memory_mb))
+
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.timeouts = 0
+        self.crashes = 0
+        self.latency = LatencyStats()
+
+    def submit(self, request: dict, timeout_sec: float) -> dict:
+        """
+        Send one request to an idle worker and wait for the reply.
+        Raises CodeExecutionTimeout / SandboxBusy.
+        """
+        try:
+            worker = self._idle.get(timeout=SANDBOX_QUEUE_TIMEOUT_SEC)
+        except queue.Empty:
+            raise SandboxBusy("All sandbox workers are busy")
+
+        request = {**request, "timeout": timeout_sec}
+        started = time.perf_counter()
+        healthy = False
+        try:
+            worker.wait_ready()
+            started = time.perf_counter()
+            worker.conn.send(request)
+            if not worker.conn.poll(timeout_sec):
+                with self._lock:
+                    self.timeouts += 1
+                raise CodeExecutionTimeout()
+            reply = worker.conn.recv()
+            healthy = True
+            return reply
+
+        except (EOFError, OSError):
+            # Killed by an rlimit (SIGXCPU, out of memory in C code, ...)
+            with self._lock:
+                self.crashes += 1
+            return {"stdout": "", "error": CRASH_ERROR}
+
+        finally:
+            with self._lock:
+                self.runs += 1
+                self.latency.record((time.perf_counter() - started) * 1000.0)
+            if not healthy:
+                worker.kill()
+                worker = _Worker(self._ctx, self.memory_mb)
+            self._idle.put(worker)
+
+    def run(self, code: Code, timeout_sec: float = 2) -> Tuple[str, Optional[str]]:
+        try:
+            reply = self.submit({"op": "run", "code": code}, timeout_sec)
+        except CodeExecutionTimeout:
+            return "", TIMEOUT_ERROR
+        return reply["stdout"], reply["error"]
+
+    def run_tests(
+        self,
+        code: Code,
+        entry: str,
+        cases: List[dict],
+        case_timeout_sec: float = 2.0,
+        repeat: int = 3,
+    ) -> dict:
+        """
+        Run `entry(*args, **kwargs)` from the submission for every
+        case ({"args", "kwargs", "expected", "size"}, all optional)
+        in one warm worker. See test_summary() for the result shape.
+        """
+        request = {
+            "op": "tests",
+            "code": code,
+            "entry": entry,
+            "cases": cases,
+            "case_timeout": case_timeout_sec,
+            "repeat": repeat,
+        }
+        # Backstop for code that swallows the per-case interrupt
+        # (definition step + every case); also the CPU rlimit
+        timeout_sec = case_timeout_sec * ((repeat + 1) * max(1, len(cases)) + 1) + 1.0
+        request["timeout"] = timeout_sec
+        try:
+            reply = self.submit(request, timeout_sec)
+        except CodeExecutionTimeout:
+            reply = {"error": TIMEOUT_ERROR, "cases": []}
+        return test_summary(reply)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.size,
+                "idle": self._idle.qsize(),
+                "runs": self.runs,
+                "timeouts": self.timeouts,
+                "crashes": self.crashes,
+                "latency": self.latency.stats(),
+            }
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().kill()
+            except queue.Empty:
+                return
+
+
+_pool: Optional[SandboxPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_sandbox_pool() -> SandboxPool:
+    """
+    Process-wide sandbox pool (workers start on first use).
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SandboxPool()
+        return _pool
+
+
+# ---------------------------
+# Submission cache
+# ---------------------------
+
+def source_hash(code: str) -> str:
+    """
+    Hash of the code's AST, so formatting and comment edits map to
+    the same key. Code that doesn't parse hashes its raw text.
+    """
+    try:
+        normalized = ast.dump(ast.parse(code))
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        normalized = code
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def inputs_hash(*inputs: Any) -> str:
+    """
+    Hash of what a result depends on besides the code (test set,
+    timeouts, problem text).
+    """
+    payload = json.dumps(inputs, sort_keys=True, default=repr)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def is_cacheable(error: Optional[str]) -> bool:
+    """
+    Timeouts, crashes and busy pools depend on load, not the code.
+    """
+    return not error or not (
+        error.startswith(("⏱️", "⏳")) or error == CRASH_ERROR
+    )
+
+
+class SubmissionCache:
+    """
+    LRU of recent submissions, keyed by source_hash().
+
+    Each entry holds the compiled code object (marshalled, so workers
+    skip compilation) and results by field, e.g.
+    "run:<inputs_hash>" → execution result, "tests:<inputs_hash>" →
+    test summary, "review:<inputs_hash>" → review text.
+    Identical (or reformatted) resubmissions are answered from here
+    without the sandbox or the LLM.
+    """
+
+    def __init__(self, max_items: int = SUBMISSION_CACHE_ITEMS):
+        self.max_items = max_items
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, key: str) -> Dict[str, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = {}
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+        self._entries.move_to_end(key)
+        return entry
+
+    def compiled(self, key: str, code: str) -> Code:
+        """
+        Marshalled code object for the submission (compiled once per
+        key); the source itself if it doesn't compile, so the worker
+        reports the error.
+        """
+        with self._lock:
+            compiled = self._entry(key).get("compiled")
+        if compiled is not None:
+            return compiled
+
+        try:
+            compiled = marshal.dumps(compile(code, "<submission>", "exec"))
+        except (SyntaxError, ValueError, RecursionError, MemoryError):
+            return code
+
+        with self._lock:
+            self._entry(key)["compiled"] = compiled
+        return compiled
+
+    def get(self, key: str, field: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or field not in entry:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            # Callers get their own copy (results may be mutated)
+            return copy.deepcopy(entry[field])
+
+    def put(self, key: str, field: str, value: Any):
+        with self._lock:
+            self._entry(key)[field] = copy.deepcopy(value)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "items": len(self._entries),
+            }
+
+
+_submission_cache: Optional[SubmissionCache] = None
+_submission_cache_lock = threading.Lock()
+
+
+def get_submission_cache() -> SubmissionCache:
+    global _submission_cache
+    with _submission_cache_lock:
+        if _submission_cache is None:
+            _submission_cache = SubmissionCache()
+        return _submission_cache
+
+
+# ---------------------------
+# Test results
+# ---------------------------
+
+# Input sizes for scaling_cases()
+SCALING_SIZES = (100, 300, 1000, 3000, 10000)
+# Below this the largest case is all timer noise
+MIN_MEASURABLE_MS = 0.05
+
+COMPLEXITY_MODELS: Dict[str, Callable[[float], float]] = {
+    "O(1)": lambda n: 1.0,
+    "O(log n)": lambda n: math.log2(n),
+    "O(n)": lambda n: n,
+    "O(n log n)": lambda n: n * math.log2(n),
+    "O(n^2)": lambda n: n ** 2,
+    "O(n^3)": lambda n: n ** 3,
+}
+
+
+def scaling_cases(
+    make_args: Callable[[int], list], sizes: Sequence[int] = SCALING_SIZES
+) -> List[dict]:
+    """
+    Cases of growing input size for estimate_complexity().
+    """
+    return [{"args": make_args(n), "size": n} for n in sizes]
+
+
+def estimate_complexity(sizes: Sequence[int], times_ms: Sequence[float]) -> Optional[dict]:
+    """
+    Empirical Big-O: fits log(t) = log(c) + log(f(n)) for each model
+    and picks the smallest squared error. Also reports the log-log
+    slope (≈ the polynomial degree). None with fewer than 3 sizes.
+    """
+    points = [(n, t) for n, t in zip(sizes, times_ms) if n and n > 1 and t]
+    if len({n for n, _ in points}) < 3:
+        return None
+
+    if max(t for _, t in points) < MIN_MEASURABLE_MS:
+        return {"big_o": None, "note": "runtimes too small to fit; use larger inputs"}
+
+    log_n = [math.log(n) for n, _ in points]
+    log_t = [math.log(t) for _, t in points]
+
+    errors = {}
+    for name, model in COMPLEXITY_MODELS.items():
+        offsets = [lt - math.log(model(n)) for (n, _), lt in zip(points, log_t)]
+        mean = sum(offsets) / len(offsets)
+        errors[name] = sum((o - mean) ** 2 for o in offsets) / len(offsets)
+
+    mean_n = sum(log_n) / len(log_n)
+    mean_t = sum(log_t) / len(log_t)
+    slope = sum((x - mean_n) * (y - mean_t) for x, y in zip(log_n, log_t)) / sum(
+        (x - mean_n) ** 2 for x in log_n
+    )
+
+    return {
+        "big_o": min(errors, key=errors.get),
+        "loglog_slope": round(slope, 2),
+        "fit_error": {name: round(err, 4) for name, err in errors.items()},
+    }
+
+
+def test_summary(reply: dict) -> dict:
+    """
+    {"error", "cases": [{size, passed, result, error, stdout, wall_ms,
+    cpu_ms, peak_kb}], "passed", "total", "complexity"}; "total"
+    counts cases with an expected value.
+    """
+    cases = reply.get("cases", [])
+    checked = [case for case in cases if case.get("passed") is not None]
+    sized = [case for case in cases if case.get("size") and case.get("wall_ms") is not None]
+
+    return {
+        **reply,
+        "passed": sum(bool(case["passed"]) for case in checked),
+        "total": len(checked),
+        "complexity": estimate_complexity(
+            [case["size"] for case in sized], [case["wall_ms"] for case in sized]
+        ),
+    }
+
+
+def test_report(summary: dict) -> str:
+    """
+    Plain-text test results for the code review prompt
+    (EXECUTION OUTPUT), with measured time instead of a guess.
+    """
+    if summary.get("error"):
+        return summary["error"]
+
+    lines = []
+    if summary["total"]:
+        lines.append(f"Passed {summary['passed']}/{summary['total']} test cases.")
+
+    for index, case in enumerate(summary["cases"], 1):
+        label = f"Case {index}" + (f" (n={case['size']})" if case.get("size") else "")
+        if case.get("error"):
+            lines.append(f"{label}: {case['error']}")
+            continue
+        status = {True: "passed", False: "FAILED", None: "ran"}[case["passed"]]
+        lines.append(
+            f"{label}: {status}, returned {case['result']}, "
+            f"{case['wall_ms']} ms wall, {case['cpu_ms']} ms CPU, "
+            f"{case['peak_kb']} KB peak"
+        )
+
+    complexity = summary.get("complexity")
+    if complexity and complexity.get("big_o"):
+        lines.append(
+            f"Measured time complexity: ~{complexity['big_o']} "
+            f"(log-log slope {complexity['loglog_slope']})"
+        )
+    elif complexity:
+        lines.append(f"Measured time complexity: n/a ({complexity['note']})")
+
+    return "\n".join(lines)
+
+
 class CodeExecutor:
     """
     Executes user-submitted Python code in a restricted environment.
     NOTE: This is NOT a full sandbox. Docker isolation is required for production.
+    Code runs in SandboxPool worker processes with restricted builtins.
     """
 
     # Allowed safe builtins
@@ -42,29 +718,165 @@ class CodeExecutor:
         Executes Python code safely with timeout.
         Returns: (stdout, error)
         """
+        cache = get_submission_cache()
+        key = source_hash(code_snippet)
+        field = "run:" + inputs_hash(timeout_sec)
 
-        output_buffer = io.StringIO()
-        error_message = None
+        cached = cache.get(key, field)
+        if cached is not None:
+            return tuple(cached)
 
-        def target():
-            nonlocal error_message
-            try:
-                exec_globals = {
-                    "__builtins__": CodeExecutor.SAFE_BUILTINS
-                }
+        try:
+            result = get_sandbox_pool().run(cache.compiled(key, code_snippet), timeout_sec)
+        except SandboxBusy as e:
+            return "", f"⏳ {e}, try again shortly."
+
+        if is_cacheable(result[1]):
+            cache.put(key, field, list(result))
+        return result
+
+    @staticmethod
+    def run_tests(
+        code_snippet: str,
+        entry: str,
+        cases: List[dict],
+        case_timeout_sec: float = 2.0,
+        repeat: int = 3,
+    ) -> dict:
+        """
+        Runs a submission's `entry` function against test cases.
+        Returns the test_summary() dict (test_report() renders it).
+        """
+        cache = get_submission_cache()
+        key = source_hash(code_snippet)
+        field = "tests:" + inputs_hash(entry, cases, case_timeout_sec, repeat)
+
+        cached = cache.get(key, field)
+        if cached is not None:
+            return cached
+
+        try:
+            summary = get_sandbox_pool().run_tests(
+                cache.compiled(key, code_snippet), entry, cases, case_timeout_sec, repeat
+            )
+        except SandboxBusy as e:
+            return test_summary({"error": f"⏳ {e}, try again shortly.", "cases": []})
+
+        if is_cacheable(summary["error"]) and all(
+            is_cacheable(case["error"]) for case in summary["cases"]
+        ):
+            cache.put(key, field, summary)
+        return summary
+
+
+# ---------------------------
+# Offline benchmark
+# ---------------------------
+
+ADVERSARIAL_SNIPPETS = {
+    "ok": "print(sum(i * i for i in range(10000)))",
+    "error": "print(1 / 0)",
+    "spin": "while True:\n    pass",
+    "memory": "x = []\nwhile True:\n    x.append('m' * 10 ** 6)",
+    "flood": "while True:\n    print('spam' * 100)",
+}
+
+
+def benchmark(
+    submissions: int = 100,
+    workers: int = SANDBOX_WORKERS,
+    timeout_sec: float = 0.5,
+    adversarial: float = 0.3,
+) -> Dict[str, Any]:
+    """
+    Submissions/sec with `adversarial` of them hostile (infinite
+    loops, memory bombs, output floods), from as many client threads
+    as there are workers.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    pool = SandboxPool(size=workers)
+    hostile = [name for name in ADVERSARIAL_SNIPPETS if name != "ok"]
+    every = round(1 / adversarial) if adversarial > 0 else 0
+    jobs = [
+        hostile[i % len(hostile)] if every and i % every == 0 else "ok"
+        for i in range(submissions)
+    ]
+    outcomes: Dict[str, Dict[str, int]] = {}
+
+    def one(name: str):
+        stdout, error = pool.run(ADVERSARIAL_SNIPPETS[name], timeout_sec)
+        result = "ok" if error is None else error.split(":")[0].strip("❌⏱️ .")
+        counts = outcomes.setdefault(name, {})
+        counts[result] = counts.get(result, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(one, jobs))
+    elapsed = time.perf_counter() - started
+    pool.close()
+
+    return {
+        "submissions": submissions,
+        "adversarial": adversarial,
+        "seconds": round(elapsed, 2),
+        "submissions_per_sec": round(submissions / elapsed, 1),
+        "outcomes": outcomes,
+        **pool.stats(),
+    }
+
+
+# Reference solutions with known complexity, for checking the estimator
+COMPLEXITY_SAMPLES = {
+    "O(n)": "def solve(xs):\n    total = 0\n    for x in xs:\n        total += x\n    return total",
+    "O(n log n)": (
+        "def solve(xs):\n    total = 0\n    for x in xs:\n        lo, hi = 0, len(xs)\n"
+        "        while lo < hi:\n            mid = (lo + hi) // 2\n"
+        "            if mid < x:\n                lo = mid + 1\n"
+        "            else:\n                hi = mid\n        total += lo\n    return total"
+    ),
+    "O(n^2)": (
+        "def solve(xs):\n    count = 0\n    for a in xs:\n        for b in xs:\n"
+        "            if a < b:\n                count += 1\n    return count"
+    ),
+}
+
+
+def check_estimator(sizes: Sequence[int] = (200, 400, 800, 1600, 3200)) -> Dict[str, Any]:
+    pool = SandboxPool(size=1)
+    cases = scaling_cases(lambda n: [[(i * 7919) % n for i in range(n)]], sizes)
 
-                with contextlib.redirect_stdout(output_buffer):
-                    exec(code_snippet, exec_globals)
+    results = {}
+    for expected, code in COMPLEXITY_SAMPLES.items():
+        started = time.perf_counter()
+        summary = pool.run_tests(code, "solve", cases, case_timeout_sec=10.0)
+        results[expected] = {
+            "estimated": (summary["complexity"] or {}).get("big_o"),
+            "loglog_slope": (summary["complexity"] or {}).get("loglog_slope"),
+            "seconds": round(time.perf_counter() - started, 2),
+        }
+    pool.close()
+    return results
 
-            except Exception as e:
-                error_message = f"❌ Runtime Error: {e}"
 
-        thread = threading.Thread(target=target)
-        thread.start()
-        thread.join(timeout=timeout_sec)
+if __name__ == "__main__":
+    import argparse
+    import json
 
-        if thread.is_alive():
-            error_message = "⏱️ Execution timed out."
-            return "", error_message
+    parser = argparse.ArgumentParser(description="Benchmark the code sandbox")
+    parser.add_argument("--submissions", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=SANDBOX_WORKERS)
+    parser.add_argument("--timeout", type=float, default=0.5)
+    parser.add_argument("--adversarial", type=float, default=0.3)
+    parser.add_argument(
+        "--complexity", action="store_true",
+        help="check Big-O estimates on reference solutions instead",
+    )
+    args = parser.parse_args()
 
-        return output_buffer.getvalue(), error_message
+    if args.complexity:
+        print(json.dumps(check_estimator(), indent=2))
+    else:
+        print(json.dumps(benchmark(
+            args.submissions, args.workers, args.timeout, args.adversarial
+        ), indent=2))
@@ -1,10 +1,29 @@
+import os
+import time
+import warnings
 import cv2
 import numpy as np
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 
 from backend.config.setting import DEVICE
 
 
+# Tracking defaults (overridable via environment)
+EMOTION_DETECT_EVERY = int(os.getenv("EMOTION_DETECT_EVERY", "10"))
+EMOTION_DETECT_SCALE = float(os.getenv("EMOTION_DETECT_SCALE", "0.5"))
+EMOTION_ROI_PADDING = float(os.getenv("EMOTION_ROI_PADDING", "0.5"))
+
+# Smallest face (full-resolution pixels) the detector looks for
+MIN_FACE_PX = 60
+# Haar cascade window size: faces can't be found below this
+CASCADE_WINDOW_PX = 24
+
+# Frames per summary window (≈1 s of 30 fps video)
+BATCH_WINDOW_FRAMES = 30
+
+Box = Tuple[int, int, int, int]  # x, y, w, h
+
+
 class EmotionAnalyzer:
     """
     Lightweight emotion & stress analyzer using facial cues.
@@ -21,29 +40,65 @@ class EmotionAnalyzer:
 
         print(f"[INFO] EmotionAnalyzer initialized on {DEVICE}")
 
-    def analyze(self, frame: np.ndarray) -> Dict[str, float]:
+    def tracker(self, **kwargs) -> "FaceTracker":
         """
-        Analyze a single video frame.
-        Returns a stress score between 0.0 and 1.0
+        New face track for one video stream (see FaceTracker).
         """
+        return FaceTracker(self, **kwargs)
 
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    def detect(
+        self,
+        gray: np.ndarray,
+        scale: float = 1.0,
+        min_size: int = MIN_FACE_PX,
+        max_size: Optional[int] = None,
+    ) -> List[Box]:
+        """
+        Faces in a grayscale image, searched on a copy downscaled by
+        `scale`; boxes are in `gray` coordinates.
+        """
+        small = gray
+        if scale < 1.0:
+            small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+        min_px = max(CASCADE_WINDOW_PX, int(min_size * scale))
+        max_px = int(max_size * scale) if max_size else 0
         faces = self.face_detector.detectMultiScale(
-            gray,
+            small,
             scaleFactor=1.2,
             minNeighbors=5,
-            minSize=(60, 60),
+            minSize=(min_px, min_px),
+            maxSize=(max_px, max_px) if max_px > min_px else None,
         )
+        return [tuple(int(round(v / scale)) for v in face) for face in faces]
+
+    def analyze(
+        self, frame: np.ndarray, tracker: Optional["FaceTracker"] = None
+    ) -> Dict[str, float]:
+        """
+        Analyze a single video frame.
+        Returns a stress score between 0.0 and 1.0
+
+        With a tracker, the face is followed from the previous frame
+        instead of searched for in the whole frame.
+        """
 
-        if len(faces) == 0:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if tracker is not None:
+            face = tracker.locate(gray)
+        else:
+            faces = self.detect(gray)
+            # Take the first detected face
+            face = faces[0] if faces else None
+
+        if face is None:
             return {
                 "stress_score": 0.0,
                 "confidence": 0.5,
                 "face_detected": False,
             }
 
-        # Take the first detected face
-        (x, y, w, h) = faces[0]
+        (x, y, w, h) = face
         face_roi = gray[y : y + h, x : x + w]
 
         # Heuristic: edge density → facial tension proxy
@@ -51,11 +106,389 @@ class EmotionAnalyzer:
         edge_density = np.mean(edges > 0)
 
         # Normalize stress score
-        stress_score = min(max(edge_density * 2.5, 0.0), 1.0)
+        stress_score = float(_stress(edge_density))
         confidence = 1.0 - stress_score
 
         return {
             "stress_score": round(stress_score, 3),
             "confidence": round(confidence, 3),
             "face_detected": True,
+            "face_box": [int(v) for v in face],
+        }
+
+
+    def analyze_batch(
+        self,
+        frames: np.ndarray,
+        tracker: Optional["FaceTracker"] = None,
+        smoothing: str = "ema",
+        alpha: float = 0.3,
+        median_frames: int = 5,
+        window: int = BATCH_WINDOW_FRAMES,
+    ) -> Dict[str, object]:
+        """
+        Analyze a stack of frames (N×H×W×3, BGR) in one call.
+
+        - Grayscale conversion runs once over the whole stack
+        - Faces are followed with `tracker` (a new one if not given;
+          pass the stream's tracker to carry the track across calls)
+        - Face crops are resized to a common size and edge-detected
+          as one image; densities are reduced per frame with NumPy
+
+        Returns per-frame raw and smoothed stress (EMA with `alpha`,
+        or a running median over `median_frames`) plus a summary per
+        `window` frames. Frames without a face don't move the
+        smoothed series; frames before the first face have no value
+        (None) and are left out of the window summaries.
+        """
+        frames = np.ascontiguousarray(frames)
+        n, height, width = frames.shape[:3]
+        if n == 0:
+            return {"raw_stress": [], "stress": [], "face_detected": [], "windows": []}
+
+        gray = cv2.cvtColor(
+            frames.reshape(n * height, width, 3), cv2.COLOR_BGR2GRAY
+        ).reshape(n, height, width)
+
+        tracker = tracker or self.tracker()
+        boxes = [tracker.locate(gray[i]) for i in range(n)]
+        found = np.array([box is not None for box in boxes])
+
+        raw = np.full(n, np.nan)
+        if found.any():
+            raw[found] = _stress(_batch_edge_density(gray, boxes))
+
+        smoothed = _ema(raw, alpha) if smoothing == "ema" else _running_median(raw, median_frames)
+
+        windows = []
+        for start in range(0, n, window):
+            part, seen = smoothed[start : start + window], found[start : start + window]
+            scored = not np.isnan(part).all()
+            windows.append({
+                "start": start,
+                "end": start + len(part),
+                "mean_stress": round(float(np.nanmean(part)), 3) if scored else None,
+                "max_stress": round(float(np.nanmax(part)), 3) if scored else None,
+                "face_ratio": round(float(seen.mean()), 3),
+            })
+
+        return {
+            "raw_stress": _rounded(raw),
+            "stress": _rounded(smoothed),
+            "face_detected": found.tolist(),
+            "windows": windows,
+        }
+
+
+def _rounded(series: np.ndarray) -> List[Optional[float]]:
+    return [None if np.isnan(v) else round(float(v), 3) for v in series]
+
+
+def _stress(edge_density):
+    return np.clip(edge_density * 2.5, 0.0, 1.0)
+
+
+def _batch_edge_density(gray: np.ndarray, boxes: List[Optional[Box]]) -> np.ndarray:
+    """
+    Canny edge density of every face crop, as one Canny call over the
+    crops stacked vertically. Crops are resized to the batch's median
+    face size (close to per-frame densities) and get a 1 px replicated
+    border so neighbours don't create edges inside them.
+    """
+    size = int(np.median([box[2] for box in boxes if box is not None]))
+    crops = [
+        cv2.copyMakeBorder(
+            cv2.resize(gray[i][y : y + h, x : x + w], (size, size), interpolation=cv2.INTER_AREA),
+            1, 1, 0, 0, cv2.BORDER_REPLICATE,
+        )
+        for i, (x, y, w, h) in ((i, box) for i, box in enumerate(boxes) if box is not None)
+    ]
+    stack = np.concatenate(crops)
+
+    edges = cv2.Canny(stack, 50, 150).reshape(len(crops), size + 2, size)
+    return (edges[:, 1:-1] > 0).mean(axis=(1, 2))
+
+
+def _ema(values: np.ndarray, alpha: float) -> np.ndarray:
+    out = np.empty_like(values)
+    level = None
+    for i, value in enumerate(values):
+        if not np.isnan(value):
+            level = value if level is None else alpha * value + (1 - alpha) * level
+        out[i] = np.nan if level is None else level
+    return out
+
+
+def _running_median(values: np.ndarray, frames: int) -> np.ndarray:
+    frames = max(1, frames)
+    padded = np.concatenate([np.full(frames - 1, np.nan), values])
+    windows = np.lib.stride_tricks.sliding_window_view(padded, frames)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN windows
+        out = np.nanmedian(windows, axis=1)
+
+    # Windows without a face carry the last value forward (still
+    # NaN before the first face)
+    last = np.where(np.isnan(out), 0, np.arange(len(out)))
+    return out[np.maximum.accumulate(last)]
+
+
+class FaceTracker:
+    """
+    Follows one face across the frames of a stream.
+
+    Full-frame detection (on a frame downscaled by `scale`) runs
+    only every `detect_every` frames or when the track is lost. In
+    between, the face is searched for in the last box padded by
+    `padding` (a fraction of the face size), at sizes close to the
+    last one, which is a small fraction of the full search.
+    """
+
+    def __init__(
+        self,
+        analyzer: EmotionAnalyzer,
+        detect_every: int = EMOTION_DETECT_EVERY,
+        scale: float = EMOTION_DETECT_SCALE,
+        padding: float = EMOTION_ROI_PADDING,
+    ):
+        self.analyzer = analyzer
+        self.detect_every = max(1, detect_every)
+        self.scale = scale
+        self.padding = padding
+
+        self.box: Optional[Box] = None
+        self.since_detect = 0
+
+        self.frames = 0
+        self.full_detections = 0
+        self.losses = 0
+
+    def locate(self, gray: np.ndarray) -> Optional[Box]:
+        self.frames += 1
+
+        if self.box is not None and self.since_detect < self.detect_every:
+            box = self._search_near(gray, self.box)
+            if box is not None:
+                self.box = box
+                self.since_detect += 1
+                return box
+            self.losses += 1
+
+        self.full_detections += 1
+        faces = self.analyzer.detect(gray, self.scale)
+        self.box = faces[0] if faces else None
+        self.since_detect = 0
+        return self.box
+
+    def _search_near(self, gray: np.ndarray, box: Box) -> Optional[Box]:
+        x, y, w, h = box
+        pad_x, pad_y = int(w * self.padding), int(h * self.padding)
+        x0, y0 = max(0, x - pad_x), max(0, y - pad_y)
+        x1 = min(gray.shape[1], x + w + pad_x)
+        y1 = min(gray.shape[0], y + h + pad_y)
+
+        faces = self.analyzer.detect(
+            gray[y0:y1, x0:x1],
+            self.scale,
+            min_size=max(MIN_FACE_PX, int(w * 0.7)),
+            max_size=int(w * 1.4),
+        )
+        if not faces:
+            return None
+
+        # The candidate closest to where the face was
+        cx, cy = x + w / 2 - x0, y + h / 2 - y0
+        fx, fy, fw, fh = min(
+            faces, key=lambda f: (f[0] + f[2] / 2 - cx) ** 2 + (f[1] + f[3] / 2 - cy) ** 2
+        )
+        return (fx + x0, fy + y0, fw, fh)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "frames": self.frames,
+            "full_detections": self.full_detections,
+            "track_losses": self.losses,
         }
+
+
+# ---------------------------
+# Offline benchmark
+# ---------------------------
+
+def _draw_face(img: np.ndarray, cx: int, cy: int, s: int):
+    cv2.ellipse(img, (cx, cy), (int(s * 0.8), s), 0, 0, 360, (150, 170, 200), -1)
+    for side in (-0.35, 0.35):
+        ex, ey = int(cx + side * s), int(cy - 0.2 * s)
+        cv2.ellipse(img, (ex, ey), (int(0.18 * s), int(0.09 * s)), 0, 0, 360, (40, 40, 40), -1)
+        cv2.line(
+            img, (ex - int(0.2 * s), ey - int(0.22 * s)), (ex + int(0.2 * s), ey - int(0.25 * s)),
+            (30, 30, 30), max(2, int(0.06 * s)),
+        )
+    cv2.line(
+        img, (cx, cy - int(0.05 * s)), (cx, cy + int(0.25 * s)),
+        (90, 100, 130), max(2, int(0.05 * s)),
+    )
+    cv2.ellipse(
+        img, (cx, cy + int(0.5 * s)), (int(0.3 * s), int(0.08 * s)),
+        0, 0, 360, (60, 60, 120), -1,
+    )
+
+
+def synthetic_frames(count: int = 300, width: int = 640, height: int = 480) -> List[np.ndarray]:
+    """
+    A drawn face drifting around a textured background, absent for
+    a stretch in the middle (candidate looks away).
+    """
+    rng = np.random.default_rng(0)
+    background = rng.integers(60, 120, (height, width, 3), dtype=np.uint8)
+    background = cv2.GaussianBlur(background, (7, 7), 0)
+
+    frames = []
+    for i in range(count):
+        frame = background.copy()
+        if not (0.4 * count <= i < 0.47 * count):
+            t = i / 30.0
+            cx = int(width / 2 + width * 0.2 * np.sin(t * 0.9))
+            cy = int(height / 2 + height * 0.1 * np.sin(t * 1.3))
+            _draw_face(frame, cx, cy, int(90 + 20 * np.sin(t * 0.5)))
+        frames.append(cv2.GaussianBlur(frame, (5, 5), 0))
+    return frames
+
+
+def video_frames(path: str, count: int) -> List[np.ndarray]:
+    capture = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < count:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frames.append(frame)
+    capture.release()
+    return frames
+
+
+def _iou(a, b) -> float:
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    w = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    h = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = w * h
+    return inter / float(aw * ah + bw * bh - inter) if inter else 0.0
+
+
+def benchmark(
+    frames: List[np.ndarray],
+    detect_every: int = EMOTION_DETECT_EVERY,
+    scale: float = EMOTION_DETECT_SCALE,
+) -> Dict[str, object]:
+    """
+    Frames/sec of per-frame detection vs tracking, and how closely
+    tracking agrees with per-frame detection.
+    """
+    analyzer = EmotionAnalyzer()
+
+    started = time.perf_counter()
+    baseline = [analyzer.analyze(frame) for frame in frames]
+    baseline_sec = time.perf_counter() - started
+
+    tracker = analyzer.tracker(detect_every=detect_every, scale=scale)
+    started = time.perf_counter()
+    tracked = [analyzer.analyze(frame, tracker) for frame in frames]
+    tracked_sec = time.perf_counter() - started
+
+    both = [
+        (a, b) for a, b in zip(baseline, tracked)
+        if a["face_detected"] and b["face_detected"]
+    ]
+    ious = [_iou(a["face_box"], b["face_box"]) for a, b in both]
+
+    return {
+        "frames": len(frames),
+        "per_frame_fps": round(len(frames) / baseline_sec, 1),
+        "tracking_fps": round(len(frames) / tracked_sec, 1),
+        "speedup": round(baseline_sec / tracked_sec, 2),
+        "detection_agreement": round(
+            np.mean([
+                a["face_detected"] == b["face_detected"] for a, b in zip(baseline, tracked)
+            ]), 3
+        ),
+        "box_iou_mean": round(float(np.mean(ious)), 3) if ious else None,
+        "box_iou_over_0_5": round(float(np.mean([v >= 0.5 for v in ious])), 3) if ious else None,
+        "stress_abs_diff_mean": round(float(np.mean(
+            [abs(a["stress_score"] - b["stress_score"]) for a, b in both]
+        )), 3) if both else None,
+        "tracker": tracker.stats(),
+    }
+
+
+def _jitter(series: np.ndarray) -> Optional[float]:
+    return round(float(np.abs(np.diff(series)).mean()), 4) if len(series) > 1 else None
+
+
+def benchmark_batch(
+    frames: List[np.ndarray], batch_frames: int = 90
+) -> Dict[str, object]:
+    """
+    Frames/sec of per-frame analyze() vs analyze_batch() over
+    `batch_frames`-frame chunks (one tracker for the whole stream),
+    and how much smoothing calms the stress series.
+    """
+    analyzer = EmotionAnalyzer()
+
+    started = time.perf_counter()
+    per_frame = [analyzer.analyze(frame) for frame in frames]
+    per_frame_sec = time.perf_counter() - started
+
+    stack = np.stack(frames)
+    tracker = analyzer.tracker()
+    raw, smoothed = [], []
+    started = time.perf_counter()
+    for start in range(0, len(frames), batch_frames):
+        result = analyzer.analyze_batch(stack[start : start + batch_frames], tracker)
+        raw.extend(result["raw_stress"])
+        smoothed.extend(result["stress"])
+    batch_sec = time.perf_counter() - started
+
+    both = [
+        (a["stress_score"], b) for a, b in zip(per_frame, raw)
+        if a["face_detected"] and b is not None
+    ]
+    raw_series = np.array([v for v in raw if v is not None])
+    smoothed_series = np.array([v for v in smoothed if v is not None])
+
+    return {
+        "frames": len(frames),
+        "batch_frames": batch_frames,
+        "per_frame_fps": round(len(frames) / per_frame_sec, 1),
+        "batch_fps": round(len(frames) / batch_sec, 1),
+        "speedup": round(per_frame_sec / batch_sec, 2),
+        "stress_abs_diff_mean": round(float(np.mean(
+            [abs(a - b) for a, b in both]
+        )), 3) if both else None,
+        "frame_to_frame_jitter": {
+            "raw": _jitter(raw_series),
+            "smoothed": _jitter(smoothed_series),
+        },
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Benchmark face tracking vs per-frame detection")
+    parser.add_argument("--video", help="video file (default: synthetic frames)")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--detect-every", type=int, default=EMOTION_DETECT_EVERY)
+    parser.add_argument("--scale", type=float, default=EMOTION_DETECT_SCALE)
+    parser.add_argument(
+        "--batch", type=int, default=0, metavar="FRAMES",
+        help="benchmark analyze_batch() over chunks of FRAMES frames instead",
+    )
+    args = parser.parse_args()
+
+    frames = video_frames(args.video, args.frames) if args.video else synthetic_frames(args.frames)
+    if args.batch:
+        print(json.dumps(benchmark_batch(frames, args.batch), indent=2))
+    else:
+        print(json.dumps(benchmark(frames, args.detect_every, args.scale), indent=2))
@@ -0,0 +1,237 @@
+import json
+from typing import Any, Iterable, List, Optional, Tuple
+
+
+Path = Tuple[Any, ...]
+
+_WHITESPACE = " \t\r\n"
+_SCALAR_END = ",]}" + _WHITESPACE
+
+
+class _Frame:
+    __slots__ = ("value", "path", "key", "expect_key")
+
+    def __init__(self, value, path: Path):
+        self.value = value          # dict or list being filled
+        self.path = path
+        self.key: Optional[str] = None
+        self.expect_key = isinstance(value, dict)
+
+    def child_path(self) -> Path:
+        if isinstance(self.value, dict):
+            return self.path + (self.key,)
+        return self.path + (len(self.value),)
+
+    def put(self, value):
+        if isinstance(self.value, dict):
+            if self.key is not None:
+                self.value[self.key] = value
+                self.key = None
+        else:
+            self.value.append(value)
+
+
+class IncrementalJSONParser:
+    """
+    Parses a JSON document that arrives in fragments (a streamed LLM
+    response) and reports each value as soon as it is complete.
+
+    feed() returns `(path, value)` pairs in completion order, e.g.
+    (("summary",), "..."), (("feedback", 0), "..."),
+    (("scores", "clarity"), 7), (("scores",), {...}).
+
+    The document is built up as it parses, so finish() can always
+    return something:
+    - text before the first { or [ (e.g. a ```json fence) and after
+      the root value closes is ignored
+    - a truncated document keeps every completed value; an
+      unterminated string value is kept as is, dangling keys and
+      partial literals are dropped, open containers are closed
+    - a missing comma between members is tolerated
+    """
+
+    def __init__(self):
+        self.root: Any = None
+        self.done = False
+
+        self._stack: List[_Frame] = []
+        self._chunks: List[str] = []   # current string / scalar token
+        self._in_string = False
+        self._string_is_key = False
+        self._escape = False
+        self._in_scalar = False
+
+    # ---------------------------
+    # Scanning
+    # ---------------------------
+
+    def feed(self, text: str) -> List[Tuple[Path, Any]]:
+        events: List[Tuple[Path, Any]] = []
+        i, n = 0, len(text)
+
+        while i < n and not self.done:
+            if self._in_string:
+                i = self._scan_string(text, i, events)
+                continue
+
+            ch = text[i]
+
+            if self._in_scalar:
+                if ch not in _SCALAR_END:
+                    self._chunks.append(ch)
+                    i += 1
+                    continue
+                self._end_scalar(events)
+
+            i += 1
+
+            if not self._stack:
+                if ch in "{[" and self.root is None:
+                    self._open(ch, ())
+                continue  # leading garbage
+
+            top = self._stack[-1]
+
+            if ch in _WHITESPACE or ch == ":":
+                continue
+            if ch == ",":
+                if isinstance(top.value, dict):
+                    top.expect_key = True
+                continue
+            if ch == '"':
+                self._in_string = True
+                self._string_is_key = isinstance(top.value, dict) and (
+                    top.expect_key or top.key is None
+                )
+                self._chunks = ['"']
+                continue
+            if ch in "{[":
+                if self._accepts_value(top):
+                    self._open(ch, top.child_path())
+                continue
+            if ch in "}]":
+                self._close(events)
+                continue
+
+            # Number or literal
+            self._in_scalar = True
+            self._chunks = [ch]
+
+        return events
+
+    def _scan_string(self, text: str, i: int, events) -> int:
+        start = i
+        n = len(text)
+        while i < n:
+            ch = text[i]
+            if self._escape:
+                self._escape = False
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._chunks.append(text[start : i + 1])
+                self._in_string = False
+                self._end_string(events)
+                return i + 1
+            i += 1
+
+        self._chunks.append(text[start:])
+        return n
+
+    def _accepts_value(self, top: _Frame) -> bool:
+        return not isinstance(top.value, dict) or top.key is not None
+
+    def _open(self, ch: str, path: Path):
+        value = {} if ch == "{" else []
+        if self._stack:
+            self._stack[-1].put(value)
+        else:
+            self.root = value
+        self._stack.append(_Frame(value, path))
+
+    def _close(self, events):
+        frame = self._stack.pop()
+        if self._stack:
+            events.append((frame.path, frame.value))
+        else:
+            self.done = True
+
+    def _emit(self, value, events):
+        top = self._stack[-1]
+        if not self._accepts_value(top):
+            return
+        path = top.child_path()
+        top.put(value)
+        events.append((path, value))
+
+    def _end_string(self, events):
+        raw = "".join(self._chunks)
+        self._chunks = []
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = raw[1:-1]
+
+        top = self._stack[-1]
+        if self._string_is_key:
+            top.key = value
+            top.expect_key = False
+        else:
+            self._emit(value, events)
+
+    def _end_scalar(self, events):
+        raw = "".join(self._chunks)
+        self._chunks = []
+        self._in_scalar = False
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return  # not a JSON literal (truncated or garbage): drop it
+        self._emit(value, events)
+
+    # ---------------------------
+    # Result
+    # ---------------------------
+
+    def finish(self) -> Any:
+        """
+        The parsed (or best-effort repaired) document.
+        Raises ValueError if no JSON value was found at all.
+        """
+        if not self.done and self._stack:
+            events: List[Tuple[Path, Any]] = []
+            if self._in_scalar:
+                self._end_scalar(events)
+            elif self._in_string and not self._string_is_key:
+                raw = "".join(self._chunks)
+                if self._escape:
+                    raw = raw[:-1]
+                try:
+                    value = json.loads(raw + '"')
+                except ValueError:
+                    value = raw[1:]
+                self._emit(value, events)
+
+        if self.root is None:
+            raise ValueError("No JSON value found")
+        return self.root
+
+
+def parse_stream(fragments: Iterable[str], on_field=None) -> Any:
+    """
+    Parse streamed JSON, calling `on_field(path, value)` for each
+    completed value; returns the (repaired) document.
+    """
+    parser = IncrementalJSONParser()
+    for fragment in fragments:
+        for path, value in parser.feed(fragment):
+            if on_field is not None:
+                on_field(path, value)
+    return parser.finish()
+
+
+def repair_json(text: str) -> Any:
+    """
+    json.loads that tolerates fences, trailing garbage and truncation.
+    """
+    return parse_stream([text])
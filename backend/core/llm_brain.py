@@ -1,45 +1,59 @@
-import os
 import json
-from typing import Dict, List
+import math
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
 
-import google.generativeai as genai
-from dotenv import load_dotenv
+from backend.config.prompt_loader import PromptManager
+from backend.core.code_engine import get_submission_cache, inputs_hash, source_hash
+from backend.core.json_stream import IncrementalJSONParser, Path
+from backend.core.llm_cache import cache_key, get_llm_cache
+from backend.core.llm_client import LLMClient, get_llm_client
+from backend.core.llm_scheduler import LLMOverloaded, Priority
+from backend.core.prompt_digest import answers_digest, compact_json, profile_text
+from backend.models.interview import AnswerEvaluation
 
-# from backend.config.prompt_loader import PromptManager # NOTE: Using inline prompts for v1.0 simplicity
-
-load_dotenv()
+# NOTE: Inline prompts for v1.0 simplicity; only the code review uses PromptManager
 
 
 # --- v1.0 Simple Functions (as required by main.py) ---
-
-API_KEY = os.getenv("GOOGLE_API_KEY")
-if not API_KEY:
-    raise RuntimeError("GOOGLE_API_KEY not set")
-genai.configure(api_key=API_KEY)
-# NOTE: Using the Gemini 1.5 Pro model.
-MODEL = genai.GenerativeModel("gemini-1.5-pro-latest")
+# NOTE: All calls go through the shared LLM client (model set via LLM_MODEL).
+# `profile` may be the raw resume dict or its precomputed digest.
 
 
-def generate_questions(profile: dict, num_questions: int) -> List[str]:
-    """Generates interview questions based on a resume profile."""
-    prompt = f"""
+QUESTIONS_PROMPT = """
     You are an expert AI interviewer. Based on the following candidate profile, generate exactly {num_questions} technical interview questions.
     The questions should be relevant to the candidate's skills and project experience.
     Return the questions as a JSON list of strings.
 
     Candidate Profile:
-    {json.dumps(profile, indent=2)}
+    {profile}
 
     Example Output:
     ["Question 1", "Question 2", "Question 3", "Question 4"]
     """
-    try:
-        response = MODEL.generate_content(
-            prompt,
-            generation_config={"response_mime_type": "application/json"}
+
+
+def generate_questions(profile: Union[dict, str], num_questions: int) -> List[str]:
+    """Generates interview questions based on a resume profile."""
+    profile = profile_text(profile)
+    prompt = QUESTIONS_PROMPT.format(num_questions=num_questions, profile=profile)
+
+    def ask() -> List[str]:
+        response = get_llm_client().generate_sync(
+            prompt, json_mode=True, priority=Priority.STANDARD
         )
-        questions = json.loads(response.text)
+        questions = json.loads(response)
+        if not isinstance(questions, list):
+            raise ValueError("expected a JSON list of questions")
         return questions
+
+    try:
+        # Same profile (re-upload, retake) → same questions, one LLM call
+        key = cache_key(
+            get_llm_client().provider.model_name,
+            QUESTIONS_PROMPT,
+            {"profile": profile, "num_questions": num_questions},
+        )
+        return get_llm_cache().get_or_compute(key, ask)
     except (json.JSONDecodeError, Exception) as e:
         print(f"[ERROR] Failed to generate questions: {e}")
         # Fallback questions
@@ -51,8 +65,100 @@ def generate_questions(profile: dict, num_questions: int) -> List[str]:
         ]
 
 
-def evaluate_answer(question: str, answer: str, profile: dict) -> dict:
-    """Evaluates a candidate's answer to a question."""
+def _stream_json(
+    prompt: str,
+    priority: Priority,
+    on_value: Optional[Callable[[Path, Any], None]] = None,
+) -> Any:
+    """
+    Streams a JSON-mode response through the incremental parser.
+    A stream that breaks off midway still returns what was parsed.
+    """
+    parser = IncrementalJSONParser()
+    try:
+        for fragment in get_llm_client().stream_generate_sync(
+            prompt, json_mode=True, priority=priority
+        ):
+            for path, value in parser.feed(fragment):
+                if on_value is not None:
+                    on_value(path, value)
+    except LLMOverloaded:
+        raise
+    except Exception as e:
+        if parser.root is None:
+            raise
+        print(f"[WARN] LLM response cut off ({e}); keeping the partial JSON")
+    return parser.finish()
+
+
+def validate_evaluation(raw: Any) -> dict:
+    """
+    Coerces a (possibly repaired) evaluation into AnswerEvaluation:
+    scores rounded and clamped to 0-10, non-numeric and non-finite
+    (NaN/Infinity) scores and empty feedback dropped. Raises ValueError if nothing usable is left.
+    """
+    if not isinstance(raw, dict):
+        raise ValueError("expected a JSON object")
+
+    scores = raw.get("scores")
+    scores = {
+        str(name): max(0, min(10, round(score)))
+        for name, score in (scores.items() if isinstance(scores, dict) else [])
+        if isinstance(score, (int, float)) and not isinstance(score, bool)
+        and math.isfinite(score)
+    }
+
+    feedback = raw.get("feedback")
+    if isinstance(feedback, str):
+        feedback = [feedback]
+    feedback = [
+        str(item).strip()
+        for item in (feedback if isinstance(feedback, list) else [])
+        if str(item).strip()
+    ]
+
+    if not scores and not feedback:
+        raise ValueError("evaluation has no scores or feedback")
+
+    summary = raw.get("summary")
+    return AnswerEvaluation(
+        scores=scores,
+        feedback=feedback,
+        summary=summary if isinstance(summary, str) else None,
+    ).model_dump()
+
+
+def _evaluation_field(path: Path, value: Any) -> Optional[tuple]:
+    """
+    (field, key, value) for the parts of an evaluation the UI shows
+    as they arrive: the summary, each feedback item, each score.
+    """
+    if path == ("summary",) and isinstance(value, str):
+        return ("summary", None, value)
+    if len(path) == 2 and path[0] in ("feedback", "scores"):
+        if isinstance(value, float) and not math.isfinite(value):
+            return None  # dropped by validate_evaluation too
+        if not isinstance(value, (dict, list)):
+            return (path[0], path[1], value)
+    return None
+
+
+def evaluate_answer(
+    question: str,
+    answer: str,
+    profile: Union[dict, str],
+    on_field: Optional[Callable[[str, Any, Any], None]] = None,
+) -> dict:
+    """
+    Evaluates a candidate's answer to a question.
+
+    The response is parsed while it streams; `on_field(field, key,
+    value)` is called for each summary/feedback/score as soon as it
+    is complete.
+
+    Raises if no usable evaluation comes back (no made-up scores:
+    the caller records the answer as failed).
+    """
     prompt = f"""
     You are an expert AI interviewer evaluating a candidate's answer.
     Use the provided rubric to score the answer from 0 to 10 on four dimensions.
@@ -68,7 +174,7 @@ def evaluate_answer(question: str, answer: str, profile: dict) -> dict:
     - Confidence & Communication (0-10): Overall communication style and confidence.
 
     Candidate Profile:
-    {json.dumps(profile, indent=2)}
+    {profile_text(profile)}
 
     Interview Question:
     "{question}"
@@ -76,53 +182,141 @@ def evaluate_answer(question: str, answer: str, profile: dict) -> dict:
     Candidate's Answer:
     "{answer}"
     """
-    try:
-        response = MODEL.generate_content(
-            prompt,
-            generation_config={"response_mime_type": "application/json"}
-        )
-        evaluation = json.loads(response.text)
-        return evaluation
-    except (json.JSONDecodeError, Exception) as e:
-        print(f"[ERROR] Failed to evaluate answer: {e}")
-        # Fallback evaluation
-        return {
-            "scores": {"clarity": 5, "depth": 5},
-            "feedback": ["Evaluation failed, providing default feedback."],
-            "summary": "Could not process the evaluation via the AI model."
-        }
+    def on_value(path: Path, value: Any):
+        field = _evaluation_field(path, value)
+        if field is not None and on_field is not None:
+            on_field(*field)
+
+    raw = _stream_json(prompt, Priority.INTERACTIVE, on_value)
+    return validate_evaluation(raw)
 
 
-def generate_final_report(profile: dict, answers: List[dict]) -> dict:
-    """Generates a final interview report."""
+def generate_final_report(
+    profile: Union[dict, str], aggregates: dict, answers: Optional[List[dict]] = None
+) -> dict:
+    """
+    Generates a final interview report from the running score
+    aggregates, plus a token-budgeted digest of the answers.
+    """
     prompt = f"""
     You are an expert hiring manager. You have conducted an interview and now need to write a final report.
-    Summarize the candidate's performance based on their profile and their answers/evaluations.
+    Summarize the candidate's performance based on their profile and the aggregated evaluations of their answers.
     Provide an overall recommendation (e.g., "Strong Hire", "Hire", "No Hire") and a summary of strengths and weaknesses.
     Return a JSON object.
 
     Candidate Profile:
-    {json.dumps(profile, indent=2)}
+    {profile_text(profile)}
 
-    Interview Q&A and Evaluations:
-    {json.dumps(answers, indent=2)}
+    Interview Performance Summary:
+    (per-dimension scores are 0-10; "trend" is the average change per question;
+    strengths/weaknesses are notes on the most recent notable answers)
+    {compact_json(aggregates)}
+
+    Interview Transcript (questions, answers and per-answer scores; trimmed to fit):
+    {answers_digest(answers or [])}
     """
     try:
-        response = MODEL.generate_content(
-            prompt,
-            generation_config={"response_mime_type": "application/json"}
-        )
-        report = json.loads(response.text)
+        report = _stream_json(prompt, Priority.BATCH)
+        if not isinstance(report, dict):
+            raise ValueError("expected a JSON object")
         return report
-    except (json.JSONDecodeError, Exception) as e:
+    except LLMOverloaded:
+        # Shed under load: let the caller ask the client to retry later
+        raise
+    except Exception as e:
         print(f"[ERROR] Failed to generate final report: {e}")
         return {"error": "Failed to generate report."}
 
 
+def review_code(problem_description: str, code_snippet: str, execution_output: str) -> str:
+    """
+    Markdown review of a code submission (code_review prompt).
+    Cached with the submission, so a resubmission of the same code
+    (ignoring formatting and comments) skips the LLM call.
+    """
+    cache = get_submission_cache()
+    key = source_hash(code_snippet)
+    field = "review:" + inputs_hash(problem_description, execution_output)
+
+    review = cache.get(key, field)
+    if review is not None:
+        return review
+
+    prompt = PromptManager().get(
+        "code_review",
+        problem_description=problem_description,
+        code_snippet=code_snippet,
+        execution_output=execution_output or "(no output)",
+    )
+    try:
+        review = get_llm_client().generate_sync(prompt, priority=Priority.INTERACTIVE)
+    except Exception as e:
+        print(f"[ERROR] Failed to review code: {e}")
+        return "Could not review the code right now. Please try again."
+
+    cache.put(key, field, review)
+    return review
+
+
+# --- Conversational Interviewer (WebSocket flow) ---
+
+INTERVIEWER_PROMPT = """
+You are an expert technical interviewer conducting a live, spoken interview.
+
+Candidate Profile:
+{profile}
+
+Guidelines:
+- Start by asking the candidate to introduce themselves.
+- Then deep-dive into their specific skills and projects.
+- Ask one question at a time.
+- Be concise: your replies are spoken aloud, so keep them to a few sentences.
+- Plain text only (no markdown, lists or code blocks).
 """
-# --- v2.0+ Class (Commented out for v1.0 as it's not used) ---
-# The InterviewerAI class is designed for a more complex, multi-session architecture
-# with features like chat history, which is beyond the scope of the stateless v1.0 API.
+
+
 class InterviewerAI:
-    ... (Code commented out for brevity)
-"""
+    """
+    Multi-turn interviewer with one Gemini chat per session.
+    Supports token streaming so replies can be spoken sentence by sentence.
+    """
+
+    def __init__(self, client: Optional[LLMClient] = None):
+        self.client = client or get_llm_client()
+        self.chats: Dict[str, object] = {}
+
+    def start_session(self, session_id: str, resume_data: dict) -> str:
+        """Opens a chat for the session and returns the opening line."""
+        chat = self.client.start_chat()
+        self.chats[session_id] = chat
+
+        prompt = INTERVIEWER_PROMPT.format(
+            profile=profile_text(resume_data)
+        )
+        return "".join(self._send(chat, prompt))
+
+    def get_response(self, session_id: str, user_text: str) -> str:
+        """Full (non-streaming) interviewer reply."""
+        return "".join(self.stream_response(session_id, user_text))
+
+    def stream_response(self, session_id: str, user_text: str) -> Iterator[str]:
+        """Yields the interviewer reply as text fragments."""
+        chat = self.chats.get(session_id)
+        if chat is None:
+            raise KeyError(f"Unknown interview session: {session_id}")
+
+        yield from self._send(chat, user_text)
+
+    def end_session(self, session_id: str):
+        self.chats.pop(session_id, None)
+
+    def _send(self, chat, text: str) -> Iterator[str]:
+        yielded = False
+        try:
+            for fragment in self.client.stream_chat_sync(chat, text):
+                yielded = True
+                yield fragment
+        except Exception as e:
+            print(f"[ERROR] Interviewer reply failed: {e}")
+            if not yielded:
+                yield "Sorry, could you repeat that?"
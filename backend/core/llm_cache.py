@@ -0,0 +1,249 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+
+# Cache defaults (overridable via environment)
+LLM_CACHE_URL = os.getenv("LLM_CACHE_URL", "memory")
+LLM_CACHE_TTL_SEC = int(os.getenv("LLM_CACHE_TTL_SEC", str(7 * 24 * 3600)))
+LLM_CACHE_MEMORY_ITEMS = int(os.getenv("LLM_CACHE_MEMORY_ITEMS", "512"))
+
+
+def normalize(value: Any) -> Any:
+    """
+    Canonical form of call inputs: dict keys sorted (by json.dumps),
+    strings case-folded with whitespace collapsed.
+    """
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, dict):
+        return {str(k): normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    return value
+
+
+def cache_key(model: str, template: str, inputs: Any) -> str:
+    """
+    Key of one LLM call: model, prompt template (by content, so
+    editing a prompt invalidates its entries) and normalized inputs.
+    """
+    template_hash = hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+    payload = json.dumps(normalize(inputs), sort_keys=True, ensure_ascii=False)
+    raw = "\x1f".join([model, template_hash, payload])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Response cache for deterministic-enough LLM calls (question
+    generation, resume parsing).
+
+    - Memory tier: LRU of `memory_items` entries
+    - Disk tier (optional): SQLite table shared by worker processes
+      and kept across restarts
+    - Entries expire after `ttl_sec`
+    - Concurrent misses for the same key share one computation
+      (singleflight); failures are not cached
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_sec: int = LLM_CACHE_TTL_SEC,
+        memory_items: int = LLM_CACHE_MEMORY_ITEMS,
+    ):
+        self.path = path
+        self.ttl_sec = ttl_sec
+        self.memory_items = memory_items
+
+        # key -> (expires_at, JSON-encoded value)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+        if self.path:
+            conn = self._conn()
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (time.time(),))
+            conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        """
+        One connection per thread (sqlite3 objects are not shareable).
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ---------------------------
+    # Tiers
+    # ---------------------------
+
+    def _memory_get(self, key: str):
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.time():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return entry
+
+    def _memory_put(self, key: str, expires_at: float, raw: str):
+        self._memory[key] = (expires_at, raw)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str):
+        if not self.path:
+            return None
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM llm_cache WHERE key = ? AND expires_at >= ?",
+            (key, time.time()),
+        ).fetchone()
+        return (row[1], row[0]) if row else None
+
+    def _disk_put(self, key: str, expires_at: float, raw: str):
+        if not self.path:
+            return
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, raw, expires_at),
+        )
+        conn.commit()
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+
+    def get_or_compute(
+        self, key: str, compute: Callable[[], Any], ttl_sec: Optional[int] = None
+    ) -> Any:
+        """
+        Cached value for `key`; `compute()` produces it on a miss.
+        Values must be JSON-serializable.
+        """
+        with self._lock:
+            entry = self._memory_get(key)
+            if entry is not None:
+                self.hits += 1
+                return json.loads(entry[1])
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            # Someone else is computing this key; share their result
+            return json.loads(future.result())
+
+        try:
+            entry = self._disk_get(key)
+            if entry is not None:
+                expires_at, raw = entry
+                with self._lock:
+                    self.disk_hits += 1
+            else:
+                with self._lock:
+                    self.misses += 1
+                raw = json.dumps(compute())
+                expires_at = time.time() + (ttl_sec or self.ttl_sec)
+                self._disk_put(key, expires_at, raw)
+
+            with self._lock:
+                self._memory_put(key, expires_at, raw)
+
+            future.set_result(raw)
+            # Callers get their own copy (values may be mutated)
+            return json.loads(raw)
+
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.path:
+            conn = self._conn()
+            conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": round(
+                    (lookups - self.misses) / lookups, 3
+                ) if lookups else 0.0,
+                "memory_items": len(self._memory),
+            }
+
+
+def create_llm_cache(url: str = LLM_CACHE_URL) -> LLMCache:
+    """
+    Build a cache from a URL: "memory" or "sqlite:///path.db".
+    """
+    if url == "memory":
+        return LLMCache()
+
+    if url.startswith("sqlite:///"):
+        path = url[len("sqlite:///"):]
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        print(f"[INFO] Using SQLite LLM cache: {path}")
+        return LLMCache(path)
+
+    raise ValueError(f"Unsupported LLM cache URL: {url}")
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """
+    Process-wide cache (created on first use).
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = create_llm_cache()
+        return _cache
@@ -0,0 +1,770 @@
+import asyncio
+import hashlib
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Union
+
+from dotenv import load_dotenv
+
+from backend.core.llm_scheduler import (
+    KeyQuota,
+    LLMScheduler,
+    Priority,
+    estimate_tokens,
+    quota_for_key,
+)
+from backend.core.stage_pool import LatencyStats
+
+load_dotenv()
+
+
+# Client defaults (overridable via environment)
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")
+LLM_MODEL = os.getenv("LLM_MODEL", "gemini-1.5-pro-latest")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_TIMEOUT_SEC = float(os.getenv("LLM_TIMEOUT_SEC", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_BACKOFF_BASE_MS = int(os.getenv("LLM_BACKOFF_BASE_MS", "250"))
+LLM_BACKOFF_MAX_MS = int(os.getenv("LLM_BACKOFF_MAX_MS", "4000"))
+LLM_FAKE_LATENCY_MS = int(os.getenv("LLM_FAKE_LATENCY_MS", "300"))
+
+# Token estimate per earlier chat message
+HISTORY_TURN_TOKENS = 200
+
+Contents = Union[str, List[Any]]
+
+
+class LLMTimeout(Exception):
+    pass
+
+
+# ---------------------------
+# Providers
+# ---------------------------
+
+class LLMProvider(ABC):
+    """
+    Async backend for LLMClient. Implementations should honour
+    `timeout` themselves where the SDK allows it; the client
+    enforces the deadline either way.
+    """
+
+    name = "provider"
+    # Quota buckets are shared per key
+    key_id = "default"
+    # Part of LLM cache keys
+    model_name = "default"
+
+    @abstractmethod
+    async def generate(
+        self, contents: Contents, json_mode: bool, timeout: float
+    ) -> str:
+        ...
+
+    async def stream(
+        self, contents: Contents, json_mode: bool, timeout: float
+    ) -> AsyncIterator[str]:
+        """
+        Response as text fragments; providers without streaming
+        yield the whole response once.
+        """
+        yield await self.generate(contents, json_mode, timeout)
+
+    @abstractmethod
+    def start_chat(self) -> Any:
+        ...
+
+    @abstractmethod
+    def send_chat(self, chat: Any, text: str, timeout: float) -> AsyncIterator[str]:
+        ...
+
+    def is_transient(self, error: Exception) -> bool:
+        """
+        Whether a failed call may succeed when retried.
+        """
+        return False
+
+    def is_rate_limit(self, error: Exception) -> bool:
+        """
+        Whether the provider rejected the call for quota.
+        """
+        return False
+
+    def upload_file(self, path: str) -> Any:
+        """
+        Make a local file (e.g. a resume PDF) usable as call contents.
+        """
+        return path
+
+    def delete_file(self, handle: Any):
+        pass
+
+
+class GeminiProvider(LLMProvider):
+    """
+    Google Gemini through the SDK's native async API.
+
+    One configured GenerativeModel is shared by every call (and a
+    JSON-mode twin for structured output).
+    """
+
+    name = "gemini"
+
+    def __init__(self, model_name: str = LLM_MODEL):
+        import google.generativeai as genai
+
+        api_key = os.getenv("GOOGLE_API_KEY")
+        if not api_key:
+            raise RuntimeError("GOOGLE_API_KEY not set")
+
+        genai.configure(api_key=api_key)
+
+        self.genai = genai
+        self.key_id = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+        self.json_model = genai.GenerativeModel(
+            model_name,
+            generation_config={"response_mime_type": "application/json"},
+        )
+
+    async def generate(
+        self, contents: Contents, json_mode: bool, timeout: float
+    ) -> str:
+        model = self.json_model if json_mode else self.model
+        response = await model.generate_content_async(
+            contents, request_options={"timeout": timeout}
+        )
+        return response.text
+
+    async def stream(
+        self, contents: Contents, json_mode: bool, timeout: float
+    ) -> AsyncIterator[str]:
+        model = self.json_model if json_mode else self.model
+        response = await model.generate_content_async(
+            contents, stream=True, request_options={"timeout": timeout}
+        )
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+    def start_chat(self) -> Any:
+        return self.model.start_chat(history=[])
+
+    async def send_chat(self, chat: Any, text: str, timeout: float) -> AsyncIterator[str]:
+        response = await chat.send_message_async(
+            text, stream=True, request_options={"timeout": timeout}
+        )
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+    def upload_file(self, path: str) -> Any:
+        return self.genai.upload_file(path)
+
+    def delete_file(self, handle: Any):
+        self.genai.delete_file(handle.name)
+
+    def is_rate_limit(self, error: Exception) -> bool:
+        from google.api_core import exceptions
+
+        return isinstance(
+            error, (exceptions.ResourceExhausted, exceptions.TooManyRequests)
+        )
+
+    def is_transient(self, error: Exception) -> bool:
+        from google.api_core import exceptions
+
+        return isinstance(error, (
+            exceptions.ResourceExhausted,
+            exceptions.ServiceUnavailable,
+            exceptions.DeadlineExceeded,
+            exceptions.InternalServerError,
+            exceptions.TooManyRequests,
+        ))
+
+
+class FakeProviderError(Exception):
+    pass
+
+
+class _FakeChat:
+    def __init__(self):
+        self.history: List[str] = []
+
+
+class FakeProvider(LLMProvider):
+    """
+    Offline stand-in for benchmarking and local development.
+
+    Each call sleeps `latency_ms` (± `jitter`) and fails with a
+    transient error at `error_rate`. Replies come from `reply(contents)`
+    when given, otherwise a short canned text (or "{}" in JSON mode).
+    """
+
+    name = "fake"
+    key_id = "fake"
+    model_name = "fake"
+
+    def __init__(
+        self,
+        latency_ms: int = LLM_FAKE_LATENCY_MS,
+        jitter: float = 0.2,
+        error_rate: float = 0.0,
+        reply: Optional[Callable[[Contents], str]] = None,
+        chunk_chars: int = 16,
+    ):
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.reply = reply
+        self.chunk_chars = chunk_chars
+
+    async def _delay(self, fraction: float = 1.0):
+        spread = 1.0 + random.uniform(-self.jitter, self.jitter)
+        await asyncio.sleep(self.latency * fraction * spread)
+
+        if random.random() < self.error_rate:
+            raise FakeProviderError("simulated provider overload")
+
+    def _text(self, contents: Contents, json_mode: bool) -> str:
+        if self.reply is not None:
+            return self.reply(contents)
+        if json_mode:
+            return "{}"
+        return "Thanks. Could you walk me through that in a bit more detail?"
+
+    async def generate(
+        self, contents: Contents, json_mode: bool, timeout: float
+    ) -> str:
+        await self._delay()
+        return self._text(contents, json_mode)
+
+    async def _chunks(self, reply: str) -> AsyncIterator[str]:
+        # Time to first token, then the rest of the reply streams in
+        await self._delay(0.5)
+
+        pieces = [
+            reply[i : i + self.chunk_chars]
+            for i in range(0, len(reply), self.chunk_chars)
+        ]
+        for piece in pieces:
+            await asyncio.sleep(self.latency * 0.5 / max(1, len(pieces)))
+            yield piece
+
+    async def stream(
+        self, contents: Contents, json_mode: bool, timeout: float
+    ) -> AsyncIterator[str]:
+        async for piece in self._chunks(self._text(contents, json_mode)):
+            yield piece
+
+    def start_chat(self) -> Any:
+        return _FakeChat()
+
+    async def send_chat(self, chat: Any, text: str, timeout: float) -> AsyncIterator[str]:
+        reply = self._text(text, json_mode=False)
+        async for piece in self._chunks(reply):
+            yield piece
+
+        chat.history.extend([text, reply])
+
+    def is_transient(self, error: Exception) -> bool:
+        return isinstance(error, FakeProviderError)
+
+
+def create_provider(name: str = LLM_PROVIDER) -> LLMProvider:
+    if name == "gemini":
+        return GeminiProvider()
+    if name == "fake":
+        return FakeProvider()
+    raise ValueError(f"Unknown LLM provider: {name}")
+
+
+# ---------------------------
+# Client
+# ---------------------------
+
+class LLMClient:
+    """
+    Shared entry point for every LLM call.
+
+    Calls run as coroutines on one background event loop, so the
+    provider's async client (and its connections) is reused by all
+    request threads. On top of the provider it adds:
+    - admission through LLMScheduler: a concurrency limit, per-key
+      RPM/TPM token buckets and priority classes
+    - a per-call deadline covering queueing, retries and backoff
+    - retries of transient errors with jittered exponential backoff
+    - cancellation: a caller that gives up (timeout, closed stream)
+      cancels the underlying request
+
+    Async code awaits generate()/stream_generate()/stream_chat() on
+    the client loop; sync code (route handlers, worker threads) uses
+    the *_sync() variants.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        scheduler: Optional[LLMScheduler] = None,
+        timeout: float = LLM_TIMEOUT_SEC,
+        max_retries: int = LLM_MAX_RETRIES,
+        backoff_base_ms: int = LLM_BACKOFF_BASE_MS,
+        backoff_max_ms: int = LLM_BACKOFF_MAX_MS,
+    ):
+        self.provider = provider
+        self.scheduler = scheduler or LLMScheduler(
+            max_concurrency, quota_for_key(provider.key_id)
+        )
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base_ms / 1000.0
+        self.backoff_max = backoff_max_ms / 1000.0
+
+        self.calls = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.cancelled = 0
+        self.latency = LatencyStats()
+
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run_loop, name="llm-client", daemon=True
+        )
+        self._thread.start()
+        self._ready.wait()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._ready.set()
+        self._loop.run_forever()
+
+    # ---------------------------
+    # Async API (client loop)
+    # ---------------------------
+
+    async def generate(
+        self,
+        contents: Contents,
+        json_mode: bool = False,
+        timeout: Optional[float] = None,
+        priority: Priority = Priority.STANDARD,
+    ) -> str:
+        deadline = time.monotonic() + (timeout or self.timeout)
+        started = time.perf_counter()
+        tokens = estimate_tokens(contents)
+        attempt = 0
+
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                async with self._slot(priority, tokens, remaining):
+                    remaining = deadline - time.monotonic()
+                    text = await asyncio.wait_for(
+                        self.provider.generate(contents, json_mode, remaining),
+                        max(remaining, 0.001),
+                    )
+                self.latency.record((time.perf_counter() - started) * 1000.0)
+                return text
+
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+
+            except Exception as e:
+                attempt += 1
+                await self._before_retry(e, attempt, deadline)
+
+    async def stream_chat(
+        self,
+        chat: Any,
+        text: str,
+        timeout: Optional[float] = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> AsyncIterator[str]:
+        """
+        Yields reply fragments. Only failures before the first
+        fragment are retried (a partial reply can't be replayed).
+        """
+        # The whole chat history is resent with every turn
+        tokens = estimate_tokens(text) + len(chat.history) * HISTORY_TURN_TOKENS
+        async for fragment in self._stream(
+            lambda remaining: self.provider.send_chat(chat, text, remaining),
+            tokens, timeout, priority,
+        ):
+            yield fragment
+
+    async def stream_generate(
+        self,
+        contents: Contents,
+        json_mode: bool = False,
+        timeout: Optional[float] = None,
+        priority: Priority = Priority.STANDARD,
+    ) -> AsyncIterator[str]:
+        """
+        generate() as fragments, for consuming long (e.g. JSON)
+        responses while they arrive. Retries as stream_chat().
+        """
+        async for fragment in self._stream(
+            lambda remaining: self.provider.stream(contents, json_mode, remaining),
+            estimate_tokens(contents), timeout, priority,
+        ):
+            yield fragment
+
+    async def _stream(
+        self,
+        open_stream: Callable[[float], AsyncIterator[str]],
+        tokens: int,
+        timeout: Optional[float],
+        priority: Priority,
+    ) -> AsyncIterator[str]:
+        deadline = time.monotonic() + (timeout or self.timeout)
+        started = time.perf_counter()
+        attempt = 0
+        yielded = False
+
+        while True:
+            try:
+                async with self._slot(priority, tokens, deadline - time.monotonic()):
+                    fragments = open_stream(deadline - time.monotonic())
+                    try:
+                        while True:
+                            remaining = deadline - time.monotonic()
+                            try:
+                                fragment = await asyncio.wait_for(
+                                    fragments.__anext__(), max(remaining, 0.001)
+                                )
+                            except StopAsyncIteration:
+                                break
+                            if not yielded:
+                                self.latency.record(
+                                    (time.perf_counter() - started) * 1000.0
+                                )
+                            yielded = True
+                            yield fragment
+                    finally:
+                        await fragments.aclose()
+                return
+
+            except (asyncio.CancelledError, GeneratorExit):
+                self.cancelled += 1
+                raise
+
+            except Exception as e:
+                if yielded:
+                    self.failures += 1
+                    raise
+                attempt += 1
+                await self._before_retry(e, attempt, deadline)
+
+    def _slot(self, priority: Priority, tokens: int, remaining: float):
+        return _Slot(self, priority, tokens, remaining)
+
+    async def _before_retry(self, error: Exception, attempt: int, deadline: float):
+        """
+        Re-raise `error` unless another attempt fits before the
+        deadline; otherwise sleep the backoff.
+        """
+        timed_out = isinstance(error, (asyncio.TimeoutError, LLMTimeout))
+        if timed_out:
+            self.timeouts += 1
+
+        if self.provider.is_rate_limit(error):
+            self.scheduler.rate_limited()
+
+        retryable = timed_out or self.provider.is_transient(error)
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        # Full jitter: spread retries out so clients don't sync up
+        delay = random.uniform(0, delay)
+
+        if (
+            not retryable
+            or attempt > self.max_retries
+            or time.monotonic() + delay >= deadline
+        ):
+            self.failures += 1
+            if timed_out:
+                raise LLMTimeout("LLM call exceeded its deadline") from error
+            raise error
+
+        self.retries += 1
+        print(f"[WARN] LLM call failed ({error}); retry {attempt} in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+    # ---------------------------
+    # Sync API (any other thread)
+    # ---------------------------
+
+    def run_sync(self, coro, timeout: Optional[float] = None):
+        """
+        Run a coroutine on the client loop and wait for it.
+        The coroutine is cancelled if the caller stops waiting.
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            # Small grace period: the coroutine enforces the deadline
+            return future.result((timeout or self.timeout) + 1.0)
+        except FutureTimeout:
+            future.cancel()
+            self.timeouts += 1
+            raise LLMTimeout("LLM call exceeded its deadline")
+        except BaseException:
+            future.cancel()
+            raise
+
+    def generate_sync(
+        self,
+        contents: Contents,
+        json_mode: bool = False,
+        timeout: Optional[float] = None,
+        priority: Priority = Priority.STANDARD,
+    ) -> str:
+        return self.run_sync(
+            self.generate(contents, json_mode, timeout, priority), timeout
+        )
+
+    def stream_chat_sync(
+        self,
+        chat: Any,
+        text: str,
+        timeout: Optional[float] = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> Iterator[str]:
+        """
+        Blocking iterator over stream_chat(). Closing it early
+        cancels the request.
+        """
+        return self._iter_sync(
+            self.stream_chat(chat, text, timeout, priority), timeout
+        )
+
+    def stream_generate_sync(
+        self,
+        contents: Contents,
+        json_mode: bool = False,
+        timeout: Optional[float] = None,
+        priority: Priority = Priority.STANDARD,
+    ) -> Iterator[str]:
+        return self._iter_sync(
+            self.stream_generate(contents, json_mode, timeout, priority), timeout
+        )
+
+    def _iter_sync(
+        self, fragments: AsyncIterator[str], timeout: Optional[float]
+    ) -> Iterator[str]:
+        try:
+            while True:
+                try:
+                    yield self.run_sync(fragments.__anext__(), timeout)
+                except StopAsyncIteration:
+                    return
+        finally:
+            asyncio.run_coroutine_threadsafe(fragments.aclose(), self._loop)
+
+    def start_chat(self) -> Any:
+        return self.provider.start_chat()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "provider": self.provider.name,
+            "calls": self.calls,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "cancelled": self.cancelled,
+            "latency": self.latency.stats(),
+            "scheduler": self.scheduler.stats(),
+        }
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+class _Slot:
+    """
+    Scheduler grant; waiting for it counts against the deadline.
+    """
+
+    def __init__(
+        self, client: LLMClient, priority: Priority, tokens: int, remaining: float
+    ):
+        self.scheduler = client.scheduler
+        self.client = client
+        self.priority = priority
+        self.tokens = tokens
+        self.remaining = remaining
+
+    async def __aenter__(self):
+        if self.remaining <= 0:
+            raise LLMTimeout("LLM call exceeded its deadline")
+
+        try:
+            await self.scheduler.acquire(self.priority, self.tokens, self.remaining)
+        except asyncio.TimeoutError:
+            raise LLMTimeout("Timed out waiting for an LLM slot")
+
+        self.client.calls += 1
+
+    async def __aexit__(self, *exc):
+        self.scheduler.release()
+        return False
+
+
+_client: Optional[LLMClient] = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """
+    Process-wide client (created on first use).
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient(create_provider())
+        return _client
+
+
+# ---------------------------
+# Offline benchmark
+# ---------------------------
+
+def benchmark(
+    requests: int = 200,
+    concurrency: int = LLM_MAX_CONCURRENCY,
+    latency_ms: int = LLM_FAKE_LATENCY_MS,
+    error_rate: float = 0.0,
+) -> Dict[str, Any]:
+    """
+    Throughput and latency of the client against FakeProvider.
+    """
+    client = LLMClient(
+        FakeProvider(latency_ms=latency_ms, error_rate=error_rate),
+        scheduler=LLMScheduler(concurrency, KeyQuota(), interactive_reserve=0.0),
+        backoff_base_ms=20,
+    )
+
+    async def run():
+        async def one(i):
+            try:
+                await client.generate(f"request {i}")
+            except Exception:
+                pass
+
+        await asyncio.gather(*(one(i) for i in range(requests)))
+
+    started = time.perf_counter()
+    client.run_sync(run(), timeout=3600)
+    elapsed = time.perf_counter() - started
+    client.close()
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 2),
+        "throughput_rps": round(requests / elapsed, 1),
+        **client.stats(),
+    }
+
+
+def simulate_flood(
+    seconds: float = 20.0,
+    interactive_rps: float = 2.0,
+    flood: int = 200,
+    rpm: int = 300,
+    concurrency: int = 8,
+    latency_ms: int = LLM_FAKE_LATENCY_MS,
+    prioritized: bool = True,
+) -> Dict[str, Any]:
+    """
+    Steady interactive traffic while `flood` report-generation
+    calls arrive at once, against FakeProvider and a tight quota.
+
+    With `prioritized=False` every call is STANDARD with no reserve
+    or shedding (plain FIFO), for comparison.
+    """
+    if prioritized:
+        scheduler = LLMScheduler(concurrency, KeyQuota(rpm=rpm))
+        interactive, batch = Priority.INTERACTIVE, Priority.BATCH
+    else:
+        scheduler = LLMScheduler(
+            concurrency, KeyQuota(rpm=rpm),
+            interactive_reserve=0.0, batch_max_queued=flood + 1,
+        )
+        interactive = batch = Priority.STANDARD
+
+    client = LLMClient(
+        FakeProvider(latency_ms=latency_ms),
+        scheduler=scheduler,
+        timeout=10.0,
+    )
+    latency = LatencyStats(window=100000)
+    outcomes = {"interactive_failed": 0, "batch_done": 0, "batch_failed": 0}
+    report_prompt = "x" * 20000
+
+    async def interactive_call():
+        started = time.perf_counter()
+        try:
+            await client.generate("evaluate", priority=interactive)
+            latency.record((time.perf_counter() - started) * 1000.0)
+        except Exception:
+            outcomes["interactive_failed"] += 1
+
+    async def batch_call():
+        try:
+            await client.generate(report_prompt, priority=batch)
+            outcomes["batch_done"] += 1
+        except Exception:
+            outcomes["batch_failed"] += 1
+
+    async def run():
+        tasks = [asyncio.ensure_future(batch_call()) for _ in range(flood)]
+        for _ in range(int(seconds * interactive_rps)):
+            tasks.append(asyncio.ensure_future(interactive_call()))
+            await asyncio.sleep(1.0 / interactive_rps)
+        await asyncio.gather(*tasks)
+
+    client.run_sync(run(), timeout=seconds + 60)
+    client.close()
+
+    return {
+        "prioritized": prioritized,
+        "flood": flood,
+        "interactive_latency": latency.stats(),
+        **outcomes,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Benchmark LLMClient offline")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=LLM_MAX_CONCURRENCY)
+    parser.add_argument("--latency-ms", type=int, default=LLM_FAKE_LATENCY_MS)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--flood", action="store_true",
+        help="interactive p95 under a report flood (baseline, FIFO, prioritized)",
+    )
+    args = parser.parse_args()
+
+    if args.flood:
+        print(json.dumps([
+            simulate_flood(flood=0, latency_ms=args.latency_ms),
+            simulate_flood(prioritized=False, latency_ms=args.latency_ms),
+            simulate_flood(prioritized=True, latency_ms=args.latency_ms),
+        ], indent=2))
+    else:
+        print(json.dumps(benchmark(
+            args.requests, args.concurrency, args.latency_ms, args.error_rate
+        ), indent=2))
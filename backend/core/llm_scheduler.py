@@ -0,0 +1,300 @@
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from enum import IntEnum
+from typing import Any, Dict, List, Optional
+
+from backend.core.stage_pool import LatencyStats
+
+
+# Quota defaults (overridable via environment)
+LLM_RPM = int(os.getenv("LLM_RPM", "1000"))
+LLM_TPM = int(os.getenv("LLM_TPM", "4000000"))
+# Share of each bucket that only interactive calls may use
+LLM_INTERACTIVE_RESERVE = float(os.getenv("LLM_INTERACTIVE_RESERVE", "0.3"))
+# Queued batch calls beyond this are shed immediately
+LLM_BATCH_MAX_QUEUED = int(os.getenv("LLM_BATCH_MAX_QUEUED", "16"))
+
+# Rough prompt-size → token estimate
+CHARS_PER_TOKEN = 4
+FILE_TOKENS = int(os.getenv("LLM_FILE_TOKENS", "1500"))
+OUTPUT_TOKENS = int(os.getenv("LLM_OUTPUT_TOKENS", "512"))
+
+
+class Priority(IntEnum):
+    """
+    Lower value is served first.
+    """
+
+    INTERACTIVE = 0  # live interview: answer evaluation, interviewer replies
+    STANDARD = 1     # user waiting on a page: question generation
+    BATCH = 2        # heavy, deferrable: final reports, resume parsing
+
+
+class LLMOverloaded(Exception):
+    pass
+
+
+def estimate_tokens(contents: Any) -> int:
+    """
+    Estimated prompt + output tokens for a call.
+    """
+    if isinstance(contents, str):
+        prompt = len(contents) // CHARS_PER_TOKEN
+    else:
+        prompt = sum(
+            len(part) // CHARS_PER_TOKEN if isinstance(part, str) else FILE_TOKENS
+            for part in contents
+        )
+    return prompt + OUTPUT_TOKENS
+
+
+class TokenBucket:
+    """
+    Continuously refilling bucket: `capacity` units, refilled at
+    `rate` units per second.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.level = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def available(self, floor: float = 0.0) -> float:
+        self._refill()
+        return self.level - floor
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= amount
+
+    def wait_time(self, amount: float, floor: float = 0.0) -> float:
+        """
+        Seconds until `amount` can be taken without going below `floor`.
+        """
+        missing = amount - self.available(floor)
+        return max(0.0, missing / self.rate) if self.rate else math.inf
+
+    def drain(self):
+        self._refill()
+        self.level = min(self.level, 0.0)
+
+
+class KeyQuota:
+    """
+    Requests-per-minute and tokens-per-minute buckets of one API key.
+    """
+
+    def __init__(self, rpm: int = LLM_RPM, tpm: int = LLM_TPM):
+        self.requests = TokenBucket(rpm / 60.0, rpm)
+        self.tokens = TokenBucket(tpm / 60.0, tpm)
+
+    def cost_fits(self, tokens: int, reserve: float) -> float:
+        """
+        Seconds until a call of `tokens` fits, keeping `reserve`
+        (a fraction of each bucket) untouched.
+        """
+        return max(
+            self.requests.wait_time(1, self.requests.capacity * reserve),
+            self.tokens.wait_time(
+                min(tokens, self.tokens.capacity),
+                self.tokens.capacity * reserve,
+            ),
+        )
+
+    def take(self, tokens: int):
+        self.requests.take(1)
+        self.tokens.take(min(tokens, self.tokens.capacity))
+
+    def drain(self):
+        self.requests.drain()
+        self.tokens.drain()
+
+
+_quotas: Dict[str, KeyQuota] = {}
+_quotas_lock = threading.Lock()
+
+
+def quota_for_key(key_id: str) -> KeyQuota:
+    """
+    Quota buckets are shared by every scheduler using the same key.
+    """
+    with _quotas_lock:
+        if key_id not in _quotas:
+            _quotas[key_id] = KeyQuota()
+        return _quotas[key_id]
+
+
+class _Waiter:
+    __slots__ = ("priority", "tokens", "future", "enqueued", "queued")
+
+    def __init__(self, priority: Priority, tokens: int, future: asyncio.Future):
+        self.priority = priority
+        self.tokens = tokens
+        self.future = future
+        self.enqueued = time.monotonic()
+        self.queued = True
+
+
+class LLMScheduler:
+    """
+    Admission control in front of the LLM provider.
+
+    Calls wait in a priority queue and are granted a slot when
+    - fewer than `max_concurrency` calls are in flight, and
+    - the key's RPM/TPM buckets can cover the estimated tokens
+
+    Under pressure, low-priority work gives way first:
+    - non-interactive calls may not dip into the last
+      `interactive_reserve` share of either bucket (or of the
+      concurrency slots), so a flood of reports is throttled before
+      live interviews feel it
+    - batch calls beyond `batch_max_queued` are shed (LLMOverloaded)
+    - queued calls whose deadline passes are dropped
+    - a provider rate-limit error drains the buckets; interactive
+      calls are the first ones admitted once they refill
+
+    Runs entirely on the client's event loop.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        quota: KeyQuota,
+        interactive_reserve: float = LLM_INTERACTIVE_RESERVE,
+        batch_max_queued: int = LLM_BATCH_MAX_QUEUED,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.quota = quota
+        self.interactive_reserve = interactive_reserve
+        self.batch_max_queued = batch_max_queued
+
+        # Slots only interactive calls may use
+        self.reserved_slots = min(
+            self.max_concurrency - 1,
+            math.ceil(self.max_concurrency * interactive_reserve),
+        )
+
+        self.in_flight = 0
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._queued = {p: 0 for p in Priority}
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+        self.granted = {p: 0 for p in Priority}
+        self.shed = {p: 0 for p in Priority}
+        self.wait = {p: LatencyStats() for p in Priority}
+
+    async def acquire(self, priority: Priority, tokens: int, timeout: float):
+        """
+        Wait for a slot; raises LLMOverloaded (shed) or
+        asyncio.TimeoutError (deadline passed while queued).
+        """
+        if (
+            priority == Priority.BATCH
+            and self._queued[priority] >= self.batch_max_queued
+        ):
+            self.shed[priority] += 1
+            raise LLMOverloaded(
+                f"LLM busy: {self._queued[priority]} batch calls queued"
+            )
+
+        waiter = _Waiter(
+            priority, tokens, asyncio.get_running_loop().create_future()
+        )
+        heapq.heappush(self._heap, (priority, next(self._seq), waiter))
+        self._queued[priority] += 1
+        self._pump()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except BaseException:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just as we gave up: hand the slot back
+                self.release()
+            else:
+                waiter.future.cancel()
+                self._dequeued(waiter)
+                if priority != Priority.INTERACTIVE:
+                    self.shed[priority] += 1
+            raise
+
+    def release(self):
+        self.in_flight -= 1
+        self._pump()
+
+    def rate_limited(self):
+        """
+        The provider rejected a call for quota: stop admitting
+        until the buckets refill.
+        """
+        self.quota.drain()
+
+    def _dequeued(self, waiter: _Waiter):
+        if waiter.queued:
+            waiter.queued = False
+            self._queued[waiter.priority] -= 1
+
+    def _pump(self):
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+
+        while self._heap:
+            _, _, waiter = self._heap[0]
+            if waiter.future.done():
+                heapq.heappop(self._heap)
+                continue
+
+            if waiter.priority == Priority.INTERACTIVE:
+                reserve, slots = 0.0, self.max_concurrency
+            else:
+                reserve = self.interactive_reserve
+                slots = self.max_concurrency - self.reserved_slots
+
+            if self.in_flight >= slots:
+                return  # woken again by release()
+
+            delay = self.quota.cost_fits(waiter.tokens, reserve)
+            if delay > 0:
+                # Strict priority: lower classes wait behind the head
+                self._wakeup = asyncio.get_running_loop().call_later(
+                    delay, self._pump
+                )
+                return
+
+            heapq.heappop(self._heap)
+            self.quota.take(waiter.tokens)
+            self.in_flight += 1
+            self._dequeued(waiter)
+            self.granted[waiter.priority] += 1
+            self.wait[waiter.priority].record(
+                (time.monotonic() - waiter.enqueued) * 1000.0
+            )
+            waiter.future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "requests_available": int(self.quota.requests.available()),
+            "tokens_available": int(self.quota.tokens.available()),
+            "classes": {
+                p.name.lower(): {
+                    "queued": self._queued[p],
+                    "granted": self.granted[p],
+                    "shed": self.shed[p],
+                    "queue_wait": self.wait[p].stats(),
+                }
+                for p in Priority
+            },
+        }
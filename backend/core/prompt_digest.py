@@ -0,0 +1,163 @@
+import json
+import os
+from typing import Any, Dict, List, Optional, Union
+
+from backend.core.llm_scheduler import CHARS_PER_TOKEN
+
+
+# Prompt budgets in (estimated) tokens
+PROFILE_DIGEST_TOKENS = int(os.getenv("PROFILE_DIGEST_TOKENS", "400"))
+ANSWERS_DIGEST_TOKENS = int(os.getenv("ANSWERS_DIGEST_TOKENS", "1500"))
+
+# Truncation levels, tried from most to least detailed:
+# (skills, list items, text chars)
+_PROFILE_LEVELS = [(40, 6, 240), (25, 4, 140), (15, 3, 80), (10, 2, 40), (8, 1, 0)]
+# (question chars, answer chars, summary chars)
+_ANSWER_LEVELS = [(240, 600, 200), (160, 300, 120), (100, 160, 60), (60, 0, 0)]
+
+
+def count_tokens(text: str) -> int:
+    """
+    Same rough estimate the LLM scheduler uses for quota accounting.
+    """
+    return len(text) // CHARS_PER_TOKEN
+
+
+def compact_json(data: Any) -> str:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def clip_text(text: Any, limit: int) -> str:
+    text = " ".join(str(text or "").split())
+    if len(text) <= limit:
+        return text
+    return text[: max(0, limit - 1)].rstrip() + "…"
+
+
+def _strings(values: Any, limit: int) -> List[str]:
+    if not isinstance(values, list):
+        return []
+    return [str(v) for v in values[:limit] if v]
+
+
+def _items(values: Any, limit: int) -> List[dict]:
+    if not isinstance(values, list):
+        return []
+    return [v for v in values[:limit] if isinstance(v, dict)]
+
+
+def _profile_view(profile: dict, skills: int, items: int, chars: int) -> dict:
+    view: Dict[str, Any] = {}
+
+    if profile.get("name"):
+        view["name"] = profile["name"]
+    if profile.get("skills"):
+        view["skills"] = _strings(profile["skills"], skills)
+
+    experience = []
+    for job in _items(profile.get("experience"), items):
+        entry = {k: job[k] for k in ("role", "company", "duration") if job.get(k)}
+        if chars and job.get("description"):
+            entry["summary"] = clip_text(job["description"], chars)
+        experience.append(entry)
+    if experience:
+        view["experience"] = experience
+
+    projects = []
+    for project in _items(profile.get("projects"), items):
+        entry = {"title": project.get("title", "")}
+        if project.get("tech_stack"):
+            entry["tech"] = _strings(project["tech_stack"], 6)
+        if chars and project.get("description"):
+            entry["summary"] = clip_text(project["description"], chars)
+        projects.append(entry)
+    if projects:
+        view["projects"] = projects
+
+    return view
+
+
+def profile_digest(
+    profile: Optional[dict], budget: int = PROFILE_DIGEST_TOKENS
+) -> str:
+    """
+    Compact JSON of the interview-relevant resume fields (name,
+    skills, experience, projects) that fits `budget` tokens.
+    Contact details are dropped; lists and descriptions are
+    truncated progressively until the digest fits.
+    """
+    if not profile:
+        return "{}"
+
+    digest = "{}"
+    for skills, items, chars in _PROFILE_LEVELS:
+        digest = compact_json(_profile_view(profile, skills, items, chars))
+        if count_tokens(digest) <= budget:
+            break
+
+    return digest
+
+
+def answers_digest(answers: List[dict], budget: int = ANSWERS_DIGEST_TOKENS) -> str:
+    """
+    Compact JSON of the Q&A history (question, answer, scores and
+    evaluator summary per turn) that fits `budget` tokens.
+    """
+    digest = "[]"
+    for q_chars, a_chars, s_chars in _ANSWER_LEVELS:
+        turns = []
+        for item in answers:
+            evaluation = item.get("evaluation") or {}
+            turn = {"q": clip_text(item.get("question"), q_chars)}
+            if a_chars:
+                turn["a"] = clip_text(item.get("answer"), a_chars)
+            if evaluation.get("scores"):
+                turn["scores"] = evaluation["scores"]
+            if s_chars and evaluation.get("summary"):
+                turn["summary"] = clip_text(evaluation["summary"], s_chars)
+            turns.append(turn)
+
+        digest = compact_json(turns)
+        if count_tokens(digest) <= budget:
+            break
+
+    return digest
+
+
+def profile_text(profile: Union[dict, str, None]) -> str:
+    """
+    Prompt form of a profile: a precomputed digest is used as is.
+    """
+    if isinstance(profile, str):
+        return profile
+    return profile_digest(profile)
+
+
+def compare(session: dict) -> Dict[str, int]:
+    """
+    Token counts of the full (indent=2) vs digested prompt sections.
+    """
+    profile = session.get("profile") or {}
+    answers = session.get("answers") or []
+
+    return {
+        "profile_before": count_tokens(json.dumps(profile, indent=2)),
+        "profile_after": count_tokens(profile_digest(profile)),
+        "answers_before": count_tokens(json.dumps(answers, indent=2)),
+        "answers_after": count_tokens(answers_digest(answers)) if answers else 0,
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Usage: python -m backend.core.prompt_digest evaluation/sessions/*.json
+    for path in sys.argv[1:]:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = f.read().strip()
+
+        if not raw:
+            print(f"{path}: empty, skipped")
+            continue
+
+        print(f"{path}: {compare(json.loads(raw))}")
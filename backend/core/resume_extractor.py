@@ -0,0 +1,264 @@
+import io
+import re
+import zipfile
+from typing import Dict, List, Optional
+from xml.etree import ElementTree
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # optional: PDFs then always go to the vision model
+    PdfReader = None
+
+
+# Below this many characters a text layer is treated as missing
+# (scanned PDFs often carry a few stray characters or page numbers)
+MIN_TEXT_CHARS = 200
+
+# Resume section headings → profile field
+SECTION_HEADINGS = {
+    "skills": "skills",
+    "technical skills": "skills",
+    "core skills": "skills",
+    "technologies": "skills",
+    "tech stack": "skills",
+    "experience": "experience",
+    "work experience": "experience",
+    "professional experience": "experience",
+    "employment": "experience",
+    "employment history": "experience",
+    "projects": "projects",
+    "personal projects": "projects",
+    "academic projects": "projects",
+    "key projects": "projects",
+    "education": "education",
+    "certifications": "other",
+    "achievements": "other",
+    "awards": "other",
+    "summary": "other",
+    "profile": "other",
+    "objective": "other",
+    "interests": "other",
+    "publications": "other",
+    "languages": "other",
+}
+
+# Common technical skills, matched as whole words anywhere in the text
+KNOWN_SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "C", "C++", "C#", "Go",
+    "Rust", "Kotlin", "Swift", "Ruby", "PHP", "Scala", "R", "MATLAB", "SQL",
+    "Bash", "HTML", "CSS", "React", "Angular", "Vue", "Next.js", "Node.js",
+    "Express", "Django", "Flask", "FastAPI", "Spring", "Spring Boot", ".NET",
+    "Rails", "Laravel", "GraphQL", "REST", "gRPC", "PostgreSQL", "MySQL",
+    "SQLite", "MongoDB", "Redis", "Cassandra", "DynamoDB", "Elasticsearch",
+    "Kafka", "RabbitMQ", "Spark", "Hadoop", "Airflow", "Docker", "Kubernetes",
+    "Terraform", "Ansible", "Jenkins", "GitHub Actions", "CI/CD", "AWS",
+    "GCP", "Azure", "Linux", "Git", "TensorFlow", "PyTorch", "Keras",
+    "scikit-learn", "Pandas", "NumPy", "OpenCV", "NLP", "LLM", "Transformers",
+    "Hugging Face", "LangChain", "Machine Learning", "Deep Learning",
+    "Computer Vision", "Data Structures", "Algorithms", "Microservices",
+    "System Design", "Tableau", "Power BI", "Figma", "Unity", "Flutter",
+    "React Native", "Android", "iOS", "Selenium", "Jest", "Pytest",
+]
+
+_SKILL_PATTERNS = [
+    (skill, re.compile(r"(?<![\w+#.])" + re.escape(skill) + r"(?![\w+#])", re.IGNORECASE))
+    for skill in KNOWN_SKILLS
+]
+# Single letters / short words only count when listed in a skills section
+_AMBIGUOUS_SKILLS = {"C", "R", "Go", "REST", "Spring", "Express", "Unity"}
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_RE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+LINKEDIN_RE = re.compile(r"(?:https?://)?(?:www\.)?linkedin\.com/[\w/-]+", re.IGNORECASE)
+DURATION_RE = re.compile(
+    r"((?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+)?"
+    r"(19|20)\d{2}\s*[-–—to]+\s*"
+    r"(((?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+)?(19|20)\d{2}|present|current|now)",
+    re.IGNORECASE,
+)
+BULLET_RE = re.compile(r"^\s*[•\-*–·▪●◦]\s*")
+
+
+# ---------------------------
+# Text layer
+# ---------------------------
+
+def _pdf_text(data: bytes) -> str:
+    if PdfReader is None:
+        return ""
+    reader = PdfReader(io.BytesIO(data))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _docx_text(data: bytes) -> str:
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        xml = archive.read("word/document.xml")
+
+    ns = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+    paragraphs = []
+    for para in ElementTree.fromstring(xml).iter(f"{ns}p"):
+        paragraphs.append("".join(node.text or "" for node in para.iter(f"{ns}t")))
+    return "\n".join(paragraphs)
+
+
+def extract_text(data: bytes, filename: str = "") -> str:
+    """
+    Embedded text of a PDF, DOCX or plain-text resume; "" for
+    images, scans and anything unreadable.
+    """
+    name = filename.lower()
+    try:
+        if data.startswith(b"%PDF"):
+            text = _pdf_text(data)
+        elif data.startswith(b"PK") and name.endswith(".docx"):
+            text = _docx_text(data)
+        elif name.endswith((".txt", ".md")):
+            text = data.decode("utf-8", errors="replace")
+        else:
+            return ""
+    except Exception as e:
+        print(f"[WARN] Text-layer extraction failed: {e}")
+        return ""
+
+    return text if len(text.strip()) >= MIN_TEXT_CHARS else ""
+
+
+# ---------------------------
+# Structured extraction
+# ---------------------------
+
+def _heading(line: str) -> Optional[str]:
+    key = re.sub(r"[^a-z ]", "", line.lower()).strip()
+    return SECTION_HEADINGS.get(key) if len(line) <= 40 else None
+
+
+def _sections(lines: List[str]) -> Dict[str, List[str]]:
+    sections: Dict[str, List[str]] = {"header": []}
+    current = "header"
+    for line in lines:
+        field = _heading(line)
+        if field is not None:
+            current = field
+            sections.setdefault(current, [])
+        else:
+            sections.setdefault(current, []).append(line)
+    return sections
+
+
+def _split_items(lines: List[str]) -> List[List[str]]:
+    """
+    Groups section lines into entries: a non-bullet line starts a new
+    entry, bullets belong to the entry above.
+    """
+    items: List[List[str]] = []
+    for line in lines:
+        if BULLET_RE.match(line) and items:
+            items[-1].append(BULLET_RE.sub("", line))
+        else:
+            items.append([BULLET_RE.sub("", line)])
+    return items
+
+
+def _skills(text: str, section: List[str]) -> List[str]:
+    found: List[str] = []
+
+    # Explicit skills section: comma/pipe/bullet separated lists
+    for line in section:
+        line = re.sub(r"^[^:]{1,30}:\s*", "", BULLET_RE.sub("", line))
+        for part in re.split(r"[,|;•·]", line):
+            part = part.strip(" .")
+            if 1 <= len(part) <= 30 and part.lower() not in {s.lower() for s in found}:
+                found.append(part)
+
+    # Known skills mentioned anywhere else
+    lowered = {s.lower() for s in found}
+    for skill, pattern in _SKILL_PATTERNS:
+        if skill in _AMBIGUOUS_SKILLS or skill.lower() in lowered:
+            continue
+        if pattern.search(text):
+            found.append(skill)
+            lowered.add(skill.lower())
+
+    return found
+
+
+def _tech_in(text: str) -> List[str]:
+    return [
+        skill for skill, pattern in _SKILL_PATTERNS
+        if skill not in _AMBIGUOUS_SKILLS and pattern.search(text)
+    ]
+
+
+def _projects(section: List[str]) -> List[dict]:
+    projects = []
+    for item in _split_items(section):
+        title = re.split(r"\s[|–—-]\s|:", item[0], maxsplit=1)[0].strip()
+        description = " ".join(item[1:]) or item[0][len(title):].strip(" |:–—-")
+        projects.append({
+            "title": title,
+            "tech_stack": _tech_in(" ".join(item)),
+            "description": description,
+        })
+    return projects
+
+
+def _experience(section: List[str]) -> List[dict]:
+    jobs = []
+    for item in _split_items(section):
+        header = item[0]
+        duration = DURATION_RE.search(header)
+        header_text = DURATION_RE.sub("", header).strip(" ,|–—-")
+        parts = [p.strip() for p in re.split(r"\s[|–—-]\s|,\s| at ", header_text) if p.strip()]
+
+        jobs.append({
+            "role": parts[0] if parts else header_text,
+            "company": parts[1] if len(parts) > 1 else "",
+            "duration": duration.group(0) if duration else "",
+            "description": " ".join(item[1:]),
+        })
+    return jobs
+
+
+def _name(header: List[str]) -> Optional[str]:
+    for line in header[:5]:
+        if EMAIL_RE.search(line) or PHONE_RE.search(line) or any(ch.isdigit() for ch in line):
+            continue
+        words = line.split()
+        if 1 < len(words) <= 5 and all(w[:1].isupper() for w in words if w[:1].isalpha()):
+            return line.strip()
+    return None
+
+
+def extract_profile(text: str) -> dict:
+    """
+    Heuristic profile from resume text, in the same shape the
+    vision parser returns (name, contact, skills, experience,
+    projects). Fields that can't be found are left empty.
+    """
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    sections = _sections(lines)
+
+    email = EMAIL_RE.search(text)
+    phone = PHONE_RE.search(text)
+    linkedin = LINKEDIN_RE.search(text)
+
+    return {
+        "name": _name(sections["header"]),
+        "contact": {
+            "email": email.group(0) if email else "",
+            "phone": phone.group(0).strip() if phone else "",
+            "linkedin": linkedin.group(0) if linkedin else "",
+        },
+        "skills": _skills(text, sections.get("skills", [])),
+        "experience": _experience(sections.get("experience", [])),
+        "projects": _projects(sections.get("projects", [])),
+    }
+
+
+def is_usable(profile: dict) -> bool:
+    """
+    Whether the heuristic profile has enough to interview on.
+    """
+    return bool(profile.get("skills")) and bool(
+        profile.get("projects") or profile.get("experience") or len(profile["skills"]) >= 5
+    )
@@ -0,0 +1,140 @@
+import re
+from typing import Dict, List, Optional
+
+from backend.core.prompt_digest import clip_text
+
+
+# Rolling strengths / weaknesses kept per session
+MAX_NOTES = 5
+NOTE_CHARS = 140
+
+
+def empty_aggregates() -> Dict:
+    """
+    JSON-safe running summary of an interview's evaluations.
+    """
+    return {
+        "answers": {},        # str(index) -> True for answers folded in
+        "dimensions": {},     # name -> running sums (see _fold_score)
+        "strengths": [],
+        "weaknesses": [],
+    }
+
+
+def _dimension_name(raw: str) -> str:
+    # "Technical Accuracy" / "technical_accuracy" -> technical_accuracy
+    return re.sub(r"[^a-z0-9]+", "_", str(raw).lower()).strip("_")
+
+
+def _fold_score(dim: Optional[Dict], x: int, y: float) -> Dict:
+    if dim is None:
+        dim = {"n": 0, "sum": 0.0, "sum_x": 0.0, "sum_xx": 0.0, "sum_xy": 0.0,
+               "min": y, "max": y, "last": y}
+
+    dim["n"] += 1
+    dim["sum"] += y
+    dim["sum_x"] += x
+    dim["sum_xx"] += x * x
+    dim["sum_xy"] += x * y
+    dim["min"] = min(dim["min"], y)
+    dim["max"] = max(dim["max"], y)
+    dim["last"] = y
+    return dim
+
+
+def _trend(dim: Dict) -> float:
+    """
+    Least-squares slope of score vs. question index (points per question).
+    """
+    n = dim["n"]
+    denom = n * dim["sum_xx"] - dim["sum_x"] ** 2
+    if n < 2 or denom == 0:
+        return 0.0
+    return (n * dim["sum_xy"] - dim["sum_x"] * dim["sum"]) / denom
+
+
+def _push_note(notes: List[Dict], note: Dict):
+    notes.append(note)
+    del notes[:-MAX_NOTES]
+
+
+def update_aggregates(aggregates: Dict, index: int, evaluation: Dict) -> Dict:
+    """
+    Fold one answer's evaluation into the running aggregates (O(1)
+    per answer; re-delivered evaluations are ignored).
+    """
+    folded = aggregates["answers"]
+    if isinstance(folded, list):
+        # Stored before folded indexes were keyed
+        folded = aggregates["answers"] = {str(i): True for i in folded}
+
+    if str(index) in folded:
+        return aggregates
+    folded[str(index)] = True
+
+    scores = {}
+    for raw, value in (evaluation.get("scores") or {}).items():
+        try:
+            scores[_dimension_name(raw)] = float(value)
+        except (TypeError, ValueError):
+            continue
+
+    for name, score in scores.items():
+        aggregates["dimensions"][name] = _fold_score(
+            aggregates["dimensions"].get(name), index, score
+        )
+
+    if scores:
+        feedback = evaluation.get("feedback") or []
+        summary = evaluation.get("summary") or (feedback[0] if feedback else "")
+
+        best = max(scores, key=scores.get)
+        worst = min(scores, key=scores.get)
+
+        if scores[best] >= 7:
+            _push_note(aggregates["strengths"], {
+                "q": index, "dimension": best, "score": scores[best],
+                "note": clip_text(summary, NOTE_CHARS),
+            })
+        if scores[worst] <= 5:
+            _push_note(aggregates["weaknesses"], {
+                "q": index, "dimension": worst, "score": scores[worst],
+                "note": clip_text(feedback[-1] if feedback else summary, NOTE_CHARS),
+            })
+
+    return aggregates
+
+
+def build_aggregates(answers: List[Dict]) -> Dict:
+    """
+    Aggregates replayed from stored answers (sessions that predate
+    incremental aggregation).
+    """
+    aggregates = empty_aggregates()
+    for index, entry in enumerate(answers):
+        if entry.get("evaluation_status", "done") == "done" and entry.get("evaluation"):
+            update_aggregates(aggregates, index, entry["evaluation"])
+    return aggregates
+
+
+def aggregate_summary(aggregates: Dict, total_answers: int) -> Dict:
+    """
+    Compact, fixed-size view for the final report prompt.
+    """
+    dimensions = {}
+    for name, dim in aggregates["dimensions"].items():
+        dimensions[name] = {
+            "mean": round(dim["sum"] / dim["n"], 1),
+            "min": dim["min"],
+            "max": dim["max"],
+            "last": dim["last"],
+            "trend": round(_trend(dim), 2),
+        }
+
+    return {
+        "answers": total_answers,
+        "evaluated": len(aggregates["answers"]),
+        "dimensions": dimensions,
+        "strengths": aggregates["strengths"],
+        "weaknesses": aggregates["weaknesses"],
+    }
@@ -0,0 +1,68 @@
+import re
+from typing import List
+
+
+# Sentence end: terminal punctuation, optional closing quote/bracket, whitespace
+_BOUNDARY = re.compile(r"[.!?]+[\"')\]]*\s+")
+
+# Words whose trailing period does not end a sentence
+_ABBREVIATIONS = {"e.g", "i.e", "etc", "vs", "mr", "mrs", "ms", "dr", "prof"}
+
+
+class SentenceChunker:
+    """
+    Incrementally splits streamed LLM text into speakable sentences.
+
+    feed() accepts arbitrary token fragments and returns the
+    sentences completed so far; flush() returns the remainder.
+    Very short sentences are merged with the next one so TTS
+    isn't called for fragments like "Great.", and run-on text is
+    cut at the last comma/space once it exceeds `max_chars`.
+    """
+
+    def __init__(self, min_chars: int = 20, max_chars: int = 240):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self._buffer += text
+        sentences = []
+
+        start = 0
+        for match in _BOUNDARY.finditer(self._buffer):
+            end = match.end()
+            candidate = self._buffer[start:end].strip()
+
+            if self._ends_with_abbreviation(self._buffer[:match.start() + 1]):
+                continue
+            if len(candidate) < self.min_chars:
+                continue
+
+            sentences.append(candidate)
+            start = end
+
+        self._buffer = self._buffer[start:]
+
+        # No boundary in sight: cut run-on text at a soft break
+        while len(self._buffer) > self.max_chars:
+            cut = max(
+                self._buffer.rfind(",", 0, self.max_chars),
+                self._buffer.rfind(" ", 0, self.max_chars),
+            )
+            if cut <= 0:
+                cut = self.max_chars
+            sentences.append(self._buffer[:cut + 1].strip())
+            self._buffer = self._buffer[cut + 1:]
+
+        return sentences
+
+    def flush(self) -> List[str]:
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        return [remainder] if remainder else []
+
+    @staticmethod
+    def _ends_with_abbreviation(text: str) -> bool:
+        words = text.rstrip(".").split()
+        return bool(words) and words[-1].lower() in _ABBREVIATIONS
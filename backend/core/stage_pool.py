@@ -0,0 +1,169 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, AsyncIterator, Callable, Deque, Dict
+
+
+class StageOverloaded(Exception):
+    pass
+
+
+class LatencyStats:
+    """
+    Rolling window of latency samples (milliseconds).
+    """
+
+    def __init__(self, window: int = 1200):
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, ms: float):
+        self.samples.append(ms)
+
+    def stats(self) -> Dict[str, float]:
+        if not self.samples:
+            return {"p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+
+        ordered = sorted(self.samples)
+        return {
+            "p50_ms": round(ordered[len(ordered) // 2], 2),
+            "p95_ms": round(ordered[max(0, math.ceil(len(ordered) * 0.95) - 1)], 2),
+            "max_ms": round(ordered[-1], 2),
+        }
+
+
+class StagePool:
+    """
+    Bounded executor for one pipeline stage (STT, LLM, TTS).
+
+    Work runs off the event loop on `executor`. At most
+    `max_pending` jobs (queued + running) are admitted; beyond
+    that StageOverloaded is raised instead of growing the queue.
+    """
+
+    def __init__(self, name: str, executor: Executor, max_pending: int):
+        self.name = name
+        self.executor = executor
+        self.max_pending = max_pending
+
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _admit(self):
+        # Only touched from the event loop thread → no lock needed
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise StageOverloaded(
+                f"{self.name} stage is busy ({self.pending} pending)"
+            )
+
+        self.pending += 1
+
+    async def run(self, fn: Callable, *args) -> Any:
+        self._admit()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, fn, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    async def stream(self, fn: Callable, *args) -> AsyncIterator[Any]:
+        """
+        Run a blocking generator function on the executor and yield
+        its items on the event loop as they are produced.
+
+        Thread executors only (generators can't cross processes).
+        Closing the async iterator early stops the producer at its
+        next item.
+        """
+        self._admit()
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        end = object()
+
+        def pump():
+            try:
+                for item in fn(*args):
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, item)
+            except BaseException as e:
+                loop.call_soon_threadsafe(queue.put_nowait, _StreamError(e))
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, end)
+
+        producer = loop.run_in_executor(self.executor, pump)
+
+        try:
+            while True:
+                item = await queue.get()
+                if item is end:
+                    break
+                if isinstance(item, _StreamError):
+                    raise item.error
+                yield item
+        finally:
+            stop.set()
+            self.pending -= 1
+            self.completed += 1
+            producer.add_done_callback(lambda f: f.exception())
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class _StreamError:
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop responsiveness.
+
+    Sleeps for `interval_ms` in a loop and records how late each
+    wake-up is. Any blocking call on the loop shows up as lag.
+    """
+
+    def __init__(self, interval_ms: int = 50, window: int = 1200):
+        self.interval = interval_ms / 1000.0
+        self.lag = LatencyStats(window)
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - started - self.interval
+            self.lag.record(max(lag, 0.0) * 1000.0)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Lag in milliseconds over the recent window.
+        """
+        return self.lag.stats()
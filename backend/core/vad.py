@@ -0,0 +1,423 @@
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from backend.core.audio_utils import TARGET_SAMPLE_RATE, load_audio
+
+
+class EnergyVAD:
+    """
+    Frame-level voice activity detection from signal energy.
+
+    Frames are scored in one vectorized pass (RMS in dBFS). The
+    speech threshold adapts to the background: it sits `margin_db`
+    above a running noise-floor estimate, but never below
+    `min_speech_db`.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = TARGET_SAMPLE_RATE,
+        frame_ms: int = 30,
+        min_speech_db: float = -45.0,
+        margin_db: float = 12.0,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_len = int(sample_rate * frame_ms / 1000)
+        self.frame_ms = frame_ms
+        self.min_speech_db = min_speech_db
+        self.margin_db = margin_db
+
+        self.noise_floor_db = -60.0
+
+    def frame_energy_db(self, audio: np.ndarray) -> np.ndarray:
+        """
+        RMS energy (dBFS) of each complete frame.
+        """
+        n_frames = audio.shape[0] // self.frame_len
+        if n_frames == 0:
+            return np.empty(0, dtype=np.float32)
+
+        frames = audio[: n_frames * self.frame_len].reshape(
+            n_frames, self.frame_len
+        )
+        rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+        return 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+    def is_speech(self, audio: np.ndarray) -> np.ndarray:
+        """
+        Boolean speech flag per frame; updates the noise floor.
+        """
+        energy = self.frame_energy_db(audio)
+        if energy.size == 0:
+            return np.zeros(0, dtype=bool)
+
+        threshold = max(self.min_speech_db, self.noise_floor_db + self.margin_db)
+        speech = energy > threshold
+
+        # Track the background level from non-speech frames only
+        quiet = energy[~speech]
+        if quiet.size:
+            self.noise_floor_db = 0.9 * self.noise_floor_db + 0.1 * float(
+                np.median(quiet)
+            )
+
+        return speech
+
+
+class UtteranceEndpointer:
+    """
+    Decides when a streamed utterance has ended.
+
+    An utterance starts after `min_speech_ms` of speech and ends
+    after `end_silence_ms` of continuous silence following it.
+    """
+
+    def __init__(
+        self,
+        frame_ms: int = 30,
+        min_speech_ms: int = 150,
+        end_silence_ms: int = 700,
+    ):
+        self.frame_ms = frame_ms
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.end_silence_frames = max(1, end_silence_ms // frame_ms)
+        self.reset()
+
+    def reset(self):
+        self.speech_frames = 0
+        self.trailing_silence = 0
+        self.started = False
+
+    def update(self, speech: np.ndarray) -> bool:
+        """
+        Feed per-frame speech flags; True once the utterance ended.
+        """
+        for flag in speech:
+            if flag:
+                self.speech_frames += 1
+                self.trailing_silence = 0
+                if self.speech_frames >= self.min_speech_frames:
+                    self.started = True
+            else:
+                self.trailing_silence += 1
+                if not self.started:
+                    # Blips shorter than min_speech_ms don't count
+                    self.speech_frames = 0
+
+            if self.started and self.trailing_silence >= self.end_silence_frames:
+                return True
+
+        return False
+
+
+class SilenceTrimmer:
+    """
+    Pre-pass that removes silence before Whisper decoding.
+
+    Frames are classified in one vectorized pass using energy and
+    zero-crossing rate (quiet but noisy-sounding frames such as
+    fricatives count as speech). Leading/trailing silence is cut
+    and pauses longer than `max_pause_ms` are collapsed to that
+    length. Speech edges keep `pad_ms` of context.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = TARGET_SAMPLE_RATE,
+        frame_ms: int = 30,
+        margin_db: float = 12.0,
+        min_speech_db: float = -50.0,
+        zcr_threshold: float = 0.25,
+        dynamic_range_db: float = 35.0,
+        max_pause_ms: int = 600,
+        pad_ms: int = 200,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_len = int(sample_rate * frame_ms / 1000)
+        self.margin_db = margin_db
+        self.dynamic_range_db = dynamic_range_db
+        self.min_speech_db = min_speech_db
+        self.zcr_threshold = zcr_threshold
+        self.max_pause_frames = max(1, max_pause_ms // frame_ms)
+        self.pad_frames = max(0, pad_ms // frame_ms)
+
+    def speech_mask(self, audio: np.ndarray) -> np.ndarray:
+        """
+        Boolean speech flag per frame (incomplete tail frame excluded).
+        """
+        n_frames = audio.shape[0] // self.frame_len
+        if n_frames == 0:
+            return np.zeros(0, dtype=bool)
+
+        frames = audio[: n_frames * self.frame_len].reshape(
+            n_frames, self.frame_len
+        )
+
+        rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+        energy_db = 20.0 * np.log10(np.maximum(rms, 1e-10))
+        zcr = np.mean(np.abs(np.diff(np.signbit(frames), axis=1)), axis=1)
+
+        # Background level: the quietest tenth of the clip. In clips
+        # with no real silence that is quiet speech, so the threshold
+        # is also capped relative to the loudest frame.
+        noise_floor = np.percentile(energy_db, 10)
+        threshold = max(
+            self.min_speech_db,
+            min(
+                noise_floor + self.margin_db,
+                energy_db.max() - self.dynamic_range_db,
+            ),
+        )
+
+        voiced = energy_db > threshold
+        # Fricatives: quieter than voiced speech, but clearly above
+        # the background and with a high zero-crossing rate
+        unvoiced_db = max(
+            threshold - self.margin_db / 2, noise_floor + self.margin_db / 2
+        )
+        unvoiced = (energy_db > unvoiced_db) & (zcr > self.zcr_threshold)
+        speech = voiced | unvoiced
+
+        if self.pad_frames:
+            kernel = np.ones(2 * self.pad_frames + 1)
+            speech = np.convolve(speech, kernel, mode="same") > 0
+
+        return speech
+
+    def trim(self, audio: np.ndarray):
+        """
+        Returns: (trimmed_audio, seconds_saved)
+        Audio without detectable speech is returned unchanged.
+        """
+        sample_keep = self.keep_mask(audio)
+        if sample_keep is None:
+            return audio, 0.0
+
+        trimmed = audio[sample_keep]
+        saved = (audio.shape[0] - trimmed.shape[0]) / self.sample_rate
+        return trimmed, saved
+
+    def keep_mask(self, audio: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Per-sample flag of what trim() keeps (None: no speech found).
+        """
+        speech = self.speech_mask(audio)
+        if not speech.any():
+            return None
+
+        keep = speech.copy()
+
+        # Collapse long pauses between speech regions
+        first = int(np.argmax(speech))
+        last = len(speech) - int(np.argmax(speech[::-1]))
+        inner = ~speech[first:last]
+
+        if inner.any():
+            # Run starts/ends of silence within the spoken span
+            edges = np.diff(np.concatenate(([0], inner.astype(np.int8), [0])))
+            starts = np.flatnonzero(edges == 1)
+            ends = np.flatnonzero(edges == -1)
+
+            for start, end in zip(starts, ends):
+                length = min(end - start, self.max_pause_frames)
+                keep[first + start : first + start + length] = True
+
+        sample_keep = np.repeat(keep, self.frame_len)
+        tail = audio.shape[0] - sample_keep.shape[0]
+        if tail:
+            sample_keep = np.concatenate(
+                [sample_keep, np.full(tail, keep[-1], dtype=bool)]
+            )
+        return sample_keep
+
+
+# ---------------------------
+# Correctness checks
+# ---------------------------
+
+# Synthetic answer: (kind, seconds). "voiced" is a vowel-like
+# harmonic tone with syllable-rate amplitude modulation,
+# "fricative" quiet high-frequency noise (an "s"), "silence" room
+# noise at -60 dBFS.
+SYNTHETIC_LAYOUT = [
+    ("silence", 1.5),
+    ("voiced", 1.2),
+    ("silence", 0.3),   # short pause: kept whole
+    ("fricative", 0.25),
+    ("voiced", 0.8),
+    ("silence", 2.5),   # long pause: collapsed
+    ("voiced", 1.0),
+    ("fricative", 0.2),
+    ("silence", 2.0),
+]
+
+
+def synthetic_answer(sample_rate: int = TARGET_SAMPLE_RATE, seed: int = 0):
+    """
+    Deterministic clip built from SYNTHETIC_LAYOUT.
+    Returns: (audio, per-sample speech flag)
+    """
+    rng = np.random.default_rng(seed)
+    parts, flags = [], []
+
+    for kind, seconds in SYNTHETIC_LAYOUT:
+        n = int(seconds * sample_rate)
+        t = np.arange(n) / sample_rate
+        noise = 0.001 * rng.standard_normal(n)
+
+        if kind == "voiced":
+            envelope = 0.6 + 0.4 * np.sin(2 * np.pi * 4.0 * t)
+            tone = sum(np.sin(2 * np.pi * f * t) / k for k, f in enumerate((140, 280, 420, 700), 1))
+            part = 0.15 * envelope * tone + noise
+        elif kind == "fricative":
+            hiss = np.diff(rng.standard_normal(n + 1))  # high-pass white noise
+            part = 0.002 * hiss + noise
+        else:
+            part = noise
+
+        parts.append(part.astype(np.float32))
+        flags.append(np.full(n, kind != "silence"))
+
+    return np.concatenate(parts), np.concatenate(flags)
+
+
+def trim_check(trimmer: Optional[SilenceTrimmer] = None) -> Dict:
+    """
+    Whisper-free check on synthetic_answer(): trimming must keep
+    every speech sample, and drop most of the silence.
+    """
+    trimmer = trimmer or SilenceTrimmer()
+    audio, speech = synthetic_answer(trimmer.sample_rate)
+
+    keep = trimmer.keep_mask(audio)
+    if keep is None:
+        keep = np.ones_like(speech)
+
+    rate = trimmer.sample_rate
+    silence = (~speech).sum() / rate
+    dropped = (~keep).sum() / rate
+    lost = (speech & ~keep).sum() / rate
+    # Longest stretch kept must fit: leading pad + max pause + trailing pad
+    max_gap = (
+        (trimmer.max_pause_frames + 2 * trimmer.pad_frames) * trimmer.frame_len / rate
+    )
+
+    kept_silence = np.diff(np.concatenate(([0], (keep & ~speech).astype(np.int8), [0])))
+    runs = np.flatnonzero(kept_silence == -1) - np.flatnonzero(kept_silence == 1)
+    longest = runs.max() / rate if runs.size else 0.0
+
+    return {
+        "audio_sec": round(audio.shape[0] / rate, 2),
+        "silence_sec": round(float(silence), 2),
+        "seconds_saved": round(float(dropped), 2),
+        "speech_sec_lost": round(float(lost), 3),
+        "longest_kept_pause_sec": round(float(longest), 2),
+        "ok": bool(lost == 0 and longest <= max_gap and dropped >= silence / 2),
+    }
+
+
+def _normalize(text: str) -> List[str]:
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def _padded(audio: np.ndarray, seconds: float, sample_rate: int) -> np.ndarray:
+    """
+    Surround the clip with `seconds` of quiet room noise and put a
+    pause of the same length in the middle, as a hesitant
+    candidate's recording would have.
+    """
+    if seconds <= 0:
+        return audio
+
+    rng = np.random.default_rng(0)
+    n = int(seconds * sample_rate)
+
+    def quiet():
+        return (0.001 * rng.standard_normal(n)).astype(np.float32)
+
+    middle = audio.shape[0] // 2
+    return np.concatenate(
+        [quiet(), audio[:middle], quiet(), audio[middle:], quiet()]
+    )
+
+
+def transcript_check(
+    paths: List[str],
+    model=None,
+    pad_seconds: float = 2.0,
+    trimmer: Optional[SilenceTrimmer] = None,
+) -> List[Dict]:
+    """
+    Transcribe each file with and without the SilenceTrimmer
+    pre-pass and compare the (case/punctuation-normalized)
+    transcripts. `model` is a Whisper model or model name.
+    """
+    import difflib
+
+    import whisper
+
+    from backend.config.setting import DEVICE
+
+    if model is None or isinstance(model, str):
+        model = whisper.load_model(model or "base", device=DEVICE)
+    trimmer = trimmer or SilenceTrimmer()
+
+    def transcribe(audio: np.ndarray) -> str:
+        # Greedy decoding, so differences come from the audio only
+        return model.transcribe(
+            audio, fp16=(DEVICE == "cuda"), temperature=0.0
+        ).get("text", "").strip()
+
+    results = []
+    for path in paths:
+        with open(path, "rb") as f:
+            audio = _padded(load_audio(f.read()), pad_seconds, trimmer.sample_rate)
+
+        trimmed, saved = trimmer.trim(audio)
+        full_words = _normalize(transcribe(audio))
+        trimmed_words = _normalize(transcribe(trimmed))
+
+        results.append({
+            "file": path,
+            "audio_sec": round(audio.shape[0] / trimmer.sample_rate, 2),
+            "seconds_saved": round(saved, 2),
+            "unchanged": full_words == trimmed_words,
+            "word_similarity": round(
+                difflib.SequenceMatcher(None, full_words, trimmed_words).ratio(), 3
+            ),
+            "full": " ".join(full_words),
+            "trimmed": " ".join(trimmed_words),
+        })
+
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import sys
+
+    parser = argparse.ArgumentParser(
+        description="Check silence trimming keeps all speech; with files, "
+        "that it leaves their Whisper transcripts unchanged"
+    )
+    parser.add_argument("files", nargs="*", help="sample answer recordings")
+    parser.add_argument("--model", default="base")
+    parser.add_argument(
+        "--pad-seconds", type=float, default=2.0,
+        help="silence added around and inside each clip (0 = as recorded)",
+    )
+    args = parser.parse_args()
+
+    synthetic = trim_check()
+    ok = synthetic["ok"]
+    report = {"synthetic": synthetic}
+
+    if args.files:
+        report["transcripts"] = transcript_check(args.files, args.model, args.pad_seconds)
+        ok = ok and all(r["unchanged"] for r in report["transcripts"])
+
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,301 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import torch
+import whisper
+
+from backend.config.setting import DEVICE
+from backend.core.audio_stack import AudioEngine
+from backend.core.audio_utils import TARGET_SAMPLE_RATE, load_audio
+from backend.core.vad import SilenceTrimmer
+
+
+# Scheduler defaults (overridable via environment)
+STT_BATCH_MAX = int(os.getenv("STT_BATCH_MAX", "8"))
+STT_BATCH_WAIT_MS = int(os.getenv("STT_BATCH_WAIT_MS", "15"))
+STT_TRIM_SILENCE = os.getenv("STT_TRIM_SILENCE", "1") == "1"
+
+# Whisper's fixed decoding window
+WINDOW_SAMPLES = whisper.audio.N_SAMPLES
+
+# Same quality gates whisper.transcribe uses to trigger a retry
+COMPRESSION_RATIO_LIMIT = 2.4
+LOGPROB_LIMIT = -1.0
+
+
+class WhisperBatcher:
+    """
+    Micro-batching scheduler in front of AudioEngine.speech_to_text.
+
+    Requests from any session are queued; a scheduler thread waits
+    up to `max_wait_ms` (or until `max_batch` requests arrived),
+    pads each clip to Whisper's 30 s window and runs one batched
+    mel → encoder → decoder pass. Each caller gets its own result
+    through a Future.
+
+    Clips longer than one window, and batched results that fail
+    Whisper's quality gates, fall back to the regular per-request
+    transcribe() path (which handles seeking and temperature retries).
+    Fallbacks run on their own thread with their own model (loaded
+    on first use), so a long clip never holds up other sessions'
+    batches. Whisper's decoder hooks its kv-cache into the model,
+    so one model can't decode two things at once.
+
+    Before queueing, a VAD pre-pass trims leading/trailing silence
+    and collapses long pauses, so Whisper only pays for speech (and
+    more answers fit in a single 30 s window).
+    """
+
+    def __init__(
+        self,
+        engine: AudioEngine,
+        max_batch: int = STT_BATCH_MAX,
+        max_wait_ms: int = STT_BATCH_WAIT_MS,
+        trim_silence: bool = STT_TRIM_SILENCE,
+    ):
+        self.engine = engine
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000.0
+        self.trimmer = SilenceTrimmer() if trim_silence else None
+
+        self._queue: List[Tuple[np.ndarray, Future]] = []
+        self._cond = threading.Condition()
+
+        self._fallback_engine: Optional[AudioEngine] = None
+        self._fallback_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="whisper-fallback"
+        )
+
+        self.batches = 0
+        self.items = 0
+        self.fallbacks = 0
+        self.audio_seconds = 0.0
+        self.trimmed_seconds = 0.0
+
+        self._worker = threading.Thread(
+            target=self._run, name="whisper-batcher", daemon=True
+        )
+        self._worker.start()
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+
+    def submit(self, audio: Union[bytes, np.ndarray]) -> Future:
+        """
+        Queue audio (bytes or 16 kHz float32) for transcription.
+        """
+        if isinstance(audio, (bytes, bytearray, memoryview)):
+            # Decode on the caller's thread so decoding parallelizes
+            audio = load_audio(bytes(audio))
+
+        if self.trimmer is not None and audio.size:
+            audio = self._trim(audio)
+
+        future: Future = Future()
+        if audio.size == 0:
+            future.set_result("")
+            return future
+
+        with self._cond:
+            self._queue.append((audio.astype(np.float32, copy=False), future))
+            self._cond.notify()
+
+        return future
+
+    def transcribe(self, audio: Union[bytes, np.ndarray]) -> str:
+        return self.submit(audio).result()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "fallbacks": self.fallbacks,
+            "audio_seconds": round(self.audio_seconds, 2),
+            "trimmed_seconds": round(self.trimmed_seconds, 2),
+        }
+
+    def _trim(self, audio: np.ndarray) -> np.ndarray:
+        total = audio.shape[0] / TARGET_SAMPLE_RATE
+        trimmed, saved = self.trimmer.trim(audio)
+
+        self.audio_seconds += total
+        self.trimmed_seconds += saved
+
+        if saved > 0:
+            print(f"[INFO] VAD trimmed {saved:.2f}s of {total:.2f}s audio")
+
+        return trimmed
+
+    # ---------------------------
+    # Scheduler
+    # ---------------------------
+
+    def _take_batch(self) -> List[Tuple[np.ndarray, Future]]:
+        with self._cond:
+            self._cond.wait_for(lambda: self._queue)
+
+            deadline = time.monotonic() + self.max_wait
+            while len(self._queue) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = self._queue[: self.max_batch]
+            del self._queue[: self.max_batch]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            try:
+                self._process(batch)
+            except Exception as e:
+                print(f"[ERROR] Batched transcription failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _process(self, batch: List[Tuple[np.ndarray, Future]]):
+        windowed = [
+            (audio, future) for audio, future in batch
+            if audio.shape[0] <= WINDOW_SAMPLES
+        ]
+
+        for audio, future in batch:
+            if audio.shape[0] > WINDOW_SAMPLES:
+                self._fallback(audio, future)
+
+        if not windowed:
+            return
+
+        model = self.engine.stt_model
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(
+                whisper.pad_or_trim(torch.from_numpy(audio)),
+                n_mels=model.dims.n_mels,
+            )
+            for audio, _ in windowed
+        ]).to(model.device)
+
+        options = whisper.DecodingOptions(
+            fp16=(DEVICE == "cuda"),
+            without_timestamps=True,
+        )
+        results = whisper.decode(model, mels, options)
+
+        self.batches += 1
+        self.items += len(windowed)
+
+        for (audio, future), result in zip(windowed, results):
+            if (
+                result.compression_ratio > COMPRESSION_RATIO_LIMIT
+                or result.avg_logprob < LOGPROB_LIMIT
+            ):
+                self._fallback(audio, future)
+            else:
+                future.set_result(result.text.strip())
+
+    def _fallback(self, audio: np.ndarray, future: Future):
+        self.fallbacks += 1
+        self._fallback_executor.submit(self._transcribe_fallback, audio, future)
+
+    def _transcribe_fallback(self, audio: np.ndarray, future: Future):
+        try:
+            if self._fallback_engine is None:
+                self._fallback_engine = AudioEngine(self.engine.whisper_model)
+            future.set_result(self._fallback_engine.speech_to_text(audio))
+        except Exception as e:
+            future.set_exception(e)
+
+
+# ---------------------------
+# Throughput vs. latency benchmark
+# ---------------------------
+
+def benchmark(
+    clips: List[np.ndarray],
+    clients: int = 8,
+    requests: int = 64,
+    batch_sizes: Tuple[int, ...] = (1, 2, 4, 8),
+    max_wait_ms: int = STT_BATCH_WAIT_MS,
+    engine: Optional[AudioEngine] = None,
+) -> List[Dict[str, float]]:
+    """
+    `clients` concurrent sessions each transcribe clips back to back
+    (closed loop) until `requests` are done; reported per batch cap.
+    max_batch=1 is the old one-request-at-a-time engine.
+    """
+    from backend.core.stage_pool import LatencyStats
+
+    engine = engine or AudioEngine()
+    results = []
+
+    for max_batch in batch_sizes:
+        batcher = WhisperBatcher(
+            engine, max_batch=max_batch, max_wait_ms=max_wait_ms, trim_silence=False
+        )
+        batcher.transcribe(clips[0])  # warm-up
+
+        latency = LatencyStats(window=requests)
+        counter = iter(range(requests))
+        lock = threading.Lock()
+
+        def client():
+            while True:
+                with lock:
+                    i = next(counter, None)
+                if i is None:
+                    return
+                started = time.perf_counter()
+                batcher.transcribe(clips[i % len(clips)])
+                latency.record((time.perf_counter() - started) * 1000.0)
+
+        threads = [threading.Thread(target=client) for _ in range(clients)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        stats = batcher.stats()
+        results.append({
+            "max_batch": max_batch,
+            "clients": clients,
+            "requests": requests,
+            "throughput_rps": round(requests / elapsed, 2),
+            **latency.stats(),
+            "avg_batch_size": stats["avg_batch_size"],
+            "fallbacks": stats["fallbacks"],
+        })
+
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Whisper batching: throughput vs. p95 latency")
+    parser.add_argument("audio", nargs="+", help="answer recordings (any format ffmpeg reads)")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--max-wait-ms", type=int, default=STT_BATCH_WAIT_MS)
+    args = parser.parse_args()
+
+    clips = []
+    for path in args.audio:
+        with open(path, "rb") as f:
+            clips.append(load_audio(f.read()))
+
+    print(json.dumps(benchmark(
+        clips, args.clients, args.requests, tuple(args.batch_sizes), args.max_wait_ms
+    ), indent=2))
@@ -1,16 +1,57 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+import zipfile
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, WebSocket
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from fastapi.staticfiles import StaticFiles
 
-from backend.core.agent_ocr import parse_resume
+from backend.core.agent_ocr import get_resume_parser, ingest_resume
 from backend.core.llm_brain import (
     generate_questions,
     evaluate_answer,
     generate_final_report
 )
+from backend.core.llm_cache import get_llm_cache
+from backend.core.llm_client import get_llm_client
+from backend.core.llm_scheduler import LLMOverloaded
+from backend.core.prompt_digest import count_tokens, profile_digest
+from backend.core.score_aggregates import (
+    aggregate_summary,
+    build_aggregates,
+    update_aggregates,
+)
 from backend.services.stt_service import transcribe_audio
-from backend.services.tts_service import synthesize_speech
-from backend.models.interview import InterviewState
+from backend.services.tts_service import (
+    TTSOverloaded,
+    synthesize_speech,
+    get_audio_cache,
+    get_tts_pool,
+)
+from backend.services.prefetch_service import SpeechPrefetcher
+from backend.services.job_service import BackgroundJobs
+from backend.services.session_service import (
+    SessionRegistry,
+    SessionNotFound,
+    SessionLimitExceeded,
+    ConcurrentUpdate,
+)
+from backend.services.session_store import create_session_store
+from backend.services.resume_batch import (
+    BatchTooLarge,
+    ResumeBatchIngestor,
+    batch_directory,
+    remove_batch_directory,
+    spool_files,
+)
+from backend.sockets.interview import get_interview_socket, interview_socket_stats
 
 # -------------------------------------------------
 # App Initialization
@@ -25,14 +66,150 @@ app = FastAPI(
 app.mount("/static", StaticFiles(directory="/app/static"), name="static")
 
 # -------------------------------------------------
-# Global Session (v1.0 = single session only)
+# Session Registry (one state object per interview)
 # -------------------------------------------------
-SESSION = InterviewState()
+# SESSION_STORE_URL=sqlite:///... lets several uvicorn
+# workers (and restarts) share in-flight interviews.
+SESSIONS = SessionRegistry(store=create_session_store())
+
+
+@app.on_event("shutdown")
+def close_session_store():
+    SESSIONS.store.flush()
+    SESSIONS.store.close()
+    RESUME_BATCH.store.flush()
+    RESUME_BATCH.store.close()
+
+
+@contextmanager
+def session_scope(session_id: str):
+    """
+    Locks the given session for the duration of a request
+    and maps registry errors to HTTP errors.
+    """
+    try:
+        with SESSIONS.session(session_id) as session:
+            yield session
+
+    except SessionNotFound:
+        raise HTTPException(
+            status_code=404,
+            detail="Session not found or expired"
+        )
+
+    except SessionLimitExceeded as e:
+        raise HTTPException(
+            status_code=413,
+            detail=str(e)
+        )
+
+    except ConcurrentUpdate as e:
+        raise HTTPException(
+            status_code=409,
+            detail=str(e)
+        )
+
+
+def session_profile_digest(session) -> str:
+    """
+    Prompt-sized profile, computed once per session.
+    """
+    if session.profile_digest is None:
+        session.profile_digest = profile_digest(session.profile)
+    return session.profile_digest
+
+
+def session_aggregates(session) -> dict:
+    """
+    Running evaluation aggregates, kept up to date as evaluations land.
+    """
+    if session.aggregates is None:
+        session.aggregates = build_aggregates(session.answers)
+    return session.aggregates
+
+
+def llm_busy(error: LLMOverloaded) -> HTTPException:
+    """
+    Low-priority LLM work shed under load: ask the client to retry.
+    """
+    return HTTPException(
+        status_code=503,
+        detail=str(error),
+        headers={"Retry-After": "10"}
+    )
+
+
+def tts_busy(error: TTSOverloaded) -> HTTPException:
+    """
+    TTS worker pool at capacity: ask the client to retry.
+    """
+    return HTTPException(
+        status_code=503,
+        detail=str(error),
+        headers={"Retry-After": "5"}
+    )
+
+
+# Profiles parsed ahead of time by batch ingestion. With several
+# workers PROFILE_STORE_URL must be shared (it follows
+# SESSION_STORE_URL by default), or /start?profile_id=... only
+# finds profiles parsed by the same worker.
+RESUME_BATCH = ResumeBatchIngestor()
+
+# Background TTS for questions known ahead of time
+PREFETCHER = SpeechPrefetcher()
+
+# Answer evaluations run after /answer has replied
+EVALUATIONS = BackgroundJobs(name="evaluation")
+EVAL_WAIT_TIMEOUT_SEC = float(os.getenv("EVAL_WAIT_TIMEOUT_SEC", "60"))
+# A pending evaluation queued by another worker this long ago is
+# presumed lost (worker restarted) and queued again
+EVAL_STALE_SEC = float(os.getenv("EVAL_STALE_SEC", "300"))
+
+# Recorded on the evaluations this process queues
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+# -------------------------------------------------
+# Fixed Prompts
+# -------------------------------------------------
+GREETING_TEXT = (
+    "Hello, welcome to Intervux AI. "
+    "I will be your interviewer today. "
+    "This interview will include a short introduction, "
+    "technical questions, and feedback at the end. "
+    "Please upload your resume to begin."
+)
+
+
+@app.on_event("startup")
+def init_llm_client():
+    """
+    Create the shared LLM client up front (fails fast on a
+    missing API key instead of on the first request).
+    """
+    get_llm_client()
+
+
+@app.on_event("startup")
+def precompute_greeting():
+    """
+    Warm the TTS pool and audio cache with the fixed greeting
+    so the first /start is a cache hit.
+    """
+    threading.Thread(
+        target=synthesize_speech,
+        args=(GREETING_TEXT,),
+        name="greeting-prefetch",
+        daemon=True,
+    ).start()
+
 
 # -------------------------------------------------
 # Response Models
 # -------------------------------------------------
 class StartResponse(BaseModel):
+    session_id: str
     greeting_audio_url: str
     message: str
 
@@ -45,7 +222,23 @@ class QuestionResponse(BaseModel):
 
 class AnswerResponse(BaseModel):
     transcript: str
-    evaluation: dict
+    evaluation_id: str
+    evaluation_status: str
+    evaluation: Optional[dict] = None
+
+
+class EvaluationStatus(BaseModel):
+    evaluation_id: str
+    index: int
+    question: str
+    status: str                          # pending | done | failed
+    evaluation: Optional[dict] = None
+
+
+class EvaluationsResponse(BaseModel):
+    session_id: str
+    outstanding: int
+    evaluations: List[EvaluationStatus]
 
 
 class FinalReportResponse(BaseModel):
@@ -56,23 +249,45 @@ class FinalReportResponse(BaseModel):
 # 1️⃣ Start Interview (Voice Greeting)
 # -------------------------------------------------
 @app.post("/start", response_model=StartResponse)
-def start_interview():
+def start_interview(profile_id: Optional[str] = Query(None)):
     """
     Initializes a new interview session and returns
     a voice-based greeting.
+
+    `profile_id` (from /resumes/batch) starts the session with an
+    already parsed resume, skipping /upload-resume.
     """
-    greeting_text = (
-        "Hello, welcome to Intervux AI. "
-        "I will be your interviewer today. "
-        "This interview will include a short introduction, "
-        "technical questions, and feedback at the end. "
-        "Please upload your resume to begin."
-    )
+    record = None
+    if profile_id is not None:
+        record = RESUME_BATCH.load_profile(profile_id)
+        if record is None:
+            raise HTTPException(
+                status_code=404,
+                detail="Profile not found"
+            )
+
+    try:
+        session_id = SESSIONS.create()
+    except SessionLimitExceeded as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e)
+        )
 
-    audio_url = synthesize_speech(greeting_text)
-    SESSION.reset()
+    if record is not None:
+        with session_scope(session_id) as session:
+            session.resume_text = record["resume_text"]
+            session.profile = record["profile"]
+            session.profile_digest = record["profile_digest"]
+
+    try:
+        audio_url = synthesize_speech(GREETING_TEXT)
+    except TTSOverloaded as e:
+        SESSIONS.delete(session_id)
+        raise tts_busy(e)
 
     return StartResponse(
+        session_id=session_id,
         greeting_audio_url=audio_url,
         message="Interview session initialized"
     )
@@ -82,43 +297,98 @@ def start_interview():
 # 2️⃣ Resume Upload & Parsing
 # -------------------------------------------------
 @app.post("/upload-resume")
-def upload_resume(file: UploadFile = File(...)):
+def upload_resume(
+    session_id: str = Query(...),
+    file: UploadFile = File(...)
+):
     """
     Uploads and parses candidate resume.
     """
-    resume_text, extracted_profile = parse_resume(file)
-
-    SESSION.resume_text = resume_text
-    SESSION.profile = extracted_profile
+    with session_scope(session_id) as session:
+        try:
+            parsed = ingest_resume(file)
+        except LLMOverloaded as e:
+            raise llm_busy(e)
+
+        extracted_profile = parsed["profile"]
+        session.resume_text = parsed["resume_text"]
+        session.profile = extracted_profile
+        session.profile_digest = None
+        digest = session_profile_digest(session)
+
+    print(
+        f"[INFO] Profile digest: {count_tokens(json.dumps(extracted_profile, indent=2))} "
+        f"→ {count_tokens(digest)} tokens"
+    )
 
     return {
         "status": "resume_parsed",
-        "profile_summary": extracted_profile
+        "profile_summary": extracted_profile,
+        "parse_tier": parsed["tier"],
+        "parse_timings_ms": parsed["timings_ms"]
     }
 
 
+@app.post("/resumes/batch")
+def ingest_resume_batch(files: List[UploadFile] = File(...)):
+    """
+    Parses many resumes (files and/or .zip archives) in parallel.
+
+    Streams newline-delimited JSON events as files finish; each
+    result carries a profile_id for POST /start?profile_id=...
+    """
+    directory = batch_directory()
+    try:
+        items = spool_files([(f.filename, f.file) for f in files], directory)
+    except BatchTooLarge as e:
+        remove_batch_directory(directory)
+        raise HTTPException(
+            status_code=413,
+            detail=str(e)
+        )
+    except zipfile.BadZipFile as e:
+        remove_batch_directory(directory)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid zip archive: {e}"
+        )
+
+    def events():
+        try:
+            for event in RESUME_BATCH.ingest(items):
+                yield json.dumps(event) + "\n"
+        finally:
+            remove_batch_directory(directory)
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
 # -------------------------------------------------
 # 3️⃣ Generate Interview Questions (Frozen Count)
 # -------------------------------------------------
 @app.post("/generate-questions")
-def generate_interview_questions():
+def generate_interview_questions(session_id: str = Query(...)):
     """
     Generates a fixed number of interview questions
     based on the parsed resume.
     """
-    if not SESSION.profile:
-        raise HTTPException(
-            status_code=400,
-            detail="Resume not uploaded"
+    with session_scope(session_id) as session:
+        if not session.profile:
+            raise HTTPException(
+                status_code=400,
+                detail="Resume not uploaded"
+            )
+
+        questions = generate_questions(
+            profile=session_profile_digest(session),
+            num_questions=4  # 🔒 FROZEN FOR v1.0
         )
 
-    questions = generate_questions(
-        profile=SESSION.profile,
-        num_questions=4  # 🔒 FROZEN FOR v1.0
-    )
+        session.questions = questions
+        session.current_index = 0
 
-    SESSION.questions = questions
-    SESSION.current_index = 0
+    # Synthesize every question now, while the candidate gets ready
+    PREFETCHER.prefetch(questions)
 
     return {
         "total_questions": len(questions)
@@ -129,21 +399,26 @@ def generate_interview_questions():
 # 4️⃣ Ask Current Question (Voice Output)
 # -------------------------------------------------
 @app.get("/question", response_model=QuestionResponse)
-def get_current_question():
+def get_current_question(session_id: str = Query(...)):
     """
     Returns the current interview question
     along with synthesized speech.
     """
-    idx = SESSION.current_index
+    with session_scope(session_id) as session:
+        idx = session.current_index
 
-    if idx >= len(SESSION.questions):
-        raise HTTPException(
-            status_code=400,
-            detail="No more questions"
-        )
+        if idx >= len(session.questions):
+            raise HTTPException(
+                status_code=400,
+                detail="No more questions"
+            )
 
-    question_text = SESSION.questions[idx]
-    audio_url = synthesize_speech(question_text)
+        question_text = session.questions[idx]
+
+    try:
+        audio_url = PREFETCHER.get_url(question_text)
+    except TTSOverloaded as e:
+        raise tts_busy(e)
 
     return QuestionResponse(
         question_text=question_text,
@@ -153,66 +428,295 @@ def get_current_question():
 
 
 # -------------------------------------------------
-# 5️⃣ Submit Answer (Voice → STT → Evaluation)
+# 5️⃣ Submit Answer (Voice → STT → Background Evaluation)
 # -------------------------------------------------
 @app.post("/answer", response_model=AnswerResponse)
-def submit_answer(audio: UploadFile = File(...)):
+def submit_answer(
+    session_id: str = Query(...),
+    audio: UploadFile = File(...)
+):
     """
-    Accepts a spoken answer, transcribes it,
-    evaluates the response, and advances the session.
+    Accepts a spoken answer, transcribes it and advances the session.
+    Evaluation runs in the background; poll /evaluations or
+    subscribe to /evaluations/stream for the result.
     """
-    if SESSION.current_index >= len(SESSION.questions):
-        raise HTTPException(
-            status_code=400,
-            detail="Interview already completed"
-        )
+    with session_scope(session_id) as session:
+        if session.current_index >= len(session.questions):
+            raise HTTPException(
+                status_code=400,
+                detail="Interview already completed"
+            )
+
+        if not audio:
+            raise HTTPException(
+                status_code=400,
+                detail="Audio input required"
+            )
+
+        transcript = transcribe_audio(audio)
+
+        question = session.questions[session.current_index]
+        index = len(session.answers)
+
+        session.answers.append({
+            "question": question,
+            "answer": transcript,
+            "evaluation": None,
+            "evaluation_status": "pending"
+        })
+
+        session.current_index += 1
+        _queue_evaluation(session, index)
 
-    if not audio:
-        raise HTTPException(
-            status_code=400,
-            detail="Audio input required"
-        )
+    return AnswerResponse(
+        transcript=transcript,
+        evaluation_id=_evaluation_id(session_id, index),
+        evaluation_status="pending"
+    )
 
-    transcript = transcribe_audio(audio)
 
-    evaluation = evaluate_answer(
-        question=SESSION.questions[SESSION.current_index],
-        answer=transcript,
-        profile=SESSION.profile
+def _evaluation_id(session_id: str, index: int) -> str:
+    return f"{session_id}:{index}"
+
+
+def _queue_evaluation(session, index: int):
+    """
+    Claims an answer's evaluation for this worker and queues it.
+
+    Called with the session locked: the job can only record its
+    result after the caller's changes are committed (if they are
+    discarded instead, the claim no longer matches and the result
+    is dropped).
+    """
+    entry = session.answers[index]
+    entry["evaluation_status"] = "pending"
+    entry["evaluation_owner"] = WORKER_ID
+    entry["evaluation_queued_at"] = time.time()
+    claim = (WORKER_ID, entry["evaluation_queued_at"])
+
+    session_id = session.session_id
+    EVALUATIONS.submit(
+        session_id,
+        evaluate_answer,
+        on_done=lambda result: _record_evaluation(
+            session_id, index, claim, "done", result
+        ),
+        on_error=lambda e: _record_evaluation(
+            session_id, index, claim, "failed", {"error": str(e)}
+        ),
+        job_key=index,
+        question=entry["question"],
+        answer=entry["answer"],
+        profile=session_profile_digest(session),
+        on_field=lambda field, key, value: EVALUATIONS.report(
+            session_id, index, {"field": field, "key": key, "value": value}
+        ),
     )
 
-    SESSION.answers.append({
-        "question": SESSION.questions[SESSION.current_index],
-        "answer": transcript,
-        "evaluation": evaluation
-    })
 
-    SESSION.current_index += 1
+def _evaluation_lost(session_id: str, index: int, entry: dict) -> bool:
+    """
+    A pending evaluation nobody will finish: queued by this worker
+    but no longer running here, or by another worker too long ago.
+    """
+    if entry.get("evaluation_status") != "pending":
+        return False
+    if entry.get("evaluation_owner") == WORKER_ID:
+        return not EVALUATIONS.running(session_id, index)
+    return time.time() - entry.get("evaluation_queued_at", 0) > EVAL_STALE_SEC
 
-    return AnswerResponse(
-        transcript=transcript,
-        evaluation=evaluation
+
+def _record_evaluation(
+    session_id: str, index: int, claim: tuple, status: str, result: dict
+):
+    """
+    Stores a finished evaluation on its answer, if the answer still
+    carries this job's claim (not re-queued since, and not an answer
+    discarded by ConcurrentUpdate). Failed ones stay out of the
+    aggregates.
+    """
+    try:
+        with SESSIONS.session(session_id) as session:
+            entry = session.answers[index]
+            if entry.get("evaluation_status") == "done":
+                return
+            if (entry.get("evaluation_owner"), entry.get("evaluation_queued_at")) != claim:
+                print(f"[WARN] Dropping superseded evaluation {_evaluation_id(session_id, index)}")
+                return
+            entry["evaluation"] = result
+            entry["evaluation_status"] = status
+
+            if status == "done":
+                update_aggregates(session_aggregates(session), index, result)
+    except (SessionNotFound, SessionLimitExceeded, IndexError) as e:
+        print(f"[WARN] Dropping evaluation for {session_id}:{index}: {e}")
+
+
+def _evaluation_statuses(session_id: str) -> List[EvaluationStatus]:
+    # Read from the session (not local jobs) so any worker can answer
+    with session_scope(session_id) as session:
+        for i, entry in enumerate(session.answers):
+            if _evaluation_lost(session_id, i, entry):
+                print(f"[WARN] Re-queueing lost evaluation {_evaluation_id(session_id, i)}")
+                _queue_evaluation(session, i)
+
+        return [
+            EvaluationStatus(
+                evaluation_id=_evaluation_id(session_id, i),
+                index=i,
+                question=entry["question"],
+                status=entry.get("evaluation_status", "done"),
+                evaluation=entry.get("evaluation"),
+            )
+            for i, entry in enumerate(session.answers)
+        ]
+
+
+@app.get("/evaluations", response_model=EvaluationsResponse)
+def get_evaluations(session_id: str = Query(...)):
+    """
+    Status (and result, once done) of every answer evaluation.
+    """
+    statuses = _evaluation_statuses(session_id)
+
+    return EvaluationsResponse(
+        session_id=session_id,
+        outstanding=sum(s.status == "pending" for s in statuses),
+        evaluations=statuses
     )
 
 
+@app.get("/evaluations/stream")
+def stream_evaluations(session_id: str = Query(...)):
+    """
+    Server-Sent Events: one `evaluation` event per finished answer.
+    The stream closes once no evaluations are outstanding.
+
+    While an evaluation runs on this worker, `evaluation_partial`
+    events carry its summary, feedback items and scores as the model
+    produces them ({"evaluation_id", "index", "field", "key", "value"}).
+    """
+    initial = _evaluation_statuses(session_id)
+
+    def events():
+        sent = set()
+        partials_sent: Dict[int, int] = {}
+        statuses = initial
+        version = EVALUATIONS.version
+        finished = EVALUATIONS.finished
+
+        while True:
+            for status in statuses:
+                if status.status == "pending":
+                    partials = EVALUATIONS.progress(session_id, status.index)
+                    for partial in partials[partials_sent.get(status.index, 0):]:
+                        data = json.dumps({
+                            "evaluation_id": status.evaluation_id,
+                            "index": status.index,
+                            **partial,
+                        })
+                        yield f"event: evaluation_partial\ndata: {data}\n\n"
+                    partials_sent[status.index] = len(partials)
+
+                elif status.index not in sent:
+                    sent.add(status.index)
+                    yield f"event: evaluation\ndata: {status.model_dump_json()}\n\n"
+
+            if all(s.status != "pending" for s in statuses):
+                yield "event: complete\ndata: {}\n\n"
+                return
+
+            # Woken by local jobs; the timeout covers other workers
+            new_version = EVALUATIONS.wait_for_change(version, timeout=1.0)
+            timed_out = new_version == version
+            if timed_out:
+                yield ": keep-alive\n\n"
+            version = new_version
+
+            # Progress reports alone don't need a session reload
+            if timed_out or EVALUATIONS.finished != finished:
+                finished = EVALUATIONS.finished
+                try:
+                    statuses = _evaluation_statuses(session_id)
+                except HTTPException:
+                    return
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 # -------------------------------------------------
 # 6️⃣ Final Interview Report
 # -------------------------------------------------
 @app.get("/final-report", response_model=FinalReportResponse)
-def final_report():
+def final_report(session_id: str = Query(...)):
     """
     Generates a structured interview report
     after all questions are answered.
     """
-    if not SESSION.answers:
-        raise HTTPException(
-            status_code=400,
-            detail="No answers submitted"
-        )
-
-    report = generate_final_report(
-        profile=SESSION.profile,
-        answers=SESSION.answers
-    )
+    # Only wait on evaluations that are still running
+    EVALUATIONS.wait_for_session(session_id, timeout=EVAL_WAIT_TIMEOUT_SEC)
+    deadline = time.monotonic() + EVAL_WAIT_TIMEOUT_SEC
+
+    # Evaluations started on another worker land via the store
+    while True:
+        statuses = _evaluation_statuses(session_id)
+        pending = sum(s.status == "pending" for s in statuses)
+        if not pending:
+            break
+        if time.monotonic() > deadline:
+            raise HTTPException(
+                status_code=503,
+                detail=f"{pending} evaluation(s) still running",
+                headers={"Retry-After": "5"}
+            )
+        time.sleep(0.25)
+
+    with session_scope(session_id) as session:
+        if not session.answers:
+            raise HTTPException(
+                status_code=400,
+                detail="No answers submitted"
+            )
+
+        try:
+            report = generate_final_report(
+                profile=session_profile_digest(session),
+                aggregates=aggregate_summary(
+                    session_aggregates(session), len(session.answers)
+                ),
+                answers=session.answers,
+            )
+        except LLMOverloaded as e:
+            raise llm_busy(e)
+
+        session.final_report = report
 
     return FinalReportResponse(report=report)
+
+
+# -------------------------------------------------
+# Real-time Interview (WebSocket)
+# -------------------------------------------------
+@app.websocket("/ws/interview")
+async def interview_socket(ws: WebSocket):
+    await get_interview_socket().handle(ws)
+
+
+# -------------------------------------------------
+# Service Stats
+# -------------------------------------------------
+@app.get("/stats")
+def service_stats():
+    """
+    Cache, prefetch and stage counters for monitoring.
+    """
+    return {
+        "active_sessions": len(SESSIONS),
+        "question_audio_prefetch": PREFETCHER.stats(),
+        "audio_cache": get_audio_cache().stats(),
+        "tts_pool": get_tts_pool().stats(),
+        "llm": get_llm_client().stats(),
+        "llm_cache": get_llm_cache().stats(),
+        "resume_parsing": get_resume_parser().stats(),
+        "interview_sockets": interview_socket_stats(),
+    }
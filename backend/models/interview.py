@@ -1,3 +1,4 @@
+import json
 from typing import List, Optional, Dict
 from pydantic import BaseModel, Field
 
@@ -38,23 +39,62 @@ class InterviewState:
     """
     In-memory interview session state.
 
-    v1.0 design decisions:
-    - Single active session
+    Design decisions:
+    - One state object per session (see SessionRegistry)
     - Stateless API, stateful backend object
     - Reset on /start
     """
 
-    def __init__(self):
+    def __init__(self, session_id: Optional[str] = None):
+        self.session_id = session_id
         self.reset()
 
     def reset(self):
         self.resume_text: Optional[str] = None
         self.profile: Optional[ResumeData] = None
+        self.profile_digest: Optional[str] = None  # compact prompt form
         self.questions: List[str] = []
         self.current_index: int = 0
         self.answers: List[Dict] = []
+        self.aggregates: Optional[Dict] = None  # running score summary
         self.final_report: Optional[Dict] = None
 
+    def to_dict(self) -> Dict:
+        """
+        JSON-safe snapshot of the session contents.
+        """
+        return {
+            "session_id": self.session_id,
+            "resume_text": self.resume_text,
+            "profile": self.profile,
+            "profile_digest": self.profile_digest,
+            "questions": self.questions,
+            "current_index": self.current_index,
+            "answers": self.answers,
+            "aggregates": self.aggregates,
+            "final_report": self.final_report,
+        }
+
+    def load_dict(self, data: Dict):
+        """
+        Restore session contents from a to_dict() snapshot.
+        """
+        self.session_id = data.get("session_id", self.session_id)
+        self.resume_text = data.get("resume_text")
+        self.profile = data.get("profile")
+        self.profile_digest = data.get("profile_digest")
+        self.questions = list(data.get("questions") or [])
+        self.current_index = int(data.get("current_index", 0))
+        self.answers = list(data.get("answers") or [])
+        self.aggregates = data.get("aggregates")
+        self.final_report = data.get("final_report")
+
+    def estimated_size(self) -> int:
+        """
+        Approximate memory footprint in bytes (serialized size).
+        """
+        return len(json.dumps(self.to_dict(), default=str))
+
 
 # =========================================================
 # v2+ MODELS (PLANNED — NOT USED IN v1.0)
@@ -0,0 +1,261 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+
+# Defaults (overridable via environment)
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("AUDIO_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+AUDIO_CACHE_MAX_AGE_SEC = int(os.getenv("AUDIO_CACHE_MAX_AGE_SEC", str(7 * 24 * 3600)))
+AUDIO_CACHE_MEMORY_ITEMS = int(os.getenv("AUDIO_CACHE_MEMORY_ITEMS", "128"))
+# Temp files older than this are leftovers of a dead render
+AUDIO_RENDER_TIMEOUT_SEC = int(os.getenv("AUDIO_RENDER_TIMEOUT_SEC", "300"))
+# Files used this recently (by any worker) are never evicted
+AUDIO_CACHE_GRACE_SEC = int(os.getenv("AUDIO_CACHE_GRACE_SEC", "60"))
+
+
+def audio_key(text: str, voice: Optional[str], fmt: str) -> str:
+    """
+    Content address of a synthesized clip.
+    """
+    raw = "\x1f".join([text.strip(), voice or "default", fmt])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """
+    Content-addressed cache for synthesized speech.
+
+    - Disk tier: `<key>.<fmt>` files in the static audio directory,
+      evicted least-recently-used first once the directory exceeds
+      `max_bytes`, or once a file has not been used for `max_age_sec`
+    - Memory tier: small LRU of raw PCM buffers (WebSocket path)
+    - Concurrent misses for the same key render only once
+
+    The directory may be shared by several worker processes, each
+    with its own index. Hits bump the file's mtime, and eviction
+    re-stats a file before deleting it, so a clip another worker
+    used since (or within the last `grace_sec`) is kept.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: int = AUDIO_CACHE_MAX_BYTES,
+        max_age_sec: int = AUDIO_CACHE_MAX_AGE_SEC,
+        memory_items: int = AUDIO_CACHE_MEMORY_ITEMS,
+        grace_sec: int = AUDIO_CACHE_GRACE_SEC,
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age_sec = max_age_sec
+        self.memory_items = memory_items
+        self.grace_sec = grace_sec
+
+        # filename -> (size, last_used); oldest first
+        self._files: "OrderedDict[str, tuple]" = OrderedDict()
+        self._total_bytes = 0
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._inflight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._load_index()
+
+    # ---------------------------
+    # Disk tier
+    # ---------------------------
+
+    def _load_index(self):
+        """
+        Index whatever is already on disk (including pre-cache UUID
+        files, which then age out normally).
+        """
+        entries = []
+        stale = time.time() - AUDIO_RENDER_TIMEOUT_SEC
+        for path in self.directory.glob("*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # published or cleaned up by another worker
+
+            if path.name.startswith(".") and path.name.endswith(".tmp"):
+                # Leftover from an interrupted render; younger ones may
+                # be another worker's render in flight
+                if stat.st_mtime < stale:
+                    path.unlink(missing_ok=True)
+            elif path.is_file() and not path.name.startswith("."):
+                entries.append((stat.st_mtime, path.name, stat.st_size))
+
+        for mtime, name, size in sorted(entries):
+            self._files[name] = (size, mtime)
+            self._total_bytes += size
+
+        with self._lock:
+            self._evict_locked()
+
+    def get_file(
+        self,
+        text: str,
+        voice: Optional[str],
+        fmt: str,
+        render: Callable[[str], None],
+    ) -> str:
+        """
+        Filename of the cached clip; `render(path)` creates it on a miss.
+        """
+        filename = f"{audio_key(text, voice, fmt)}.{fmt}"
+        path = self.directory / filename
+
+        while True:
+            with self._lock:
+                if path.exists():
+                    if filename not in self._files:
+                        # Rendered by another worker process
+                        size = path.stat().st_size
+                        self._files[filename] = (size, time.time())
+                        self._total_bytes += size
+                    self._touch_locked(filename)
+                    self.hits += 1
+                    return filename
+
+                waiter = self._inflight.get(filename)
+                if waiter is None:
+                    if filename in self._files:
+                        # Indexed but deleted from disk: drop stale entry
+                        self._total_bytes -= self._files.pop(filename)[0]
+                    self._inflight[filename] = threading.Event()
+                    self.misses += 1
+                    break
+
+            # Someone else is rendering this clip; reuse their result
+            waiter.wait()
+
+        try:
+            # Render beside the final name, then publish atomically
+            tmp_path = self.directory / f".{filename}.{threading.get_ident()}.tmp"
+            render(str(tmp_path))
+            os.replace(tmp_path, path)
+
+            with self._lock:
+                size = path.stat().st_size
+                self._files[filename] = (size, time.time())
+                self._total_bytes += size
+                self._evict_locked()
+
+            return filename
+
+        finally:
+            with self._lock:
+                self._inflight.pop(filename).set()
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    def has_file(self, text: str, voice: Optional[str], fmt: str) -> bool:
+        """
+        True if the clip is already on disk (get_file won't render).
+        """
+        return (self.directory / f"{audio_key(text, voice, fmt)}.{fmt}").exists()
+
+    def _touch_locked(self, filename: str):
+        size, _ = self._files[filename]
+        now = time.time()
+        self._files[filename] = (size, now)
+        self._files.move_to_end(filename)
+
+        # Tell other workers' evictions this clip is in use
+        try:
+            os.utime(self.directory / filename, (now, now))
+        except FileNotFoundError:
+            pass
+
+    def _evict_locked(self):
+        now = time.time()
+        cutoff = now - self.max_age_sec
+        # Each file may be re-queued once per pass (used elsewhere)
+        requeues = len(self._files)
+
+        while self._files:
+            filename, (size, last_used) = next(iter(self._files.items()))
+            if self._total_bytes <= self.max_bytes and last_used >= cutoff:
+                break
+
+            self._files.pop(filename)
+            self._total_bytes -= size
+
+            try:
+                stat = (self.directory / filename).stat()
+            except FileNotFoundError:
+                continue  # evicted by another worker
+
+            recent = stat.st_mtime > now - self.grace_sec
+            if recent or stat.st_mtime > last_used + 1.0:
+                # Another worker served (or re-rendered) it since: keep it
+                self._files[filename] = (stat.st_size, stat.st_mtime)
+                self._total_bytes += stat.st_size
+                requeues -= 1
+                if requeues < 0:
+                    break  # everything left is in use
+                continue
+
+            self.evictions += 1
+            try:
+                (self.directory / filename).unlink()
+            except FileNotFoundError:
+                pass
+
+    def evict(self):
+        with self._lock:
+            self._evict_locked()
+
+    # ---------------------------
+    # Memory tier
+    # ---------------------------
+
+    def get_bytes(
+        self,
+        text: str,
+        voice: Optional[str],
+        fmt: str,
+        render: Callable[[], bytes],
+    ) -> bytes:
+        """
+        In-memory clip; `render()` produces it on a miss.
+        """
+        key = audio_key(text, voice, fmt)
+
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+            self.misses += 1
+
+        data = render()
+
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+        return data
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "files": len(self._files),
+                "bytes": self._total_bytes,
+                "memory_items": len(self._memory),
+            }
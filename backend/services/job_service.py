@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict
+
+
+EVAL_WORKERS = int(os.getenv("EVAL_WORKERS", "8"))
+
+
+class BackgroundJobs:
+    """
+    Background job runner with per-session tracking.
+
+    Jobs run on a thread pool; `on_done(result)` / `on_error(exc)`
+    callbacks persist the outcome (e.g. into the session). Waiters
+    can block on a session's outstanding jobs, and listeners are
+    woken whenever any job finishes or reports progress.
+
+    Progress (e.g. partial results) is kept in memory only while the
+    session has jobs running, so it is visible to this worker only.
+    """
+
+    def __init__(self, max_workers: int = EVAL_WORKERS, name: str = "job"):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        )
+        self._by_session: Dict[str, Dict[Future, Any]] = {}  # future -> job key
+        self._progress: Dict[str, Dict[Any, list]] = {}
+        self._cond = threading.Condition()
+        self.version = 0    # bumped on every finish / progress report
+        self.finished = 0
+
+    def submit(
+        self,
+        session_id: str,
+        fn: Callable,
+        on_done: Callable,
+        on_error: Callable,
+        job_key: Any = None,
+        **kwargs,
+    ) -> Future:
+        """
+        Run `fn(**kwargs)` for the session; `job_key` identifies the
+        job for running() and report().
+        """
+        def run():
+            try:
+                result = fn(**kwargs)
+            except Exception as e:
+                print(f"[ERROR] Background job failed: {e}")
+                on_error(e)
+                raise
+            on_done(result)
+            return result
+
+        future = self._executor.submit(run)
+
+        with self._cond:
+            self._by_session.setdefault(session_id, {})[future] = job_key
+
+        future.add_done_callback(lambda f: self._finished(session_id, f))
+        return future
+
+    def _finished(self, session_id: str, future: Future):
+        with self._cond:
+            futures = self._by_session.get(session_id, {})
+            futures.pop(future, None)
+            if not futures:
+                self._by_session.pop(session_id, None)
+                self._progress.pop(session_id, None)
+
+            self.finished += 1
+            self.version += 1
+            self._cond.notify_all()
+
+    def report(self, session_id: str, key: Any, item: Any):
+        """
+        Record progress of a running job (`key` identifies the job).
+        """
+        with self._cond:
+            self._progress.setdefault(session_id, {}).setdefault(key, []).append(item)
+            self.version += 1
+            self._cond.notify_all()
+
+    def progress(self, session_id: str, key: Any) -> list:
+        with self._cond:
+            return list(self._progress.get(session_id, {}).get(key, []))
+
+    def outstanding(self, session_id: str) -> int:
+        with self._cond:
+            return len(self._by_session.get(session_id, {}))
+
+    def running(self, session_id: str, key: Any) -> bool:
+        """
+        Whether this process has the job queued or running.
+        """
+        with self._cond:
+            return key in self._by_session.get(session_id, {}).values()
+
+    def wait_for_session(self, session_id: str, timeout: float) -> bool:
+        """
+        Block until this process's jobs for the session finish.
+        Returns False on timeout.
+        """
+        with self._cond:
+            futures = list(self._by_session.get(session_id, {}))
+
+        if not futures:
+            return True
+
+        _, not_done = wait(futures, timeout=timeout)
+        return not not_done
+
+    def wait_for_change(self, seen_version: int, timeout: float) -> int:
+        """
+        Block until any job finishes or reports progress (or timeout);
+        returns the new version.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self.version == seen_version:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return self.version
@@ -0,0 +1,91 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List
+
+from backend.core.stage_pool import LatencyStats
+from backend.services.tts_service import is_speech_cached, synthesize_speech
+
+
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", str(os.cpu_count() or 2)))
+PREFETCH_MAX_TRACKED = 1024
+
+
+class SpeechPrefetcher:
+    """
+    Synthesizes known-upcoming texts (interview questions) in the
+    background so they are already in the audio cache when asked.
+
+    get_url() reports how each request was served:
+    - "hit": audio ready before the request (prefetch finished, or
+      already cached, e.g. the same question for another session)
+    - "wait": prefetch still running; the request joined it
+    - "miss": never prefetched (or failed); synthesized synchronously
+    """
+
+    def __init__(self, max_workers: int = PREFETCH_WORKERS):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="tts-prefetch"
+        )
+        self._futures: "OrderedDict[str, Future]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.counts: Dict[str, int] = {"hit": 0, "wait": 0, "miss": 0}
+        self.latency = LatencyStats()
+
+    def prefetch(self, texts: List[str]):
+        """
+        Queue every text for concurrent synthesis (non-blocking).
+        """
+        # Already rendered (e.g. the same questions for another session)
+        texts = [text for text in texts if not is_speech_cached(text)]
+
+        with self._lock:
+            for text in texts:
+                if text in self._futures:
+                    continue
+                self._futures[text] = self._executor.submit(
+                    synthesize_speech, text
+                )
+
+            # Forget the oldest unclaimed prefetches (audio stays cached)
+            while len(self._futures) > PREFETCH_MAX_TRACKED:
+                self._futures.popitem(last=False)
+
+    def get_url(self, text: str) -> str:
+        started = time.perf_counter()
+
+        with self._lock:
+            future = self._futures.pop(text, None)
+
+        url = None
+        if future is not None:
+            source = "hit" if future.done() else "wait"
+            try:
+                url = future.result()
+            except Exception as e:
+                print(f"[WARN] Prefetch failed, synthesizing inline: {e}")
+
+        if url is None:
+            # Prefetches are claimed once; the audio cache outlives them
+            source = "hit" if is_speech_cached(text) else "miss"
+            url = synthesize_speech(text)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        with self._lock:
+            self.counts[source] += 1
+        self.latency.record(elapsed_ms)
+
+        print(f"[INFO] Question audio: {source} ({elapsed_ms:.0f} ms)")
+        return url
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = sum(self.counts.values())
+            return {
+                **self.counts,
+                "hit_rate": round(self.counts["hit"] / total, 3) if total else 0.0,
+                "latency": self.latency.stats(),
+            }
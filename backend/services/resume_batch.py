@@ -0,0 +1,284 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import BinaryIO, Iterator, List, Optional
+
+from backend.core.agent_ocr import get_resume_parser
+from backend.core.llm_scheduler import LLMOverloaded
+from backend.core.prompt_digest import profile_digest
+from backend.services.session_store import (
+    SESSION_STORE_URL,
+    SessionStore,
+    create_session_store,
+)
+
+
+# Batch limits (overridable via environment)
+BATCH_PARSE_WORKERS = int(os.getenv("BATCH_PARSE_WORKERS", "4"))
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "500"))
+BATCH_MAX_FILE_BYTES = int(os.getenv("BATCH_MAX_FILE_BYTES", str(20 * 1024 * 1024)))
+# Everything one batch writes to disk (uploads plus extracted zip members)
+BATCH_MAX_BYTES = int(os.getenv("BATCH_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Parsed profiles, keyed by content hash; same backends as sessions,
+# in their own table (never purged). The default follows the session
+# store. "memory" is per process: with several workers a profile is
+# only found by the worker that parsed it, so multi-worker setups
+# need a shared store (sqlite:///...).
+PROFILE_STORE_URL = os.getenv("PROFILE_STORE_URL", SESSION_STORE_URL)
+PROFILE_TABLE = "profiles"
+
+RESUME_EXTENSIONS = (".pdf", ".docx", ".txt", ".md", ".png", ".jpg", ".jpeg", ".webp")
+CHUNK_BYTES = 1024 * 1024
+
+
+class BatchTooLarge(Exception):
+    pass
+
+
+class BatchItem:
+    """
+    One resume spooled to the batch directory.
+    """
+
+    def __init__(self, name: str, path: str, sha256: str, size: int):
+        self.name = name
+        self.path = path
+        self.sha256 = sha256
+        self.size = size
+
+    @property
+    def profile_id(self) -> str:
+        return self.sha256[:16]
+
+
+class _BatchBudget:
+    """
+    Running file count and byte total of one batch, checked before
+    each file is written and as its bytes arrive.
+    """
+
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+
+    def add_file(self):
+        self.files += 1
+        if self.files > BATCH_MAX_FILES:
+            raise BatchTooLarge(f"Batch exceeds {BATCH_MAX_FILES} files")
+
+    def add_bytes(self, count: int):
+        self.bytes += count
+        if self.bytes > BATCH_MAX_BYTES:
+            raise BatchTooLarge(f"Batch exceeds {BATCH_MAX_BYTES} bytes")
+
+
+def _copy_hashed(src: BinaryIO, dest_path: str, budget: _BatchBudget) -> tuple:
+    """
+    Chunked copy that hashes as it goes; never holds the whole file.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(dest_path, "wb") as dest:
+        while True:
+            chunk = src.read(CHUNK_BYTES)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > BATCH_MAX_FILE_BYTES:
+                raise BatchTooLarge(
+                    f"{os.path.basename(dest_path)} exceeds {BATCH_MAX_FILE_BYTES} bytes"
+                )
+            budget.add_bytes(len(chunk))
+            digest.update(chunk)
+            dest.write(chunk)
+    return digest.hexdigest(), size
+
+
+def _expand_zip(
+    path: str, directory: str, prefix: str, budget: _BatchBudget
+) -> List[BatchItem]:
+    items = []
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            name = os.path.basename(info.filename)
+            if (
+                info.is_dir()
+                or not name
+                or name.startswith(".")
+                or info.filename.startswith("__MACOSX/")
+                or not name.lower().endswith(RESUME_EXTENSIONS)
+            ):
+                continue
+
+            budget.add_file()
+            dest_path = os.path.join(directory, f"{prefix}-{len(items)}-{name}")
+            with archive.open(info) as member:
+                sha256, size = _copy_hashed(member, dest_path, budget)
+            items.append(BatchItem(name, dest_path, sha256, size))
+    return items
+
+
+def spool_files(files: List[tuple], directory: str) -> List[BatchItem]:
+    """
+    Stream (filename, file object) pairs into `directory`; zip
+    archives are expanded into their resume files.
+
+    BATCH_MAX_FILES and BATCH_MAX_BYTES are enforced before each
+    file or zip member is written, so an oversized batch is rejected
+    before it fills the disk.
+    """
+    budget = _BatchBudget()
+    items: List[BatchItem] = []
+    for index, (name, fileobj) in enumerate(files):
+        name = os.path.basename(name or f"resume-{index}")
+        is_zip = name.lower().endswith(".zip")
+        if not is_zip:
+            budget.add_file()
+
+        dest_path = os.path.join(directory, f"{index}-{name}")
+        sha256, size = _copy_hashed(fileobj, dest_path, budget)
+
+        if is_zip:
+            items.extend(_expand_zip(dest_path, directory, str(index), budget))
+            os.remove(dest_path)
+        else:
+            items.append(BatchItem(name, dest_path, sha256, size))
+
+    return items
+
+
+class ResumeBatchIngestor:
+    """
+    Parses many resumes in parallel and stores the profiles.
+
+    Each file goes through the regular tiered parser (cache → text →
+    vision) on a bounded thread pool. Results are yielded as events
+    in completion order, so callers can stream progress:
+
+        {"type": "accepted", "total": N}
+        {"type": "result", "file", "status", "profile_id", "tier", ...}
+        {"type": "complete", "ok", "failed", "seconds"}
+
+    Stored profiles are keyed by content hash (`profile_id`) and can
+    seed an interview directly (POST /start?profile_id=...).
+    """
+
+    def __init__(
+        self,
+        store: Optional[SessionStore] = None,
+        max_workers: int = BATCH_PARSE_WORKERS,
+    ):
+        self.store = store or create_session_store(PROFILE_STORE_URL, table=PROFILE_TABLE)
+        self.max_workers = max(1, max_workers)
+
+    def load_profile(self, profile_id: str) -> Optional[dict]:
+        return self.store.load(profile_id)
+
+    def _parse(self, item: BatchItem) -> dict:
+        with open(item.path, "rb") as f:
+            data = f.read()
+
+        parsed = get_resume_parser().parse_bytes(data, item.name)
+        if parsed["tier"] == "failed" or not parsed["profile"]:
+            raise ValueError("no profile could be extracted")
+
+        self.store.save(item.profile_id, {
+            "profile_id": item.profile_id,
+            "filename": item.name,
+            "resume_text": parsed["resume_text"],
+            "profile": parsed["profile"],
+            "profile_digest": profile_digest(parsed["profile"]),
+            "tier": parsed["tier"],
+            "created_at": time.time(),
+        })
+        return parsed
+
+    def ingest(self, items: List[BatchItem]) -> Iterator[dict]:
+        started = time.perf_counter()
+        yield {"type": "accepted", "total": len(items)}
+
+        ok = failed = 0
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="resume-batch"
+        ) as executor:
+            futures = {executor.submit(self._parse, item): item for item in items}
+
+            for done, future in enumerate(as_completed(futures), 1):
+                item = futures[future]
+                event = {
+                    "type": "result",
+                    "file": item.name,
+                    "profile_id": item.profile_id,
+                    "done": done,
+                    "total": len(items),
+                }
+
+                try:
+                    parsed = future.result()
+                    ok += 1
+                    event.update(
+                        status="ok",
+                        name=parsed["profile"].get("name"),
+                        tier=parsed["tier"],
+                        ms=parsed["timings_ms"]["total"],
+                    )
+                except LLMOverloaded as e:
+                    failed += 1
+                    event.update(status="busy", error=str(e))
+                except Exception as e:
+                    failed += 1
+                    event.update(status="failed", error=str(e))
+
+                yield event
+
+        self.store.flush()
+        yield {
+            "type": "complete",
+            "ok": ok,
+            "failed": failed,
+            "seconds": round(time.perf_counter() - started, 2),
+        }
+
+
+def batch_directory() -> str:
+    return tempfile.mkdtemp(prefix="resume-batch-")
+
+
+def remove_batch_directory(directory: str):
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(
+        description="Parse resumes (files or .zip archives) into the profile store"
+    )
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--workers", type=int, default=BATCH_PARSE_WORKERS)
+    args = parser.parse_args()
+
+    if PROFILE_STORE_URL == "memory":
+        print("[WARN] PROFILE_STORE_URL=memory: profiles are not kept after this run")
+
+    directory = batch_directory()
+    try:
+        handles = [(path, open(path, "rb")) for path in args.paths]
+        try:
+            items = spool_files(handles, directory)
+        finally:
+            for _, handle in handles:
+                handle.close()
+
+        ingestor = ResumeBatchIngestor(max_workers=args.workers)
+        for event in ingestor.ingest(items):
+            print(json.dumps(event), flush=True)
+        ingestor.store.close()
+    finally:
+        remove_batch_directory(directory)
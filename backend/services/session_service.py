@@ -0,0 +1,641 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from backend.core.score_aggregates import build_aggregates
+from backend.models.interview import InterviewState
+from backend.services.session_store import (
+    SessionConflict,
+    SessionStore,
+    InMemorySessionStore,
+)
+
+
+# Defaults (overridable via environment)
+SESSION_TTL_SEC = int(os.getenv("SESSION_TTL_SEC", "1800"))
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "1000"))
+MAX_SESSION_BYTES = int(os.getenv("MAX_SESSION_BYTES", str(512 * 1024)))
+
+
+class SessionNotFound(Exception):
+    pass
+
+
+class SessionLimitExceeded(Exception):
+    pass
+
+
+class ConcurrentUpdate(Exception):
+    """
+    Another worker advanced the interview first (e.g. answered the
+    same question); this request's changes were discarded.
+    """
+    pass
+
+
+class _SessionEntry:
+    """
+    Registry slot: session state plus its own lock and the
+    store version the state was read at.
+    """
+
+    __slots__ = ("state", "lock", "last_access", "version")
+
+    def __init__(self, state: InterviewState, version: int = 0):
+        self.state = state
+        self.lock = threading.Lock()
+        self.last_access = time.monotonic()
+        self.version = version
+
+
+_MISSING = object()
+
+
+def _merge(base: Any, ours: Any, theirs: Any) -> Any:
+    """
+    Three-way merge of JSON values: our changes (base → ours)
+    replayed onto a concurrent writer's result (base → theirs).
+
+    Dicts merge per key, lists per index plus appended items
+    (e.g. our new answer next to their finished evaluation of an
+    older one; items both sides appended are kept, theirs first).
+    Where both changed the same value, ours wins - so derived
+    state (aggregates) must be rebuilt afterwards, not merged.
+    """
+    if ours == base:
+        return theirs
+    if theirs == base:
+        return ours
+
+    if isinstance(base, dict) and isinstance(ours, dict) and isinstance(theirs, dict):
+        merged = {}
+        for key in list(theirs) + [k for k in ours if k not in theirs]:
+            value = _merge(
+                base.get(key, _MISSING), ours.get(key, _MISSING), theirs.get(key, _MISSING)
+            )
+            if value is not _MISSING:
+                merged[key] = value
+        return merged
+
+    if (
+        isinstance(base, list) and isinstance(ours, list) and isinstance(theirs, list)
+        and len(base) <= min(len(ours), len(theirs))
+    ):
+        merged = [_merge(b, o, t) for b, o, t in zip(base, ours, theirs)]
+        return merged + theirs[len(base):] + ours[len(base):]
+
+    return ours
+
+
+def _both_advanced(base: dict, ours: dict, theirs: dict) -> bool:
+    """
+    Both writers moved the interview forward from the same point
+    (two answers to one question): merging would keep both answers
+    and shift every later index.
+    """
+    def advanced(state: dict) -> bool:
+        return (
+            state.get("current_index") != base.get("current_index")
+            or len(state.get("answers") or []) > len(base.get("answers") or [])
+        )
+
+    return advanced(ours) and advanced(theirs)
+
+
+def _merge_session(base: dict, ours: dict, theirs: dict) -> dict:
+    merged = _merge(base, ours, theirs)
+    if merged.get("aggregates") is not None:
+        # Running sums can't be merged; replay them from the answers
+        merged["aggregates"] = build_aggregates(merged.get("answers") or [])
+    return merged
+
+
+class SessionRegistry:
+    """
+    Thread-safe registry of interview sessions keyed by session ID.
+
+    - O(1) lookup (dict keyed by session ID)
+    - Per-session locking: requests within a session are serialized,
+      different sessions never block each other
+    - Idle eviction: sessions untouched for `ttl_sec` are dropped
+    - Bounded memory: `max_sessions` live sessions, each capped
+      at `max_session_bytes` of serialized state
+    - Pluggable persistence: every committed change is written to
+      `store`; with a shared store (SQLite) any worker process can
+      serve any request and sessions survive restarts
+    - No lost updates across workers: saves are compare-and-swap on
+      the store version; a save that lost the race is merged onto
+      the newer state and retried, unless both advanced the
+      interview (ConcurrentUpdate)
+    """
+
+    def __init__(
+        self,
+        ttl_sec: int = SESSION_TTL_SEC,
+        max_sessions: int = MAX_SESSIONS,
+        max_session_bytes: int = MAX_SESSION_BYTES,
+        store: Optional[SessionStore] = None,
+    ):
+        self.ttl_sec = ttl_sec
+        self.max_sessions = max_sessions
+        self.max_session_bytes = max_session_bytes
+        self.store = store or InMemorySessionStore()
+        self._last_purge = time.monotonic()
+
+        # Ordered by last access (oldest first) → cheap idle eviction
+        self._sessions: "OrderedDict[str, _SessionEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    # ---------------------------
+    # Lifecycle
+    # ---------------------------
+
+    def create(self) -> str:
+        """
+        Register a fresh session and return its ID.
+        """
+        session_id = uuid.uuid4().hex
+        state = InterviewState(session_id=session_id)
+
+        with self._lock:
+            self._evict_expired_locked()
+            self._make_room_locked()
+            entry = _SessionEntry(state)
+            self._sessions[session_id] = entry
+
+        entry.version = self.store.save(session_id, state.to_dict(), version=0)
+        self._maybe_purge_store()
+
+        return session_id
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+        self.store.delete(session_id)
+
+    def evict_expired(self) -> int:
+        """
+        Drop idle sessions. Returns the number evicted.
+        """
+        with self._lock:
+            evicted = self._evict_expired_locked()
+
+        self.store.purge_expired(self.ttl_sec)
+        return evicted
+
+    def _maybe_purge_store(self):
+        # Shared stores are purged at most ~10 times per TTL window
+        now = time.monotonic()
+        if now - self._last_purge > self.ttl_sec / 10:
+            self._last_purge = now
+            self.store.purge_expired(self.ttl_sec)
+
+    def _make_room_locked(self):
+        if len(self._sessions) < self.max_sessions:
+            return
+
+        if not self.store.shared:
+            raise SessionLimitExceeded(
+                f"Too many active sessions ({self.max_sessions})"
+            )
+
+        # Persisted elsewhere: dropping the local copy loses nothing
+        while len(self._sessions) >= self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def _evict_expired_locked(self) -> int:
+        cutoff = time.monotonic() - self.ttl_sec
+        evicted = 0
+
+        # Oldest entries are at the front; stop at the first live one
+        while self._sessions:
+            session_id, entry = next(iter(self._sessions.items()))
+            if entry.last_access > cutoff:
+                break
+            self._sessions.pop(session_id)
+            if not self.store.shared:
+                self.store.delete(session_id)
+            evicted += 1
+
+        if evicted:
+            print(f"[INFO] Evicted {evicted} idle session(s)")
+
+        return evicted
+
+    # ---------------------------
+    # Access
+    # ---------------------------
+
+    def _touch(self, session_id: str) -> _SessionEntry:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            now = time.monotonic()
+
+            if entry is not None and now - entry.last_access > self.ttl_sec:
+                self._sessions.pop(session_id)
+                if not self.store.shared:
+                    self.store.delete(session_id)
+                entry = None
+
+            if entry is None:
+                # A shared store may hold it (other worker / restart)
+                entry = self._hydrate_locked(session_id)
+
+            entry.last_access = now
+            self._sessions.move_to_end(session_id)
+            return entry
+
+    def _hydrate_locked(self, session_id: str) -> _SessionEntry:
+        """
+        Load a session created by another worker (or before a restart).
+        """
+        loaded = self.store.load_versioned(session_id) if self.store.shared else None
+        if loaded is None:
+            raise SessionNotFound(session_id)
+
+        data, version = loaded
+        state = InterviewState(session_id=session_id)
+        state.load_dict(data)
+
+        self._make_room_locked()
+        entry = _SessionEntry(state, version)
+        self._sessions[session_id] = entry
+        return entry
+
+    @contextmanager
+    def session(self, session_id: str) -> Iterator[InterviewState]:
+        """
+        Exclusive access to a session's state.
+
+        Changes that push the session over `max_session_bytes`
+        are rolled back and SessionLimitExceeded is raised.
+        Committed changes are written through to the store; if
+        another worker saved the session in the meantime, the
+        changes are merged onto its version (see _merge), or
+        discarded with ConcurrentUpdate if both advanced the
+        interview.
+        """
+        entry = self._touch(session_id)
+
+        with entry.lock:
+            if self.store.shared:
+                # Another worker may have advanced this session
+                self._reload(session_id, entry)
+
+            snapshot = json.dumps(entry.state.to_dict(), default=str)
+
+            yield entry.state
+
+            data = entry.state.to_dict()
+            serialized = json.dumps(data, default=str)
+
+            if len(serialized) > self.max_session_bytes:
+                entry.state.load_dict(json.loads(snapshot))
+                raise SessionLimitExceeded(
+                    f"Session exceeds {self.max_session_bytes} bytes "
+                    f"({len(serialized)} bytes)"
+                )
+
+            if serialized != snapshot:
+                self._commit(session_id, entry, json.loads(snapshot), json.loads(serialized))
+
+            entry.last_access = time.monotonic()
+
+    def _reload(self, session_id: str, entry: _SessionEntry) -> dict:
+        loaded = self.store.load_versioned(session_id)
+        if loaded is None:
+            self.delete(session_id)
+            raise SessionNotFound(session_id)
+
+        data, entry.version = loaded
+        entry.state.load_dict(data)
+        return data
+
+    def _commit(self, session_id: str, entry: _SessionEntry, base: dict, ours: dict):
+        """
+        Compare-and-swap save; on conflict, replay our changes onto
+        the newer stored state and try again.
+        """
+        data = ours
+        while True:
+            try:
+                entry.version = self.store.save(session_id, data, version=entry.version)
+                return
+            except SessionConflict:
+                theirs = json.loads(json.dumps(
+                    self._reload(session_id, entry), default=str
+                ))
+                if _both_advanced(base, ours, theirs):
+                    # entry.state now holds the stored (winning) state
+                    raise ConcurrentUpdate(
+                        f"Session {session_id} was advanced by another request"
+                    )
+                data = _merge_session(base, ours, theirs)
+                entry.state.load_dict(data)
+                base, ours = theirs, data
+
+    def get(self, session_id: str) -> Optional[InterviewState]:
+        """
+        Unlocked read-only lookup (None if missing).
+        """
+        try:
+            return self._touch(session_id).state
+        except SessionNotFound:
+            return None
+
+
+# ---------------------------
+# Concurrency, crash / restart and multi-worker checks
+# ---------------------------
+
+def concurrency_check(
+    sessions: int = 300,
+    turns: int = 4,
+    threads: int = 32,
+    waves: int = 3,
+) -> dict:
+    """
+    `sessions` interviews at once on one registry, each answering
+    `turns` questions from a shared thread pool. Repeated for
+    `waves` waves; each wave's sessions then go idle and are
+    evicted.
+
+    Checks every answer lands in its own session, oversized
+    sessions are rejected, and traced memory is flat across waves.
+    """
+    import tracemalloc
+    from concurrent.futures import ThreadPoolExecutor
+
+    registry = SessionRegistry(ttl_sec=3600, max_sessions=sessions)
+    latencies = []
+    results = []
+
+    def answer(session_id: str, turn: int):
+        started = time.perf_counter()
+        with registry.session(session_id) as state:
+            state.answers.append({
+                "session_id": session_id,
+                "turn": turn,
+                "answer": f"answer {turn} " * 20,
+            })
+            state.current_index += 1
+        latencies.append((time.perf_counter() - started) * 1000.0)
+
+    tracemalloc.start()
+    for wave in range(waves):
+        session_ids = [registry.create() for _ in range(sessions)]
+        for session_id in session_ids:
+            with registry.session(session_id) as state:
+                state.questions = [f"question {turn}" for turn in range(turns)]
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            # Interleaved: every session has answers in flight at once
+            jobs = [
+                pool.submit(answer, session_id, turn)
+                for turn in range(turns)
+                for session_id in session_ids
+            ]
+            for job in jobs:
+                job.result()
+        elapsed = time.perf_counter() - started
+
+        isolated = 0
+        largest = 0
+        for session_id in session_ids:
+            state = registry.get(session_id)
+            largest = max(largest, len(json.dumps(state.to_dict(), default=str)))
+            if (
+                state.current_index == turns
+                and all(a["session_id"] == session_id for a in state.answers)
+                and sorted(a["turn"] for a in state.answers) == list(range(turns))
+            ):
+                isolated += 1
+
+        try:
+            with registry.session(session_ids[0]) as state:
+                state.answers.append({"answer": "x" * registry.max_session_bytes})
+            oversize_rejected = False
+        except SessionLimitExceeded:
+            oversize_rejected = len(registry.get(session_ids[0]).answers) == turns
+
+        live = len(registry)
+        registry.ttl_sec = 0
+        registry.evict_expired()
+        registry.ttl_sec = 3600
+
+        results.append({
+            "wave": wave,
+            "isolated_sessions": isolated,
+            "live_sessions": live,
+            "largest_session_bytes": largest,
+            "oversize_rejected": oversize_rejected,
+            "turns_per_sec": round(sessions * turns / elapsed, 1),
+            "traced_memory_kb": tracemalloc.get_traced_memory()[0] // 1024,
+        })
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "sessions": sessions,
+        "turns": turns,
+        "threads": threads,
+        "turn_p50_ms": round(latencies[len(latencies) // 2], 3),
+        "turn_p95_ms": round(latencies[int(len(latencies) * 0.95)], 3),
+        "waves": results,
+    }
+
+
+def _crash_worker(path: str, sessions: int, created):
+    """
+    Child process: create sessions, then wait to be killed.
+    """
+    from backend.services.session_store import SQLiteSessionStore
+
+    registry = SessionRegistry(store=SQLiteSessionStore(path))
+    for i in range(sessions):
+        session_id = registry.create()
+        with registry.session(session_id) as state:
+            state.questions = [f"question {i}", f"question {i + 1}"]
+            state.answers.append({"question": f"question {i}", "answer": f"answer {i}"})
+            state.current_index = 1
+        created.put(session_id)
+
+    time.sleep(3600)
+
+
+def crash_check(path: str, sessions: int = 50) -> dict:
+    """
+    SIGKILL a worker right after it saved `sessions` sessions, then
+    reopen the store (as a restarted pod would) and check every
+    session is still there.
+    """
+    import multiprocessing
+    import signal
+
+    from backend.services.session_store import SQLiteSessionStore
+
+    ctx = multiprocessing.get_context("spawn")
+    created = ctx.Queue()
+    worker = ctx.Process(target=_crash_worker, args=(path, sessions, created))
+    worker.start()
+
+    session_ids = [created.get(timeout=60) for _ in range(sessions)]
+    os.kill(worker.pid, signal.SIGKILL)
+    worker.join()
+
+    store = SQLiteSessionStore(path)
+    registry = SessionRegistry(store=store)
+    survived = 0
+    for i, session_id in enumerate(session_ids):
+        try:
+            with registry.session(session_id) as state:
+                if state.current_index == 1 and state.answers[0]["answer"] == f"answer {i}":
+                    survived += 1
+        except SessionNotFound:
+            pass
+    store.close()
+
+    return {
+        "worker_exit_code": worker.exitcode,
+        "sessions": sessions,
+        "survived": survived,
+    }
+
+
+def lost_update_check(path: str) -> dict:
+    """
+    Two workers on one store: B holds a session through a slow
+    /answer while A records an evaluation for it. Both changes
+    must survive.
+    """
+    from backend.services.session_store import SQLiteSessionStore
+
+    worker_a = SessionRegistry(store=SQLiteSessionStore(path))
+    worker_b = SessionRegistry(store=SQLiteSessionStore(path))
+
+    session_id = worker_a.create()
+    with worker_a.session(session_id) as state:
+        state.questions = ["question 0", "question 1"]
+        state.answers.append({
+            "question": "question 0", "answer": "answer 0",
+            "evaluation": None, "evaluation_status": "pending",
+        })
+        state.current_index = 1
+
+    with worker_b.session(session_id) as state:
+        # ... B transcribes; meanwhile A's evaluation job finishes
+        with worker_a.session(session_id) as other:
+            other.answers[0]["evaluation"] = {"scores": {"clarity": 7}}
+            other.answers[0]["evaluation_status"] = "done"
+
+        state.answers.append({
+            "question": "question 1", "answer": "answer 1",
+            "evaluation": None, "evaluation_status": "pending",
+        })
+        state.current_index = 2
+
+    with worker_a.session(session_id) as state:
+        result = {
+            "answers": len(state.answers),
+            "current_index": state.current_index,
+            "first_evaluation": state.answers[0]["evaluation_status"],
+        }
+
+    worker_a.store.close()
+    worker_b.store.close()
+    return result
+
+
+def concurrent_answer_check(path: str) -> dict:
+    """
+    Two workers answer the same question at once, and both fold an
+    evaluation into the aggregates at once. The late answer must be
+    rejected, and the aggregates must count both evaluations.
+    """
+    from backend.core.score_aggregates import empty_aggregates, update_aggregates
+    from backend.services.session_store import SQLiteSessionStore
+
+    worker_a = SessionRegistry(store=SQLiteSessionStore(path))
+    worker_b = SessionRegistry(store=SQLiteSessionStore(path))
+
+    session_id = worker_a.create()
+    with worker_a.session(session_id) as state:
+        state.questions = ["question 0", "question 1", "question 2"]
+        state.answers = [
+            {"question": f"question {i}", "answer": f"answer {i}",
+             "evaluation": None, "evaluation_status": "pending"}
+            for i in range(2)
+        ]
+        state.current_index = 2
+        state.aggregates = empty_aggregates()
+
+    def evaluate(state, index: int, score: int):
+        evaluation = {"scores": {"clarity": score}, "feedback": []}
+        state.answers[index]["evaluation"] = evaluation
+        state.answers[index]["evaluation_status"] = "done"
+        update_aggregates(state.aggregates, index, evaluation)
+
+    with worker_b.session(session_id) as state:
+        with worker_a.session(session_id) as other:
+            evaluate(other, 0, 6)
+        evaluate(state, 1, 8)
+
+    rejected = False
+    try:
+        with worker_b.session(session_id) as state:
+            with worker_a.session(session_id) as other:
+                other.answers.append({"question": "question 2", "answer": "from A"})
+                other.current_index = 3
+            state.answers.append({"question": "question 2", "answer": "from B"})
+            state.current_index = 3
+    except ConcurrentUpdate:
+        rejected = True
+
+    with worker_a.session(session_id) as state:
+        result = {
+            "late_answer_rejected": rejected,
+            "answers": [a["answer"] for a in state.answers],
+            "current_index": state.current_index,
+            "evaluated": len(state.aggregates["answers"]),
+            "clarity_n": state.aggregates["dimensions"]["clarity"]["n"],
+        }
+
+    worker_a.store.close()
+    worker_b.store.close()
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser(
+        description="Check session isolation, crash recovery and concurrent workers"
+    )
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--concurrent-sessions", type=int, default=300)
+    parser.add_argument("--turns", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(json.dumps({
+            "concurrency": concurrency_check(args.concurrent_sessions, args.turns),
+            "crash_restart": crash_check(os.path.join(directory, "crash.db"), args.sessions),
+            "lost_update": lost_update_check(os.path.join(directory, "workers.db")),
+            "concurrent_answer": concurrent_answer_check(
+                os.path.join(directory, "answers.db")
+            ),
+        }, indent=2))
@@ -0,0 +1,399 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+
+# "memory" (default) or "sqlite:///path/to/sessions.db"
+SESSION_STORE_URL = os.getenv("SESSION_STORE_URL", "memory")
+
+
+class SessionConflict(Exception):
+    """
+    A versioned save lost the race: the stored session changed
+    since the version the caller read.
+    """
+    pass
+
+
+class SessionStore(ABC):
+    """
+    Persistence backend for interview session state.
+
+    `shared` stores are visible to every worker process, so the
+    registry re-reads them on each request instead of trusting
+    its local copy.
+
+    Every stored session carries a version, bumped on each save.
+    save(..., version=v) is a compare-and-swap: it only succeeds if
+    the stored version is still `v` (0 = the session must not exist
+    yet) and raises SessionConflict otherwise.
+    """
+
+    shared: bool = False
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        loaded = self.load_versioned(session_id)
+        return loaded[0] if loaded else None
+
+    @abstractmethod
+    def load_versioned(self, session_id: str) -> Optional[Tuple[Dict, int]]:
+        ...
+
+    @abstractmethod
+    def save(self, session_id: str, data: Dict, version: Optional[int] = None) -> int:
+        """
+        Store `data`; returns the new version.
+        """
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        ...
+
+    def purge_expired(self, ttl_sec: float) -> int:
+        return 0
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Process-local store. Sessions are lost on restart.
+    """
+
+    shared = False
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[Dict, int]] = {}
+        self._lock = threading.Lock()
+
+    def load_versioned(self, session_id: str) -> Optional[Tuple[Dict, int]]:
+        with self._lock:
+            return self._data.get(session_id)
+
+    def save(self, session_id: str, data: Dict, version: Optional[int] = None) -> int:
+        with self._lock:
+            current = self._data.get(session_id, (None, 0))[1]
+            if version is not None and version != current:
+                raise SessionConflict(session_id)
+            self._data[session_id] = (data, current + 1)
+            return current + 1
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._data.pop(session_id, None)
+
+
+class _Write:
+    """
+    One queued write (raw None = delete) and its outcome.
+    """
+
+    __slots__ = ("raw", "expected", "version", "error", "done", "replaced_by")
+
+    def __init__(self, raw: Optional[str] = None, expected: Optional[int] = None):
+        self.raw = raw
+        self.expected = expected    # CAS: stored version must match
+        self.version: Optional[int] = None
+        self.error: Optional[Exception] = None
+        self.done = threading.Event()
+        self.replaced_by: Optional["_Write"] = None
+
+    def outcome(self) -> "_Write":
+        write = self
+        while write.replaced_by is not None:
+            write = write.replaced_by
+        return write
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite (WAL) store shared by all workers on a host.
+
+    Writes are queued and committed in batches by a background
+    writer thread (one transaction per batch, repeated writes to
+    the same session coalesced). With `sync_commit` the caller
+    waits for its batch to commit, so the next request - on any
+    worker - sees the update; without it, saves return
+    immediately and are durable within `flush_interval_ms`.
+
+    Versioned saves always wait for their batch: the caller needs
+    to know whether its compare-and-swap won.
+    """
+
+    shared = True
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval_ms: int = 10,
+        batch_size: int = 128,
+        sync_commit: bool = True,
+        table: str = "sessions",
+    ):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table}")
+
+        self.path = path
+        self.table = table
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.batch_size = batch_size
+        self.sync_commit = sync_commit
+
+        self._pending: Dict[str, _Write] = {}
+        self._inflight: Dict[str, _Write] = {}
+        self._waiters: List[_Write] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._local = threading.local()
+
+        conn = self._conn()
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            " session_id TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " version INTEGER NOT NULL DEFAULT 1)"
+        )
+        columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+        if "version" not in columns:
+            # Databases created before versioned saves
+            conn.execute(
+                f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 1"
+            )
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_updated"
+            f" ON {table}(updated_at)"
+        )
+        conn.commit()
+
+        self._writer = threading.Thread(
+            target=self._write_loop,
+            name=f"{table}-store-writer",
+            daemon=True,
+        )
+        self._writer.start()
+
+    def _conn(self) -> sqlite3.Connection:
+        """
+        One connection per thread (sqlite3 objects are not shareable).
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ---------------------------
+    # Reads
+    # ---------------------------
+
+    def load_versioned(self, session_id: str) -> Optional[Tuple[Dict, int]]:
+        # Read-your-writes: unflushed data wins over the database
+        unversioned = None
+        with self._cond:
+            for queued in (self._pending, self._inflight):
+                write = queued.get(session_id)
+                if write is None:
+                    continue
+                if write.raw is None:
+                    return None
+                if write.version is None:
+                    # Plain save: its version is only known once committed
+                    unversioned = write
+                    break
+                return json.loads(write.raw), write.version
+
+        if unversioned is not None:
+            unversioned.done.wait()
+
+        row = self._conn().execute(
+            f"SELECT data, version FROM {self.table} WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
+
+        return (json.loads(row[0]), row[1]) if row else None
+
+    # ---------------------------
+    # Writes (batched)
+    # ---------------------------
+
+    def save(self, session_id: str, data: Dict, version: Optional[int] = None) -> int:
+        # Serialize in the caller's thread so later mutations
+        # of the live state can't leak into the queued snapshot
+        write = self._enqueue(session_id, _Write(json.dumps(data, default=str), version))
+        return write.version
+
+    def delete(self, session_id: str):
+        self._enqueue(session_id, _Write())
+
+    def _enqueue(self, session_id: str, write: _Write) -> _Write:
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Session store is closed")
+
+            if write.expected is not None:
+                # Known up front, so read-your-writes can report it
+                write.version = write.expected + 1
+
+            queued = self._pending.get(session_id)
+            if queued is not None:
+                # Coalesce: one database write covers both
+                queued.replaced_by = write
+                if write.expected is not None and write.expected == queued.version:
+                    write.expected = queued.expected
+
+            self._pending[session_id] = write
+            self._waiters.append(write)
+            self._cond.notify()
+
+        if self.sync_commit or write.expected is not None:
+            write.done.wait()
+            outcome = write.outcome()
+            if outcome.error is not None:
+                raise outcome.error
+            return outcome
+
+        return write
+
+    def _take_batch(self) -> Tuple[Dict[str, _Write], List[_Write]]:
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._pending or self._waiters or self._closed
+            )
+
+            # Give concurrent writers a moment to join this batch
+            deadline = time.monotonic() + self.flush_interval
+            while not self._closed and len(self._pending) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch, waiters = self._pending, self._waiters
+            self._pending, self._waiters = {}, []
+            self._inflight = batch
+            return batch, waiters
+
+    def _write_loop(self):
+        while True:
+            batch, waiters = self._take_batch()
+
+            if batch:
+                try:
+                    self._commit(batch)
+                except sqlite3.Error as e:
+                    print(f"[ERROR] Session store write failed: {e}")
+                    for write in batch.values():
+                        write.error = e
+
+            with self._cond:
+                self._inflight = {}
+
+            for write in waiters:
+                write.done.set()
+
+            with self._cond:
+                if self._closed and not self._pending:
+                    return
+
+    def _commit(self, batch: Dict[str, _Write]):
+        now = time.time()
+
+        table = self.table
+        conn = self._conn()
+        with conn:
+            for session_id, write in batch.items():
+                if write.raw is None:
+                    conn.execute(
+                        f"DELETE FROM {table} WHERE session_id = ?",
+                        (session_id,),
+                    )
+                elif write.expected is None:
+                    conn.execute(
+                        f"INSERT INTO {table} (session_id, data, updated_at, version)"
+                        " VALUES (?, ?, ?, 1)"
+                        " ON CONFLICT(session_id) DO UPDATE SET"
+                        " data = excluded.data, updated_at = excluded.updated_at,"
+                        f" version = {table}.version + 1",
+                        (session_id, write.raw, now),
+                    )
+                    write.version = conn.execute(
+                        f"SELECT version FROM {table} WHERE session_id = ?",
+                        (session_id,),
+                    ).fetchone()[0]
+                elif write.expected == 0:
+                    cur = conn.execute(
+                        f"INSERT OR IGNORE INTO {table}"
+                        " (session_id, data, updated_at, version) VALUES (?, ?, ?, ?)",
+                        (session_id, write.raw, now, write.version),
+                    )
+                    if cur.rowcount == 0:
+                        write.error = SessionConflict(session_id)
+                else:
+                    cur = conn.execute(
+                        f"UPDATE {table} SET data = ?, updated_at = ?, version = ?"
+                        " WHERE session_id = ? AND version = ?",
+                        (write.raw, now, write.version, session_id, write.expected),
+                    )
+                    if cur.rowcount == 0:
+                        write.error = SessionConflict(session_id)
+
+    # ---------------------------
+    # Maintenance
+    # ---------------------------
+
+    def purge_expired(self, ttl_sec: float) -> int:
+        conn = self._conn()
+        with conn:
+            cur = conn.execute(
+                f"DELETE FROM {self.table} WHERE updated_at < ?",
+                (time.time() - ttl_sec,),
+            )
+        return cur.rowcount
+
+    def flush(self):
+        """
+        Block until every queued write is committed.
+        """
+        marker = _Write()
+
+        with self._cond:
+            self._waiters.append(marker)
+            self._cond.notify()
+        marker.done.wait()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._writer.join()
+
+
+def create_session_store(url: str = SESSION_STORE_URL, table: str = "sessions") -> SessionStore:
+    """
+    Build a store from a URL: "memory" or "sqlite:///path.db".
+    `table` keeps different record kinds apart in one database.
+    """
+    if url == "memory":
+        return InMemorySessionStore()
+
+    if url.startswith("sqlite:///"):
+        path = url[len("sqlite:///"):]
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        print(f"[INFO] Using SQLite {table} store: {path}")
+        return SQLiteSessionStore(path, table=table)
+
+    raise ValueError(f"Unsupported session store URL: {url}")
@@ -1,7 +1,12 @@
-import os
-import tempfile
+import threading
+from typing import List, Optional
+
+import numpy as np
 
 from backend.core.audio_stack import AudioEngine
+from backend.core.audio_utils import TARGET_SAMPLE_RATE, pcm_to_float32, resample
+from backend.core.vad import EnergyVAD, UtteranceEndpointer
+from backend.core.whisper_batcher import WhisperBatcher
 
 
 class STTService:
@@ -14,28 +19,160 @@ class STTService:
         # Load AudioEngine once (Whisper is heavy)
         self.audio_engine = AudioEngine()
 
+        # Concurrent requests share batched Whisper passes
+        self.batcher = WhisperBatcher(self.audio_engine)
+
     def transcribe(self, audio_file) -> str:
         """
         Transcribes FastAPI UploadFile into text.
         """
 
         # Read raw bytes from UploadFile
-        audio_bytes = audio_file.file.read()
+        return self.transcribe_bytes(audio_file.file.read())
 
+    def transcribe_bytes(self, audio_bytes: bytes) -> str:
+        """
+        Transcribes raw audio bytes into text.
+        Decoded in memory (no temp files).
+        """
         if not audio_bytes:
             return ""
 
-        # Write audio bytes to a temporary file
-        with tempfile.NamedTemporaryFile(
-            suffix=".wav", delete=False
-        ) as tmp:
-            audio_path = tmp.name
-            tmp.write(audio_bytes)
+        return self.batcher.transcribe(audio_bytes).strip()
+
+    def transcribe_array(self, audio: np.ndarray) -> str:
+        """
+        Transcribes a mono float32 16 kHz waveform into text.
+        """
+        return self.batcher.transcribe(audio).strip()
+
+
+class StreamingUtterance:
+    """
+    Buffers streamed PCM chunks for one utterance and decides
+    when to transcribe.
+
+    feed() returns:
+    - "partial" when enough new speech arrived for a partial transcript
+    - "final" when VAD detects end-of-utterance (or the length cap is hit)
+    - None otherwise
+    Audio before speech starts is discarded except for a short
+    pre-roll, so leading silence never reaches Whisper.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = TARGET_SAMPLE_RATE,
+        encoding: str = "pcm_s16le",
+        partial_interval_ms: int = 1000,
+        pre_roll_ms: int = 300,
+        max_utterance_sec: int = 30,
+    ):
+        self.sample_rate = sample_rate
+        self.encoding = encoding
+
+        self.vad = EnergyVAD()
+        self.endpointer = UtteranceEndpointer(frame_ms=self.vad.frame_ms)
+
+        self.partial_interval = TARGET_SAMPLE_RATE * partial_interval_ms // 1000
+        self.pre_roll = TARGET_SAMPLE_RATE * pre_roll_ms // 1000
+        self.max_samples = TARGET_SAMPLE_RATE * max_utterance_sec
+
+        self.reset()
+
+    def reset(self):
+        self.endpointer.reset()
+        self._unscored = np.empty(0, dtype=np.float32)
+        self._chunks: List[np.ndarray] = []
+        self._samples = 0
+        self._since_partial = 0
+
+    @property
+    def started(self) -> bool:
+        return self.endpointer.started
+
+    def feed(self, chunk: bytes) -> Optional[str]:
+        audio = resample(
+            pcm_to_float32(chunk, self.encoding), self.sample_rate
+        )
+
+        # VAD works on whole frames; carry the remainder over
+        audio = np.concatenate([self._unscored, audio])
+        usable = (audio.shape[0] // self.vad.frame_len) * self.vad.frame_len
+        scored, self._unscored = audio[:usable], audio[usable:]
+
+        if scored.size == 0:
+            return None
+
+        ended = self.endpointer.update(self.vad.is_speech(scored))
+
+        self._chunks.append(scored)
+        self._samples += scored.shape[0]
+
+        if not self.started:
+            # Keep only the pre-roll while waiting for speech
+            tail = np.concatenate(self._chunks)[-self.pre_roll:]
+            self._chunks, self._samples = [tail], tail.shape[0]
+            return None
+
+        if ended or self._samples >= self.max_samples:
+            return "final"
+
+        self._since_partial += scored.shape[0]
+        if self._since_partial >= self.partial_interval:
+            self._since_partial = 0
+            return "partial"
+
+        return None
+
+    def window(self) -> np.ndarray:
+        """
+        Utterance audio so far (16 kHz float32), for partials.
+        """
+        if not self._chunks:
+            return np.empty(0, dtype=np.float32)
+        return np.concatenate(self._chunks)[-self.max_samples:]
+
+    def finish(self) -> np.ndarray:
+        """
+        Full utterance audio; resets for the next utterance.
+        """
+        audio = np.concatenate([*self._chunks, self._unscored])
+        started = self.started
+        self.reset()
+        return audio[-self.max_samples:] if started else audio[:0]
+
+
+# --- v1.0 Public Function ---
+
+_stt_service_instance: Optional[STTService] = None
+_stt_init_lock = threading.Lock()
+
+
+def get_stt_service() -> STTService:
+    """
+    Process-wide STT service: one Whisper model and one batcher
+    shared by /answer and the interview socket, so concurrent
+    requests from either land in the same batches.
+    Whisper is loaded on first use.
+    """
+    global _stt_service_instance
+    with _stt_init_lock:
+        if _stt_service_instance is None:
+            _stt_service_instance = STTService()
+        return _stt_service_instance
+
+
+def transcribe_audio(audio_file) -> str:
+    """
+    Transcribes an uploaded answer (FastAPI UploadFile).
+    """
+    return get_stt_service().transcribe(audio_file)
+
+
+def transcribe_bytes(audio_bytes: bytes) -> str:
+    return get_stt_service().transcribe_bytes(audio_bytes)
 
-        try:
-            text = self.audio_engine.speech_to_text(audio_path)
-            return text.strip()
 
-        finally:
-            if os.path.exists(audio_path):
-                os.remove(audio_path)
+def transcribe_pcm(audio: np.ndarray) -> str:
+    return get_stt_service().transcribe_array(audio)
@@ -1,14 +1,18 @@
+import multiprocessing
 import os
+import queue
 import tempfile
 import wave
 import threading
-import uuid
+import time
 from typing import Optional
 from pathlib import Path
 
 import numpy as np
 import pyttsx3
 
+from backend.services.audio_cache import AudioCache
+
 
 # Define and create the static directory for audio files
 STATIC_DIR = Path("/app/static/audio")
@@ -30,6 +34,14 @@ class TTSService:
         if voice:
             self.engine.setProperty("voice", voice)
 
+    def save(self, text: str, path: str):
+        """
+        Render speech straight into a WAV file.
+        """
+        with self._engine_lock:
+            self.engine.save_to_file(text, path)
+            self.engine.runAndWait()
+
     def synthesize(self, text: str) -> bytes:
         """
         Convert text to speech and return Float32 PCM bytes.
@@ -42,9 +54,7 @@ class TTSService:
 
         try:
             # pyttsx3 is NOT thread-safe
-            with self._engine_lock:
-                self.engine.save_to_file(text, wav_path)
-                self.engine.runAndWait()
+            self.save(text, wav_path)
 
             return self._wav_to_float32_pcm(wav_path)
 
@@ -65,21 +75,362 @@ class TTSService:
         return audio.tobytes()
 
 
+# --- Worker Pool ---
+# pyttsx3 engines are single-threaded, so parallelism comes from
+# processes: each worker owns one engine and handles one job at a time.
+
+TTS_POOL_SIZE = int(os.getenv("TTS_POOL_SIZE", str(os.cpu_count() or 2)))
+TTS_MAX_QUEUE = int(os.getenv("TTS_MAX_QUEUE", "64"))
+TTS_JOB_TIMEOUT_SEC = float(os.getenv("TTS_JOB_TIMEOUT_SEC", "30"))
+TTS_STARTUP_TIMEOUT_SEC = float(os.getenv("TTS_STARTUP_TIMEOUT_SEC", "60"))
+TTS_HEALTH_INTERVAL_SEC = float(os.getenv("TTS_HEALTH_INTERVAL_SEC", "15"))
+
+
+class TTSOverloaded(Exception):
+    pass
+
+
+def _tts_worker_main(conn, voice: Optional[str]):
+    """
+    Worker process loop: ("file", text, path) | ("pcm", text) | ("ping",)
+    """
+    service = TTSService(voice)
+    conn.send(("ready", None))
+
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            return
+
+        if msg is None:
+            return
+
+        try:
+            if msg[0] == "file":
+                service.save(msg[1], msg[2])
+                conn.send(("ok", msg[2]))
+            elif msg[0] == "pcm":
+                conn.send(("ok", service.synthesize(msg[1])))
+            else:
+                conn.send(("ok", None))
+        except Exception as e:
+            conn.send(("error", str(e)))
+
+
+class _TTSWorker:
+    def __init__(self, ctx, voice: Optional[str]):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_tts_worker_main,
+            args=(child_conn, voice),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+        self.started_at = time.monotonic()
+
+    def wait_ready(self, timeout_sec: float) -> bool:
+        """
+        Engine start-up is not charged to the first job's timeout.
+        """
+        if not self.ready and self.conn.poll(timeout_sec):
+            self.ready = self.conn.recv()[0] == "ready"
+        return self.ready
+
+    def kill(self):
+        try:
+            self.conn.close()
+        finally:
+            self.process.kill()
+            self.process.join(timeout=5)
+
+
+class TTSWorkerPool:
+    """
+    Pool of preforked TTS worker processes.
+
+    - Idle workers wait in a queue; a request borrows one, so N
+      workers synthesize N texts in parallel
+    - Admission control: at most `size + max_queue` requests are
+      in flight; beyond that TTSOverloaded is raised
+    - Jobs exceeding `job_timeout_sec` kill and respawn their worker
+    - A background health check pings idle workers and restarts
+      dead or unresponsive ones
+    """
+
+    def __init__(
+        self,
+        size: int = TTS_POOL_SIZE,
+        max_queue: int = TTS_MAX_QUEUE,
+        job_timeout_sec: float = TTS_JOB_TIMEOUT_SEC,
+        voice: Optional[str] = None,
+    ):
+        self.size = max(1, size)
+        self.job_timeout = job_timeout_sec
+        self.voice = voice
+
+        # "spawn": never fork a parent holding locks or audio drivers
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_TTSWorker]" = queue.Queue()
+        self._admission = threading.BoundedSemaphore(self.size + max_queue)
+
+        self.restarts = 0
+        self.rejected = 0
+        self._closed = threading.Event()
+
+        for _ in range(self.size):
+            self._idle.put(_TTSWorker(self._ctx, voice))
+
+        self._health = threading.Thread(
+            target=self._health_loop, name="tts-health", daemon=True
+        )
+        self._health.start()
+
+        print(f"[INFO] TTS worker pool started ({self.size} processes)")
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+
+    def synthesize(self, text: str) -> bytes:
+        """
+        Float32 PCM bytes (same contract as TTSService.synthesize).
+        """
+        return self._call(("pcm", text))
+
+    def save(self, text: str, path: str):
+        self._call(("file", text, path))
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "idle": self._idle.qsize(),
+            "restarts": self.restarts,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        """
+        Stop the health check and kill the idle workers.
+        """
+        self._closed.set()
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            worker.kill()
+
+    # ---------------------------
+    # Internals
+    # ---------------------------
+
+    def _call(self, msg):
+        if not self._admission.acquire(blocking=False):
+            self.rejected += 1
+            raise TTSOverloaded("TTS pool is at capacity")
+
+        try:
+            worker = self._idle.get()
+            status, payload = "error", None
+            try:
+                if not worker.wait_ready(TTS_STARTUP_TIMEOUT_SEC):
+                    worker = self._restart(worker, "engine failed to start")
+                    payload = "engine failed to start"
+
+                else:
+                    worker.conn.send(msg)
+
+                    if worker.conn.poll(self.job_timeout):
+                        status, payload = worker.conn.recv()
+                    else:
+                        worker = self._restart(worker, "job timed out")
+                        payload = "timed out"
+
+            except (EOFError, OSError) as e:
+                worker = self._restart(worker, f"worker died: {e}")
+                payload = "worker crashed"
+
+            finally:
+                self._idle.put(worker)
+
+            if status != "ok":
+                raise RuntimeError(f"TTS synthesis failed: {payload}")
+
+            return payload
+
+        finally:
+            self._admission.release()
+
+    def _restart(self, worker: _TTSWorker, reason: str) -> _TTSWorker:
+        print(f"[WARN] Restarting TTS worker ({reason})")
+        self.restarts += 1
+        worker.kill()
+        return _TTSWorker(self._ctx, self.voice)
+
+    def _health_loop(self):
+        while not self._closed.wait(TTS_HEALTH_INTERVAL_SEC):
+            self.health_check()
+
+    def health_check(self, timeout_sec: float = 5.0):
+        """
+        Ping every currently idle worker once.
+        """
+        for _ in range(self._idle.qsize()):
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+
+            try:
+                if not worker.process.is_alive():
+                    healthy = False
+                elif not worker.wait_ready(0):
+                    # Still booting: unhealthy only once start-up overran
+                    healthy = (
+                        time.monotonic() - worker.started_at
+                        < TTS_STARTUP_TIMEOUT_SEC
+                    )
+                else:
+                    worker.conn.send(("ping",))
+                    healthy = worker.conn.poll(timeout_sec)
+                    if healthy:
+                        worker.conn.recv()
+            except (EOFError, OSError):
+                healthy = False
+
+            if not healthy:
+                worker = self._restart(worker, "failed health check")
+
+            self._idle.put(worker)
+
+
 # --- v1.0 Public Function ---
 
-_tts_service_instance = TTSService()
+_tts_pool: Optional[TTSWorkerPool] = None
+_audio_cache: Optional[AudioCache] = None
+_tts_pool_lock = threading.Lock()
+
+
+def get_tts_pool() -> TTSWorkerPool:
+    """
+    Shared worker pool, started on first use (not at import, so
+    spawned workers importing this module don't start pools).
+    """
+    global _tts_pool
+    with _tts_pool_lock:
+        if _tts_pool is None:
+            _tts_pool = TTSWorkerPool()
+        return _tts_pool
+
+
+def get_audio_cache() -> AudioCache:
+    """
+    Shared content-addressed cache over STATIC_DIR (created on first use).
+    """
+    global _audio_cache
+    with _tts_pool_lock:
+        if _audio_cache is None:
+            _audio_cache = AudioCache(STATIC_DIR)
+        return _audio_cache
 
 
 def synthesize_speech(text: str) -> str:
     """
     Synthesizes speech, saves it as a static WAV file,
     and returns the URL path for the client to fetch.
+    Cached by content: repeated texts return the existing file.
     """
-    filename = f"{uuid.uuid4()}.wav"
-    filepath = str(STATIC_DIR / filename)
-
-    with _tts_service_instance._engine_lock:
-        _tts_service_instance.engine.save_to_file(text, filepath)
-        _tts_service_instance.engine.runAndWait()
+    pool = get_tts_pool()
+    filename = get_audio_cache().get_file(
+        text,
+        voice=pool.voice,
+        fmt="wav",
+        render=lambda path: pool.save(text, path),
+    )
 
     return f"/static/audio/{filename}"
+
+
+def is_speech_cached(text: str) -> bool:
+    """
+    True if synthesize_speech(text) would be served from the cache.
+    """
+    return get_audio_cache().has_file(text, voice=get_tts_pool().voice, fmt="wav")
+
+
+def synthesize_pcm(text: str) -> bytes:
+    """
+    Float32 PCM bytes for streaming clients (memory-cached).
+    """
+    pool = get_tts_pool()
+    return get_audio_cache().get_bytes(
+        text,
+        voice=pool.voice,
+        fmt="f32",
+        render=lambda: pool.synthesize(text),
+    )
+
+
+# ---------------------------
+# Concurrent synthesis benchmark
+# ---------------------------
+
+def benchmark(texts: int = 32, sizes: Optional[list] = None) -> list:
+    """
+    Throughput of `texts` distinct sentences submitted at once, for
+    each pool size. Size 1 matches the old single locked engine.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from backend.core.stage_pool import LatencyStats
+
+    sizes = sizes or sorted({1, 2, os.cpu_count() or 1})
+    sentences = [
+        f"Question {i}: tell me about a project where you used caching."
+        for i in range(texts)
+    ]
+
+    results = []
+    for size in sizes:
+        pool = TTSWorkerPool(size=size, max_queue=texts)
+        latency = LatencyStats()
+
+        def timed(text: str):
+            started = time.perf_counter()
+            pool.synthesize(text)
+            latency.record((time.perf_counter() - started) * 1000.0)
+
+        # Engine start-up is not part of the measurement
+        for worker in list(pool._idle.queue):
+            worker.wait_ready(TTS_STARTUP_TIMEOUT_SEC)
+
+        with ThreadPoolExecutor(max_workers=texts) as executor:
+            started = time.perf_counter()
+            list(executor.map(timed, sentences))
+            elapsed = time.perf_counter() - started
+
+        pool.shutdown()
+        results.append({
+            "workers": size,
+            "texts": texts,
+            "seconds": round(elapsed, 2),
+            "texts_per_sec": round(texts / elapsed, 2),
+            "latency": latency.stats(),
+        })
+
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Benchmark concurrent TTS synthesis")
+    parser.add_argument("--texts", type=int, default=32)
+    parser.add_argument("--sizes", type=int, nargs="*", help="pool sizes (default: 1, 2, cores)")
+    args = parser.parse_args()
+
+    print(json.dumps(benchmark(args.texts, args.sizes), indent=2))
@@ -1,30 +1,147 @@
+import asyncio
 import json
+import os
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
 from fastapi import WebSocket, WebSocketDisconnect
 
 from backend.core.llm_brain import InterviewerAI
+from backend.core.llm_client import FakeProvider, LLMClient
 from backend.core.emotion_ai import EmotionAnalyzer
-from backend.services.stt_service import STTService
-from backend.services.tts_service import TTSService
+from backend.core.sentence_chunker import SentenceChunker
+from backend.core.stage_pool import (
+    StagePool,
+    StageOverloaded,
+    LoopLagMonitor,
+    LatencyStats,
+)
+from backend.services.stt_service import (
+    StreamingUtterance,
+    get_stt_service,
+    transcribe_bytes,
+    transcribe_pcm,
+)
+from backend.services.tts_service import TTSOverloaded, synthesize_pcm
 from backend.services.viseme_service import VisemeService
 
 
+# Stage sizing (overridable via environment)
+LLM_WORKERS = int(os.getenv("LLM_WORKERS", "8"))
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", str(os.cpu_count() or 2)))
+STT_MAX_PENDING = int(os.getenv("STT_MAX_PENDING", "8"))
+LLM_MAX_PENDING = int(os.getenv("LLM_MAX_PENDING", "32"))
+TTS_MAX_PENDING = int(os.getenv("TTS_MAX_PENDING", "16"))
+
+# Speak replies sentence by sentence while the LLM is still generating
+STREAM_REPLIES = os.getenv("STREAM_REPLIES", "1") == "1"
+
+
+class _AudioStream:
+    """
+    Per-connection streaming STT state.
+    """
+
+    def __init__(self, utterance: StreamingUtterance):
+        self.utterance = utterance
+        self.partial_task = None
+
+
 class InterviewSocket:
     """
     Orchestrates the full real-time interview loop.
+
+    Blocking stages never run on the event loop:
+    - STT (Whisper): thread pool whose threads wait on the shared
+      WhisperBatcher, so concurrent sockets (and /answer) are
+      transcribed in the same batched passes. A process pool would
+      give every process its own model and batcher, each handling
+      one job at a time - batches of one.
+    - LLM: thread pool (network-bound)
+    - TTS: thread pool, backed by the TTS worker processes
+    Each stage has a queue-depth limit; overloaded stages are
+    reported to the client instead of stalling other sockets.
+
+    In streaming mode, LLM tokens are split into sentences and each
+    sentence is synthesized and sent (with its own avatar_sync
+    frame) as soon as it is ready.
+
+    Audio input is either one complete blob per turn, or - after a
+    {"type": "start_stream"} event - small PCM chunks. Streamed audio
+    is endpointed with VAD; partial_transcript / final_transcript
+    events are emitted and the reply starts as soon as the candidate
+    stops talking.
     """
 
-    def __init__(self):
-        self.llm = InterviewerAI()
-        self.stt = STTService()
-        self.tts = TTSService()
+    def __init__(
+        self,
+        llm: Optional[InterviewerAI] = None,
+        synthesize: Callable[[str], bytes] = synthesize_pcm,
+    ):
+        self.llm = llm or InterviewerAI()
+        self.synthesize = synthesize
+        self.stream_replies = STREAM_REPLIES
         self.viseme = VisemeService()
         self.emotion = EmotionAnalyzer()
 
+        # One thread per admitted job: they only wait on batcher futures
+        self.stt_stage = StagePool(
+            "stt",
+            ThreadPoolExecutor(
+                max_workers=STT_MAX_PENDING, thread_name_prefix="stt"
+            ),
+            max_pending=STT_MAX_PENDING,
+        )
+        self._stt_warmup = None
+        self.llm_stage = StagePool(
+            "llm",
+            ThreadPoolExecutor(
+                max_workers=LLM_WORKERS, thread_name_prefix="llm"
+            ),
+            max_pending=LLM_MAX_PENDING,
+        )
+        self.tts_stage = StagePool(
+            "tts",
+            ThreadPoolExecutor(
+                max_workers=TTS_WORKERS, thread_name_prefix="tts"
+            ),
+            max_pending=TTS_MAX_PENDING,
+        )
+
+        self.loop_lag = LoopLagMonitor()
+        self.time_to_first_audio = LatencyStats()
+        self.active_sockets = 0
+
+    def stats(self) -> dict:
+        """
+        Stage queue depths and event-loop lag.
+        """
+        return {
+            "active_sockets": self.active_sockets,
+            "event_loop_lag": self.loop_lag.stats(),
+            "time_to_first_audio": self.time_to_first_audio.stats(),
+            "stt": self.stt_stage.stats(),
+            "llm": self.llm_stage.stats(),
+            "tts": self.tts_stage.stats(),
+        }
+
+    def shutdown(self):
+        self.loop_lag.stop()
+        for stage in (self.stt_stage, self.llm_stage, self.tts_stage):
+            stage.shutdown()
+
     async def handle(self, ws: WebSocket):
         session_id = str(uuid.uuid4())
         await ws.accept()
 
+        self.loop_lag.start()
+        self.active_sockets += 1
+        if self._stt_warmup is None:
+            # Load Whisper while the opening line is generated
+            self._stt_warmup = self.stt_stage.executor.submit(get_stt_service)
         print(f"[WS] Interview session started: {session_id}")
 
         # ---- Start Interview Session ----
@@ -34,56 +151,273 @@ class InterviewSocket:
             "projects": [],
         }
 
-        opening_text = self.llm.start_session(
-            session_id=session_id,
-            resume_data=resume_stub,
-        )
-
-        # Speak opening
-        await self._send_response(ws, opening_text)
+        stream = None
 
         try:
+            try:
+                opening_text = await self.llm_stage.run(
+                    self.llm.start_session, session_id, resume_stub
+                )
+
+                # Speak opening
+                await self._send_response(ws, opening_text)
+            except (StageOverloaded, TTSOverloaded) as e:
+                await self._send_busy(ws, e)
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                await self._send_error(ws, e)
+
             while True:
                 message = await ws.receive()
 
-                # -----------------------
-                # AUDIO INPUT (USER)
-                # -----------------------
-                if "bytes" in message:
-                    user_audio = message["bytes"]
+                if message.get("type") == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
 
-                    # STT
-                    user_text = self.stt.transcribe(user_audio)
-                    if not user_text:
-                        continue
+                # A failed turn is reported; the socket stays open
+                try:
+                    # -----------------------
+                    # AUDIO INPUT (USER)
+                    # -----------------------
+                    if message.get("bytes") is not None:
+                        if stream is not None:
+                            await self._handle_audio_chunk(
+                                ws, session_id, stream, message["bytes"]
+                            )
+                        else:
+                            await self._handle_audio(
+                                ws, session_id, message["bytes"]
+                            )
 
-                    print(f"[USER] {user_text}")
+                    # -----------------------
+                    # JSON EVENTS
+                    # -----------------------
+                    elif message.get("text") is not None:
+                        payload = json.loads(message["text"])
+                        event = payload.get("type")
 
-                    # LLM Response
-                    reply_text = self.llm.get_response(
-                        session_id, user_text
-                    )
+                        if event == "start_stream":
+                            stream = _AudioStream(StreamingUtterance(
+                                sample_rate=int(payload.get("sample_rate", 16000)),
+                                encoding=payload.get("encoding", "pcm_s16le"),
+                            ))
 
-                    # Speak + Animate
-                    await self._send_response(ws, reply_text)
+                        elif event == "end_utterance" and stream is not None:
+                            # Client-side endpoint (e.g. push-to-talk release)
+                            await self._finish_utterance(ws, session_id, stream)
 
-                # -----------------------
-                # JSON EVENTS (FUTURE)
-                # -----------------------
-                elif "text" in message:
-                    payload = json.loads(message["text"])
-                    print("[WS EVENT]", payload)
+                        elif event == "stop_stream":
+                            stream = None
+
+                        else:
+                            print("[WS EVENT]", payload)
+
+                except (StageOverloaded, TTSOverloaded) as e:
+                    await self._send_busy(ws, e)
+                except WebSocketDisconnect:
+                    raise
+                except Exception as e:
+                    await self._send_error(ws, e)
 
         except WebSocketDisconnect:
             print(f"[WS] Interview session ended: {session_id}")
 
-    async def _send_response(self, ws: WebSocket, text: str):
+        finally:
+            self.active_sockets -= 1
+            self.llm.end_session(session_id)
+            if stream is not None and stream.partial_task is not None:
+                stream.partial_task.cancel()
+
+    async def _send_busy(self, ws: WebSocket, error: Exception):
         """
-        Send avatar text, visemes, and audio.
+        A stage (or the TTS pool behind it) is at capacity: tell the
+        client to retry instead of dropping the socket.
+        """
+        print(f"[WARN] {error}")
+        await ws.send_text(json.dumps({
+            "type": "busy",
+            "message": str(error),
+        }))
+
+    async def _send_error(self, ws: WebSocket, error: Exception):
+        """
+        A turn failed (STT, LLM, TTS, or a malformed event): report it
+        and wait for the next one.
+        """
+        print(f"[ERROR] Interview turn failed: {error!r}")
+        await ws.send_text(json.dumps({
+            "type": "error",
+            "message": "Sorry, something went wrong. Please try again.",
+        }))
+
+    async def _handle_audio(
+        self, ws: WebSocket, session_id: str, user_audio: bytes
+    ):
+        # STT (shared batcher)
+        user_text = await self.stt_stage.run(transcribe_bytes, user_audio)
+        if not user_text:
+            return
+
+        await self._reply(ws, session_id, user_text)
+
+    async def _handle_audio_chunk(
+        self, ws: WebSocket, session_id: str, stream: _AudioStream, chunk: bytes
+    ):
+        decision = stream.utterance.feed(chunk)
+
+        if decision == "partial":
+            # At most one partial in flight; skip windows while busy
+            if stream.partial_task is None or stream.partial_task.done():
+                stream.partial_task = asyncio.ensure_future(
+                    self._send_partial(ws, stream.utterance.window())
+                )
+
+        elif decision == "final":
+            await self._finish_utterance(ws, session_id, stream)
+
+    async def _send_partial(self, ws: WebSocket, audio):
+        """
+        Runs as a fire-and-forget task: partials are best-effort, so
+        every failure is handled here (nobody awaits the task).
+        """
+        try:
+            text = await self.stt_stage.run(transcribe_pcm, audio)
+            if text:
+                await ws.send_text(json.dumps({
+                    "type": "partial_transcript",
+                    "text": text,
+                }))
+        except StageOverloaded:
+            pass
+        except Exception as e:
+            # STT failure, or the socket closed meanwhile
+            print(f"[WARN] Partial transcript failed: {e!r}")
+
+    async def _finish_utterance(
+        self, ws: WebSocket, session_id: str, stream: _AudioStream
+    ):
+        if stream.partial_task is not None and not stream.partial_task.done():
+            stream.partial_task.cancel()
+
+        audio = stream.utterance.finish()
+        if audio.size == 0:
+            return
+
+        user_text = await self.stt_stage.run(transcribe_pcm, audio)
+
+        await ws.send_text(json.dumps({
+            "type": "final_transcript",
+            "text": user_text,
+        }))
+
+        if user_text:
+            await self._reply(ws, session_id, user_text)
+
+    async def _reply(self, ws: WebSocket, session_id: str, user_text: str):
+        print(f"[USER] {user_text}")
+        started = time.perf_counter()
+
+        if self.stream_replies:
+            fragments = self.llm_stage.stream(
+                self.llm.stream_response, session_id, user_text
+            )
+            await self._stream_response(ws, fragments, started)
+            return
+
+        # LLM Response (thread pool)
+        reply_text = await self.llm_stage.run(
+            self.llm.get_response, session_id, user_text
+        )
+
+        # Speak + Animate
+        await self._send_response(ws, reply_text, started)
+
+    async def _stream_response(self, ws: WebSocket, fragments, started: float):
+        """
+        Speak a streamed reply sentence by sentence.
+
+        Sentences are synthesized concurrently as they complete, but
+        sent strictly in order by a separate sender task.
+        """
+        chunker = SentenceChunker()
+        ready: asyncio.Queue = asyncio.Queue()
+
+        async def sender():
+            index = 0
+            while True:
+                item = await ready.get()
+                if item is None:
+                    return
+                sentence, tts_task = item
+                audio_bytes = await tts_task
+
+                if index == 0:
+                    self._record_first_audio(started)
+                await self._send_audio(ws, sentence, audio_bytes, index)
+                index += 1
+
+        def synthesize(sentence: str):
+            return asyncio.ensure_future(
+                self.tts_stage.run(self.synthesize, sentence)
+            )
+
+        send_task = asyncio.ensure_future(sender())
+        tts_tasks = []
+        full_text = []
+
+        try:
+            async for fragment in fragments:
+                full_text.append(fragment)
+                for sentence in chunker.feed(fragment):
+                    tts_tasks.append(synthesize(sentence))
+                    await ready.put((sentence, tts_tasks[-1]))
+
+                if send_task.done():
+                    break  # sender failed; surface its error below
+
+            for sentence in chunker.flush():
+                tts_tasks.append(synthesize(sentence))
+                await ready.put((sentence, tts_tasks[-1]))
+
+            await ready.put(None)
+            await send_task
+
+        finally:
+            await fragments.aclose()
+            for task in [send_task, *tts_tasks]:
+                if not task.done():
+                    task.cancel()
+
+        await ws.send_text(json.dumps({
+            "type": "response_end",
+            "text": "".join(full_text).strip(),
+        }))
+
+    async def _send_response(
+        self, ws: WebSocket, text: str, started: float = None
+    ):
+        """
+        Synthesize a full reply, then send it in one piece.
         """
 
-        # TTS
-        audio_bytes = self.tts.synthesize(text)
+        # TTS (thread pool)
+        audio_bytes = await self.tts_stage.run(self.synthesize, text)
+
+        if started is not None:
+            self._record_first_audio(started)
+        await self._send_audio(ws, text, audio_bytes)
+
+    def _record_first_audio(self, started: float):
+        self.time_to_first_audio.record(
+            (time.perf_counter() - started) * 1000.0
+        )
+
+    async def _send_audio(
+        self, ws: WebSocket, text: str, audio_bytes: bytes, index: int = 0
+    ):
+        """
+        Send avatar text, visemes, and audio.
+        """
 
         # Estimate duration (rough heuristic)
         duration_ms = int(len(audio_bytes) / 32)
@@ -95,8 +429,204 @@ class InterviewSocket:
         await ws.send_text(json.dumps({
             "type": "avatar_sync",
             "text": text,
+            "index": index,
             "visemes": visemes,
         }))
 
         # Send audio
         await ws.send_bytes(audio_bytes)
+
+
+_interview_socket: Optional[InterviewSocket] = None
+_interview_socket_lock = threading.Lock()
+
+
+def get_interview_socket() -> InterviewSocket:
+    """
+    Shared handler for every interview socket (created on first use,
+    so importing this module doesn't start stage pools).
+    """
+    global _interview_socket
+    with _interview_socket_lock:
+        if _interview_socket is None:
+            _interview_socket = InterviewSocket()
+        return _interview_socket
+
+
+def interview_socket_stats() -> Optional[dict]:
+    """
+    Stats of the shared handler; None until the first socket connects.
+    """
+    socket = _interview_socket
+    return socket.stats() if socket is not None else None
+
+
+# ---------------------------
+# Offline time-to-first-audio check
+# ---------------------------
+
+class _RecordingSocket:
+    """
+    Stand-in WebSocket that keeps what the handler sends.
+    """
+
+    def __init__(self):
+        self.events = []
+        self.audio_chunks = 0
+
+    async def send_text(self, text: str):
+        self.events.append(json.loads(text))
+
+    async def send_bytes(self, data: bytes):
+        self.audio_chunks += 1
+
+
+def _fake_synthesize(ms_per_char: float) -> Callable[[str], bytes]:
+    def synthesize(text: str) -> bytes:
+        time.sleep(len(text) * ms_per_char / 1000.0)
+        return b"\0" * (len(text) * 320)  # ~10 ms of audio per character
+    return synthesize
+
+
+FAKE_REPLY = (
+    "That's a good start. Could you explain how you handled cache "
+    "invalidation? What trade-offs did you weigh between consistency "
+    "and latency? And how did you measure the improvement?"
+)
+
+
+def time_to_first_audio(
+    turns: int = 5,
+    llm_latency_ms: int = 800,
+    tts_ms_per_char: float = 4.0,
+) -> dict:
+    """
+    Time to first audio of full vs. streamed replies, offline: a
+    FakeProvider streams FAKE_REPLY and a fake TTS takes
+    `tts_ms_per_char` per character.
+    """
+    client = LLMClient(FakeProvider(
+        latency_ms=llm_latency_ms, jitter=0.0, reply=lambda contents: FAKE_REPLY,
+        chunk_chars=8,
+    ))
+
+    results = {}
+    for streaming in (False, True):
+        socket = InterviewSocket(
+            InterviewerAI(client), _fake_synthesize(tts_ms_per_char)
+        )
+        socket.stream_replies = streaming
+        ws = _RecordingSocket()
+
+        async def run():
+            await socket.llm_stage.run(socket.llm.start_session, "offline", {})
+            for _ in range(turns):
+                await socket._reply(ws, "offline", "I built a caching layer.")
+
+        asyncio.run(run())
+        socket.shutdown()
+
+        spoken = " ".join(e["text"] for e in ws.events if e["type"] == "avatar_sync")
+        results["streaming" if streaming else "full"] = {
+            "time_to_first_audio": socket.time_to_first_audio.stats(),
+            "audio_chunks_per_reply": ws.audio_chunks / turns,
+            "reply_intact": spoken.split() == (FAKE_REPLY.split() * turns),
+        }
+
+    client.close()
+    return results
+
+
+def loop_lag(
+    sockets: int = 16,
+    turns: int = 3,
+    llm_latency_ms: int = 800,
+    tts_ms_per_char: float = 4.0,
+) -> dict:
+    """
+    Event-loop lag with `sockets` simultaneous interviews, offline.
+
+    "inline" calls the LLM and TTS directly in the handler (the old
+    behaviour); "stages" is the real reply path through the bounded
+    stage pools. Turns rejected by a full stage count as busy.
+    """
+    client = LLMClient(FakeProvider(
+        latency_ms=llm_latency_ms, jitter=0.0, reply=lambda contents: FAKE_REPLY,
+        chunk_chars=8,
+    ))
+
+    results = {}
+    for mode in ("inline", "stages"):
+        socket = InterviewSocket(
+            InterviewerAI(client), _fake_synthesize(tts_ms_per_char)
+        )
+        socket.stream_replies = False
+        busy = 0
+
+        async def interview(index: int):
+            nonlocal busy
+            ws = _RecordingSocket()
+            session_id = f"offline-{index}"
+            if mode == "inline":
+                socket.llm.start_session(session_id, {})
+            else:
+                await socket.llm_stage.run(socket.llm.start_session, session_id, {})
+
+            for _ in range(turns):
+                started = time.perf_counter()
+                try:
+                    if mode == "inline":
+                        reply = socket.llm.get_response(session_id, "I built a cache.")
+                        audio_bytes = socket.synthesize(reply)
+                        socket._record_first_audio(started)
+                        await socket._send_audio(ws, reply, audio_bytes)
+                    else:
+                        await socket._reply(ws, session_id, "I built a cache.")
+                except StageOverloaded:
+                    busy += 1
+                    await asyncio.sleep(0.5)
+
+            socket.llm.end_session(session_id)
+
+        async def run():
+            socket.loop_lag.start()
+            started = time.perf_counter()
+            await asyncio.gather(*(interview(i) for i in range(sockets)))
+            return time.perf_counter() - started
+
+        elapsed = asyncio.run(run())
+        socket.shutdown()
+
+        results[mode] = {
+            "event_loop_lag": socket.loop_lag.stats(),
+            "time_to_first_audio": socket.time_to_first_audio.stats(),
+            "busy_turns": busy,
+            "elapsed_sec": round(elapsed, 2),
+        }
+
+    client.close()
+    return {"sockets": sockets, "turns": turns, **results}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Offline interview socket checks")
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--llm-latency-ms", type=int, default=800)
+    parser.add_argument("--tts-ms-per-char", type=float, default=4.0)
+    parser.add_argument(
+        "--sockets", type=int, default=0,
+        help="measure event-loop lag with this many simultaneous sockets",
+    )
+    args = parser.parse_args()
+
+    if args.sockets:
+        result = loop_lag(
+            args.sockets, args.turns, args.llm_latency_ms, args.tts_ms_per_char
+        )
+    else:
+        result = time_to_first_audio(
+            args.turns, args.llm_latency_ms, args.tts_ms_per_char
+        )
+    print(json.dumps(result, indent=2))